@@ -0,0 +1,31 @@
+import hashlib
+from datetime import datetime
+
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.request import Request
+
+
+def get_etag(*parts: object) -> str:
+    """Return a weak ETag of the given parts."""
+    digest = hashlib.blake2b("\n".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def set_validators(response: HttpResponseBase, etag: str, last_modified: datetime | None) -> HttpResponseBase:
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def get_not_modified_response(request: Request, etag: str, last_modified: datetime | None) -> HttpResponseBase | None:
+    """Return 304 Not Modified when the request validators match, before the response is built."""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
@@ -0,0 +1,22 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from odin.apps.sensors.charts import ChartSeries
+
+
+class ChartSeriesRenderer(BaseRenderer):
+    """Render chart series with the columnar binary layout of `ChartSeries.pack`."""
+
+    media_type = "application/vnd.odin.chart"
+    format = "chart"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if isinstance(data, ChartSeries):
+            return data.pack()
+
+        # Errors have no binary layout, so they are sent as JSON
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = JSONRenderer.media_type
+        return JSONRenderer().render(data, accepted_media_type, renderer_context)
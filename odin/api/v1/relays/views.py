@@ -32,6 +32,7 @@ class RelayRetrieveUpdateView(mixins.RetrieveModelMixin, mixins.UpdateModelMixin
 
         update_fields = []
         item: Relay = serializer.instance
+        state = item.state
         if item and "context" in data:
             item.context.update(**data["context"])
             update_fields.append("context")
@@ -42,3 +43,5 @@ class RelayRetrieveUpdateView(mixins.RetrieveModelMixin, mixins.UpdateModelMixin
 
         if update_fields:
             item.save(update_fields=update_fields)
+        if item.state != state:
+            item.publish_state()
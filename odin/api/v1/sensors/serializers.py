@@ -2,6 +2,7 @@ from django.utils import timezone
 from rest_framework import serializers
 
 from odin.api.utils.serializers import BaseSerializer
+from odin.apps.sensors.charts import ChartAggregate, ChartMetric, ChartResolution
 from odin.apps.sensors.models import SensorType
 
 
@@ -47,6 +48,31 @@ class SensorLogSerializer(BaseSerializer):
 class ChartQueryParamsSerializer(BaseSerializer):
     start = serializers.DateTimeField(required=False)
     end = serializers.DateTimeField(required=False)
+    resolution = serializers.ChoiceField(choices=ChartResolution.choices, default=ChartResolution.AUTO)
+    aggregate = serializers.ChoiceField(choices=ChartAggregate.choices, default=ChartAggregate.LAST)
+    max_points = serializers.IntegerField(required=False, min_value=3, max_value=5000)
+
+
+class ChartSpecSerializer(ChartQueryParamsSerializer):
+    type = serializers.ChoiceField(choices=SensorType.choices, required=False)
+    sensor_ids = serializers.ListField(child=serializers.CharField(max_length=32), required=False, allow_empty=False)
+    metric = serializers.ChoiceField(choices=ChartMetric.choices, default=ChartMetric.TEMP)
+
+    def validate(self, attrs: dict) -> dict:
+        if ("type" in attrs) == ("sensor_ids" in attrs):
+            raise serializers.ValidationError("Either type or sensor_ids is required")
+        return attrs
+
+
+class ChartBatchSerializer(BaseSerializer):
+    series = ChartSpecSerializer(many=True, allow_empty=False, max_length=10)
+
+
+class SensorLogExportQueryParamsSerializer(BaseSerializer):
+    sensor_id = serializers.ListField(child=serializers.CharField(max_length=32), required=False)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    output = serializers.ChoiceField(choices=("csv", "ndjson"), default="csv")
 
 
 class ChartOptionsQueryParamsSerializer(BaseSerializer):
@@ -2,30 +2,53 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.db.models import query
+from django.http import HttpResponseBase, StreamingHttpResponse
 from django.utils import timezone
-from rest_framework import mixins
+from rest_framework import mixins, status
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from odin.api.utils.conditional import get_etag, get_not_modified_response, set_validators
+from odin.api.utils.renderers import ChartSeriesRenderer
 from odin.api.v1.sensors.serializers import (
+    ChartBatchSerializer,
     ChartOptionsQueryParamsSerializer,
     ChartQueryParamsSerializer,
+    SensorLogExportQueryParamsSerializer,
     SensorLogSerializer,
     SensorSerializer,
     SensorUpdateSerializer,
 )
+from odin.apps.sensors.charts import BUCKET_SIZES
 from odin.apps.sensors.models import Sensor, SensorLog
-from odin.apps.sensors.services import get_chart_data
+from odin.apps.sensors.services import (
+    create_sensor_logs,
+    export_sensor_logs,
+    get_chart_batch,
+    get_chart_data,
+    get_chart_options,
+    get_chart_resolution,
+    get_sensors_version,
+)
 
 
 class SensorsView(mixins.ListModelMixin, GenericViewSet):
     serializer_class = SensorSerializer
+    queryset = Sensor.objects.active()
 
     def get_queryset(self) -> query.QuerySet:
-        return Sensor.objects.active()
+        return super().get_queryset().with_latest_logs()
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        version = get_sensors_version(self.queryset.all())
+        etag = get_etag(version.key, request.accepted_renderer.format)
+        if response := get_not_modified_response(request, etag, version.last_modified):
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag, version.last_modified)
 
 
 class SensorsUpdateView(mixins.UpdateModelMixin, GenericViewSet):
@@ -39,7 +62,7 @@ class SensorsUpdateView(mixins.UpdateModelMixin, GenericViewSet):
         serializer.instance.context.update(  # ty: ignore
             **serializer.validated_data["context"]
         )
-        serializer.instance.save(update_fields=["context"])  # ty: ignore
+        serializer.instance.save(update_fields=["context", "updated_at"])  # ty: ignore
 
 
 class SensorsLogView(mixins.CreateModelMixin, mixins.ListModelMixin, GenericViewSet):
@@ -51,23 +74,82 @@ class SensorsLogView(mixins.CreateModelMixin, mixins.ListModelMixin, GenericView
     def get_queryset(self) -> query.QuerySet:
         return SensorLog.objects.current()
 
-    def perform_create(self, serializer: SensorLogSerializer) -> SensorLog:
-        return SensorLog.objects.create(**serializer.validated_data)
+    def get_serializer(self, *args, **kwargs) -> SensorLogSerializer:
+        if isinstance(kwargs.get("data"), list):
+            kwargs.update(many=True, allow_empty=False, max_length=settings.SENSORS_LOGS_MAX_BATCH_SIZE)
+        return super().get_serializer(*args, **kwargs)
+
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if isinstance(request.data, list):
+            result = create_sensor_logs(serializer.validated_data)
+            return Response(result.statuses, status=status.HTTP_201_CREATED)
+
+        # Retried readings are acknowledged as is, so satellites stop resending them
+        result = create_sensor_logs([serializer.validated_data])
+        response_status = status.HTTP_201_CREATED if result.created else status.HTTP_200_OK
+        return Response(serializer.data, status=response_status)
+
+
+class SensorsLogExportView(APIView):
+    serializer_class = SensorLogExportQueryParamsSerializer
+    content_types = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        output = serializer.validated_data["output"]
+        rows = export_sensor_logs(
+            sensor_ids=serializer.validated_data.get("sensor_id"),
+            start=serializer.validated_data.get("start"),
+            end=serializer.validated_data.get("end"),
+            export_format=output,
+        )
+        return StreamingHttpResponse(
+            rows,
+            content_type=self.content_types[output],
+            headers={"Content-Disposition": f'attachment; filename="sensor_logs.{output}"'},
+        )
 
 
 class SensorDataView(APIView):
     queryset: query.QuerySet
     serializer_class = ChartQueryParamsSerializer
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ChartSeriesRenderer]
 
-    def get(self, request: Request) -> Response:
+    def get(self, request: Request) -> HttpResponseBase:
         serializer = self.serializer_class(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
         end = serializer.validated_data.get("end") or timezone.now()
         start = serializer.validated_data.get("start") or (end - timedelta(hours=48))
-
-        data = get_chart_data(self.queryset.all(), start=start, end=end)
-        return Response(data)
+        max_points = serializer.validated_data.get("max_points")
+        resolution = get_chart_resolution(start, end, serializer.validated_data["resolution"], max_points=max_points)
+
+        # Windows ending now slide, so their version also changes with each bucket
+        window = None
+        if "end" not in serializer.validated_data:
+            window = int(start.timestamp() // BUCKET_SIZES[resolution].total_seconds())
+        # Late and rewritten readings and sliding windows change the chart without a newer
+        # modification time, so charts are validated by their ETag alone
+        etag = get_etag(get_sensors_version(self.queryset.all()).key, request.accepted_renderer.format, window)
+        if response := get_not_modified_response(request, etag, None):
+            return response
+
+        chart = get_chart_data(
+            self.queryset.all(),
+            start=start,
+            end=serializer.validated_data.get("end"),
+            resolution=resolution,
+            aggregate=serializer.validated_data["aggregate"],
+            max_points=max_points,
+        )
+        if isinstance(request.accepted_renderer, ChartSeriesRenderer):
+            return set_validators(Response(chart), etag, None)
+        return set_validators(Response(chart.as_dict()), etag, None)
 
 
 class DS18B20DataView(SensorDataView):
@@ -83,7 +165,15 @@ class ChartOptionsView(APIView):
         serializer = ChartOptionsQueryParamsSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
-        sensor_type = serializer.validated_data["type"]
-        options = settings.CHART_OPTIONS.get(sensor_type, settings.CHART_OPTIONS["DS18B20"])
+        return Response(get_chart_options(serializer.validated_data["type"]))
+
+
+class ChartBatchView(APIView):
+    serializer_class = ChartBatchSerializer
+
+    def post(self, request: Request) -> Response:
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        return Response(options)
+        charts = get_chart_batch(serializer.validated_data["series"])
+        return Response({"series": [{**chart.as_dict(), "options": options} for chart, options in charts]})
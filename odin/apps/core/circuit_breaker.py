@@ -0,0 +1,61 @@
+"""Circuit breaker shared by every process through Redis.
+
+The circuit opens after `failure_threshold` consecutive failures, and calls
+fail fast while it is open. Once `reset_timeout` passes it is half-open,
+which lets a single probe through. A successful probe closes the circuit,
+a failed one opens it again. While Redis is unavailable every call is let
+through, as if the circuit was closed.
+"""
+
+import logging
+from datetime import timedelta
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: timedelta, probe_timeout: timedelta):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.failures_key = f"odin:circuit:{name}:failures"
+        self.open_key = f"odin:circuit:{name}:open"
+        self.probe_key = f"odin:circuit:{name}:probe"
+
+    def allow_request(self) -> bool:
+        try:
+            redis = get_redis_connection("default")
+            is_open, failures = redis.mget([self.open_key, self.failures_key])
+            if is_open:
+                return False
+            if int(failures or 0) < self.failure_threshold:
+                return True
+            # Half-open, the probe lock expires in case the probe never reports back
+            return bool(redis.set(self.probe_key, 1, nx=True, ex=self.probe_timeout))
+        except RedisError as e:
+            logger.warning(f"Cannot read {self.name} circuit state: {e}")
+            return True
+
+    def record_success(self) -> None:
+        try:
+            get_redis_connection("default").delete(self.failures_key, self.probe_key)
+        except RedisError as e:
+            logger.warning(f"Cannot reset {self.name} circuit: {e}")
+
+    def record_failure(self) -> None:
+        try:
+            redis = get_redis_connection("default")
+            failures = redis.incr(self.failures_key)
+            if failures >= self.failure_threshold:
+                pipeline = redis.pipeline()
+                pipeline.set(self.open_key, 1, ex=self.reset_timeout)
+                pipeline.delete(self.probe_key)
+                pipeline.execute()
+                logger.error(f"Opened {self.name} circuit after {failures} failures")
+        except RedisError as e:
+            logger.warning(f"Cannot update {self.name} circuit: {e}")
@@ -0,0 +1,66 @@
+"""Live events pushed to dashboards with Server-Sent Events.
+
+Writers publish events to a Redis pub/sub channel once their transaction
+commits, and every open event stream relays the channel to its browser.
+Events are not stored, so a browser that reconnects keeps what it shows
+until the next event instead of replaying the ones it missed.
+"""
+
+import json
+import logging
+from collections.abc import AsyncIterator
+from enum import StrEnum
+
+from django_redis import get_redis_connection
+from redis import asyncio as redis
+from redis.exceptions import RedisError
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "odin:events"
+
+# Comments sent while idle keep proxies from closing the stream
+EVENTS_KEEPALIVE_SECONDS = 15
+EVENTS_RETRY_MILLISECONDS = 5000
+
+
+class EventType(StrEnum):
+    SENSOR_LOGS = "sensor_logs"
+    RELAY_STATE = "relay_state"
+
+
+def format_event(event_type: EventType, data: dict | list) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def publish_event(event_type: EventType, data: dict | list) -> None:
+    """Send an event to every open event stream, events are dropped while Redis is unavailable."""
+    try:
+        get_redis_connection("default").publish(EVENTS_CHANNEL, format_event(event_type, data))
+    except RedisError as e:
+        logger.warning(f"Cannot publish {event_type} event: {e}")
+
+
+async def stream_events() -> AsyncIterator[str]:
+    """Yield published events as Server-Sent Events until the client disconnects."""
+    client = redis.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(EVENTS_CHANNEL)
+        # Events published once the subscription is confirmed are not missed
+        await pubsub.get_message(timeout=EVENTS_KEEPALIVE_SECONDS)
+        yield f"retry: {EVENTS_RETRY_MILLISECONDS}\n\n"
+        while True:
+            if not (message := await pubsub.get_message(timeout=EVENTS_KEEPALIVE_SECONDS)):
+                yield ": keepalive\n\n"
+            elif message["type"] == "message":
+                yield message["data"].decode()
+    except RedisError as e:
+        # Closing the stream makes the browser reconnect after the retry delay
+        logger.warning(f"Cannot stream events: {e}")
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import json
 import logging
+import time
+from collections.abc import Iterable
 from enum import Enum
 from typing import Any
 
+from django_redis import get_redis_connection
 from kafka import KafkaConsumer, KafkaProducer
 from kafka.errors import KafkaError
 from kafka.structs import TopicPartition
+from redis.exceptions import RedisError
 
 from django.conf import settings
 
+from odin.apps.core.circuit_breaker import CircuitBreaker
 from odin.apps.core.exceptions import KafkaReadError
 
 
@@ -27,9 +32,21 @@ class MessageType(Enum):
     SENSOR_DATA_UPDATE = "SENSOR_DATA_UPDATE"
 
 
+# Relay updates that could not be sent, keyed by relay_id so only the latest one is delivered
+PENDING_RELAY_UPDATES_KEY = "odin:kafka:pending_relay_updates"
+
+
 class KafkaService:
     _producer: KafkaProducer | None = None
 
+    # Guards request paths only, background consumers keep retrying on their own
+    circuit_breaker = CircuitBreaker(
+        "kafka",
+        failure_threshold=settings.KAFKA_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.KAFKA_CIRCUIT_RESET_TIMEOUT,
+        probe_timeout=settings.KAFKA_CIRCUIT_PROBE_TIMEOUT,
+    )
+
     @classmethod
     def get_producer(cls) -> KafkaProducer:
         if cls._producer is None:
@@ -42,16 +59,23 @@ class KafkaService:
         return cls._producer
 
     @classmethod
-    def get_consumer(cls) -> KafkaConsumer:
+    def get_consumer(cls, group_id: str | None = None) -> KafkaConsumer:
+        """Offsets are never committed automatically, consumers in a group
+        must call `commit()` once the polled messages are persisted."""
         return KafkaConsumer(
             bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=group_id,
             value_deserializer=lambda x: json.loads(x.decode("utf-8")) if x else None,
             auto_offset_reset="earliest",
-            enable_auto_commit=True,
+            enable_auto_commit=False,
         )
 
     @classmethod
     def send_message(cls, topic: str, message: dict[str, Any], key: str | None = None) -> bool:
+        if not cls.circuit_breaker.allow_request():
+            logger.warning(f"Kafka circuit is open, message to topic {topic} is not sent")
+            return False
+
         try:
             producer = cls.get_producer()
             future = producer.send(topic, value=message, key=key.encode() if key else None)
@@ -61,47 +85,116 @@ class KafkaService:
                 f"Message sent to topic {record_metadata.topic} "
                 f"partition {record_metadata.partition} offset {record_metadata.offset}"
             )
+            cls.circuit_breaker.record_success()
             return True
 
         except KafkaError as e:
             logger.error(f"Kafka error: {e}")
+            cls.circuit_breaker.record_failure()
 
         return False
 
     @classmethod
     def send_relay_update(cls, relay_id: str, target_state: str) -> bool:
+        """Send a relay target state, or keep it for `send_pending_relay_updates` when it cannot be sent."""
         message = {"relay_id": relay_id, "target_state": target_state}
-        return cls.send_message(settings.KAFKA_CORUSCANT_TOPIC, message=message, key=PartitionKey.RELAYS.value)
+        sent = cls.send_message(settings.KAFKA_CORUSCANT_TOPIC, message=message, key=PartitionKey.RELAYS.value)
+        try:
+            redis = get_redis_connection("default")
+            if sent:
+                # An older pending update must not override the one just sent
+                redis.hdel(PENDING_RELAY_UPDATES_KEY, relay_id)
+            else:
+                redis.hset(PENDING_RELAY_UPDATES_KEY, relay_id, target_state)
+                logger.warning(f"Relay {relay_id} update to {target_state} is queued for later delivery")
+        except RedisError as e:
+            logger.warning(f"Cannot update pending relay updates: {e}")
+        return sent
+
+    @classmethod
+    def send_pending_relay_updates(cls) -> int:
+        """Send queued relay updates and return the number sent, the rest stay queued."""
+        try:
+            redis = get_redis_connection("default")
+            pending = redis.hgetall(PENDING_RELAY_UPDATES_KEY)
+        except RedisError as e:
+            logger.warning(f"Cannot read pending relay updates: {e}")
+            return 0
+
+        sent = 0
+        for relay_id, target_state in pending.items():
+            relay_id, target_state = relay_id.decode(), target_state.decode()
+            message = {"relay_id": relay_id, "target_state": target_state}
+            if not cls.send_message(settings.KAFKA_CORUSCANT_TOPIC, message=message, key=PartitionKey.RELAYS.value):
+                break
+
+            sent += 1
+            try:
+                # Keeps an update queued while this one was being sent
+                if redis.hget(PENDING_RELAY_UPDATES_KEY, relay_id) == target_state.encode():
+                    redis.hdel(PENDING_RELAY_UPDATES_KEY, relay_id)
+            except RedisError as e:
+                logger.warning(f"Cannot update pending relay updates: {e}")
+        return sent
 
     @classmethod
-    def get_relay_data(cls, relay_id: str, max_messages: int = 10) -> dict[str, Any] | None:
-        consumer = cls.get_consumer()
+    def get_relays_data(
+        cls, relay_ids: Iterable[str], max_messages: int = 100, timeout: float = 1.0
+    ) -> dict[str, dict[str, Any]]:
+        """Return the latest relay state update of each relay found in the tail of the topic.
+
+        The last `max_messages` of every partition are read with a single consumer
+        until each partition reaches its end offset or `timeout` seconds pass,
+        relays without an update in the tail are left out of the result.
+        """
+        relay_ids = set(relay_ids)
+        if not relay_ids:
+            return {}
+        if not cls.circuit_breaker.allow_request():
+            raise KafkaReadError("Kafka circuit is open")
+
+        consumer = None
         try:
+            consumer = cls.get_consumer()
             partitions = consumer.partitions_for_topic(settings.KAFKA_ODIN_TOPIC)
             if not partitions:
-                return None
+                return {}
 
             topic_partitions = [TopicPartition(settings.KAFKA_ODIN_TOPIC, p) for p in partitions]
             consumer.assign(topic_partitions)
 
             end_offsets = consumer.end_offsets(topic_partitions)
+            remaining = set()
             for tp in topic_partitions:
-                end_offset = end_offsets[tp]
-                consumer.seek(tp, max(0, end_offset - max_messages))
-
-            records = consumer.poll(timeout_ms=1000)
-            for _tp, messages in records.items():
-                for message in reversed(messages):
-                    data = message.value.get("data", {})
-                    if (
-                        message.value.get("type") == MessageType.RELAY_STATE_UPDATE.value
-                        and data.get("relay_id") == relay_id
-                    ):
-                        return data
-            return None
+                start_offset = max(0, end_offsets[tp] - max_messages)
+                consumer.seek(tp, start_offset)
+                if start_offset < end_offsets[tp]:
+                    remaining.add(tp)
+
+            # Updates of a relay may land in several partitions, the newest one wins
+            result, timestamps = {}, {}
+            deadline = time.monotonic() + timeout
+            while remaining and (timeout_ms := int((deadline - time.monotonic()) * 1000)) > 0:
+                for tp, messages in consumer.poll(timeout_ms=timeout_ms).items():
+                    for message in messages:
+                        data = message.value.get("data", {})
+                        relay_id = data.get("relay_id")
+                        if (
+                            message.value.get("type") == MessageType.RELAY_STATE_UPDATE.value
+                            and relay_id in relay_ids
+                            and message.timestamp >= timestamps.get(relay_id, message.timestamp)
+                        ):
+                            result[relay_id] = data
+                            timestamps[relay_id] = message.timestamp
+                    if messages and messages[-1].offset + 1 >= end_offsets[tp]:
+                        remaining.discard(tp)
+            cls.circuit_breaker.record_success()
+            return result
 
         except KafkaError as e:
+            cls.circuit_breaker.record_failure()
             raise KafkaReadError from e
 
         finally:
-            consumer.close()
+            if consumer:
+                consumer.close()
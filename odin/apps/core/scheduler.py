@@ -34,6 +34,13 @@ def schedule_update_index_context():
         send_push_notification_to_admins(title="Sensors error", body="One or more sensors are not responding.")
 
 
+@scheduler.scheduled_job("interval", minutes=1, id="send_pending_relay_updates")
+def schedule_send_pending_relay_updates():
+    from odin.apps.core.kafka import KafkaService
+
+    KafkaService.send_pending_relay_updates()
+
+
 @scheduler.scheduled_job("interval", hours=4, id="update_exchange_rates")
 def schedule_update_exchange_rates():
     call_command("update_exchange_rates")
@@ -42,3 +49,13 @@ def schedule_update_exchange_rates():
 @scheduler.scheduled_job("interval", minutes=15, id="fetch_traffic")
 def schedule_fetch_traffic():
     call_command("fetch_traffic")
+
+
+@scheduler.scheduled_job("cron", hour=3, minute=0, id="manage_sensor_partitions")
+def schedule_manage_sensor_partitions():
+    call_command("manage_sensor_partitions")
+
+
+@scheduler.scheduled_job("cron", hour=3, minute=30, id="compact_sensor_logs")
+def schedule_compact_sensor_logs():
+    call_command("compact_sensor_logs")
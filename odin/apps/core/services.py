@@ -10,7 +10,8 @@ from odin.apps.currency.models import ExchangeRate
 from odin.apps.currency.services import get_exchange_rate_trends
 from odin.apps.electricity.models import VoltageLog
 from odin.apps.provider.models import Traffic
-from odin.apps.sensors.models import Sensor
+from odin.apps.relays.services import refresh_relay_states
+from odin.apps.sensors.models import Sensor, SensorType
 from odin.apps.weather.models import Weather
 
 
@@ -22,23 +23,24 @@ INDEX_CONTEXT_CACHE_TIMEOUT = 120
 
 def build_index_context() -> dict[str, Any]:
     voltage = VoltageLog.objects.first()
-    home_sensors_is_alive = all([x.is_alive for x in Sensor.objects.active().esp8266()])
-    boiler_sensors_is_alive = all([x.is_alive for x in Sensor.objects.active().ds18b20()])
+    # A single pass over active sensors serves both liveness checks and the visible lists
+    active_sensors = list(Sensor.objects.active().order_by("order").with_latest_state())
+    home_sensors_is_alive = all(x.is_alive for x in active_sensors if x.type == SensorType.ESP8266)
+    boiler_sensors_is_alive = all(x.is_alive for x in active_sensors if x.type == SensorType.DS18B20)
+    sensors = [x for x in active_sensors if x.is_visible]
     weather = Weather.objects.current()
-    sensors = Sensor.objects.active().visible().order_by("order")
     error_logs = Log.objects.errors_last_day()
     exchange_rates = ExchangeRate.objects.current()
     exchange_rates_trends = get_exchange_rate_trends()
     traffic = Traffic.objects.first()
 
-    for sensor in sensors:
-        if sensor.relay:
-            # TODO: repplace with a batch refresh
-            sensor.relay.refresh_state_from_kafka()
+    refresh_relay_states(sensor.relay for sensor in sensors if sensor.relay)
 
     return {
         "weather": weather,
         "sensors": sensors,
+        "home_sensors": [x for x in sensors if x.type == SensorType.ESP8266],
+        "boiler_sensors": [x for x in sensors if x.type == SensorType.DS18B20],
         "home_sensors_is_alive": home_sensors_is_alive,
         "boiler_sensors_is_alive": boiler_sensors_is_alive,
         "error_logs": error_logs,
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import logging
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_GET
 
+from odin.apps.core.events import stream_events
 from odin.apps.core.services import (
     get_cached_index_context,
     update_index_context_cache,
@@ -18,3 +20,13 @@ def index_view(request: HttpRequest) -> HttpResponse:
     if not (context := get_cached_index_context()):
         context = update_index_context_cache()
     return render(request, "index.html", context=context)
+
+
+@require_GET
+async def events_view(request: HttpRequest) -> StreamingHttpResponse:
+    return StreamingHttpResponse(
+        stream_events(),
+        content_type="text/event-stream",
+        # Proxies must pass events through as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,120 @@
+import logging
+import signal
+import sys
+
+from kafka import ConsumerRebalanceListener, KafkaConsumer
+from kafka.errors import KafkaError
+
+from command_log.management.commands import LoggedCommand
+from django.conf import settings
+
+from odin.apps.core.kafka import KafkaService, MessageType
+from odin.apps.relays.models import Relay
+from odin.apps.relays.services import save_relay_states
+from odin.apps.relays.states import set_relay_states
+
+
+logger = logging.getLogger(__name__)
+
+
+class SeekTailOnAssignListener(ConsumerRebalanceListener):
+    """Start partitions the group has no offset for near their end, as relay
+    states only need the latest updates rather than the whole topic history."""
+
+    def __init__(self, consumer: KafkaConsumer, tail_messages: int):
+        self.consumer = consumer
+        self.tail_messages = tail_messages
+
+    def on_partitions_revoked(self, revoked):
+        pass
+
+    def on_partitions_assigned(self, assigned):
+        if not (new_partitions := [tp for tp in assigned if self.consumer.committed(tp) is None]):
+            return
+
+        end_offsets = self.consumer.end_offsets(new_partitions)
+        for tp in new_partitions:
+            self.consumer.seek(tp, max(0, end_offsets[tp] - self.tail_messages))
+        logger.info(f"Started partitions {sorted(tp.partition for tp in new_partitions)} from their tail")
+
+
+class Command(LoggedCommand):
+    help = description = "Runs a Kafka consumer keeping relay states in the database and Redis up to date."
+
+    poll_timeout_ms = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = True
+        self.consumer: KafkaConsumer | None = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tail-messages",
+            type=int,
+            default=100,
+            help="Number of messages read from the end of each partition the consumer group has no offset for",
+        )
+
+    def handle(self, *args, **options):
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+
+        logger.info("Starting Kafka relay consumer...")
+        self.consumer = KafkaService.get_consumer(group_id=settings.KAFKA_RELAYS_CONSUMER_GROUP)
+        self.consumer.subscribe(
+            [settings.KAFKA_ODIN_TOPIC],
+            listener=SeekTailOnAssignListener(self.consumer, options.get("tail_messages") or 100),
+        )
+        logger.info(f"Subscribed to topic: {settings.KAFKA_ODIN_TOPIC}")
+
+        try:
+            while self.running:
+                records = self.consumer.poll(timeout_ms=self.poll_timeout_ms)
+                self.save(self.parse_states(records))
+                if records:
+                    self.consumer.commit()
+
+        except KafkaError as e:
+            self.stderr.write(f"Kafka error: {e}")
+            sys.exit(1)
+        finally:
+            self.cleanup()
+
+    @staticmethod
+    def parse_states(records: dict) -> dict[str, str]:
+        """Return the newest state of each relay, updates of a relay may land in several partitions."""
+        states, timestamps = {}, {}
+        for _, messages in records.items():
+            for message in messages:
+                if not message.value or message.value.get("type") != MessageType.RELAY_STATE_UPDATE.value:
+                    continue
+
+                data = message.value.get("data") or {}
+                relay_id, state = data.get("relay_id"), data.get("state")
+                if not relay_id or not state:
+                    logger.warning("Received relay update message without a valid payload")
+                    continue
+
+                if message.timestamp >= timestamps.get(relay_id, message.timestamp):
+                    states[relay_id] = state
+                    timestamps[relay_id] = message.timestamp
+        return states
+
+    def save(self, states: dict[str, str]) -> None:
+        """Save changed states before mirroring them, the mirror also renews the consumer heartbeat."""
+        if states:
+            changed = save_relay_states(Relay.objects.filter(relay_id__in=states), states)
+            for relay in changed:
+                logger.info(f"Relay {relay.relay_id} state changed to {relay.state}")
+        set_relay_states(states)
+
+    def signal_handler(self, signum, frame):
+        logger.info("\nShutting down consumer...")
+        self.running = False
+
+    def cleanup(self):
+        if self.consumer:
+            self.consumer.close()
+            self.consumer = None
+        logger.info("Consumer closed.")
@@ -1,23 +1,20 @@
 from __future__ import annotations
 
-import logging
 from datetime import datetime
+from functools import partial
 from typing import TYPE_CHECKING
 
-from django.db import models
+from django.db import models, transaction
 from django.db.models import query
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
-from odin.apps.core.exceptions import KafkaReadError
-from odin.apps.core.kafka import KafkaService
+from odin.apps.core.events import EventType, publish_event
 
 
 if TYPE_CHECKING:
     from odin.apps.sensors.models import Sensor
 
-logger = logging.getLogger(__name__)
-
 
 class RelayType(models.TextChoices):
     PUMP = "PUMP", _("Pump")
@@ -95,15 +92,8 @@ class Relay(models.Model):
 
         return RelayTargetStateService(self).get_target_state()
 
-    def refresh_state_from_kafka(self) -> str | None:
-        try:
-            if not (data := KafkaService.get_relay_data(self.relay_id)):
-                logger.error(f"There are no messages for relay {self.relay_id}")
-                return None
-        except KafkaReadError:
-            logger.error(f"Failed to get state from Kafka for relay {self.relay_id}")
-            return None
-
-        self.context["state"] = data.get("state")
-        self.save(update_fields=["context", "updated_at"])
-        return data.get("state")
+    def publish_state(self) -> None:
+        """Push the relay state to live dashboards once the current transaction commits."""
+        transaction.on_commit(
+            partial(publish_event, EventType.RELAY_STATE, {"relay_id": self.relay_id, "state": self.state})
+        )
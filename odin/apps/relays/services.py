@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import logging
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
+from django.db import transaction
 from django.utils import timezone
 
-from odin.apps.relays.models import RelayState, RelayType
+from odin.apps.core.exceptions import KafkaReadError
+from odin.apps.core.kafka import KafkaService
+from odin.apps.relays.models import Relay, RelayState, RelayType
+from odin.apps.relays.states import get_relay_states
 
 
 if TYPE_CHECKING:
-    from odin.apps.relays.models import Relay
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
 
 
 class RelayTargetStateService:
@@ -70,3 +77,48 @@ class RelayTargetStateService:
                 return self.get_servo_target_state()
             case _:
                 return RelayState.UNKNOWN
+
+
+def save_relay_states(relays: Iterable[Relay], states: dict[str, str]) -> list[Relay]:
+    """Save the relays whose state differs from `states`, with one UPDATE statement, and return them."""
+    changed = []
+    updated_at = timezone.now()
+    for relay in relays:
+        if (state := states.get(relay.relay_id)) is not None and relay.state != state:
+            relay.context["state"] = state
+            relay.updated_at = updated_at
+            changed.append(relay)
+
+    if changed:
+        with transaction.atomic():
+            Relay.objects.bulk_update(changed, ["context", "updated_at"])
+            for relay in changed:
+                relay.publish_state()
+    return changed
+
+
+def refresh_relay_states(relays: Iterable[Relay]) -> list[Relay]:
+    """Refresh relay states from the mirror kept by `consume_relays` and return the changed relays.
+
+    While the consumer is not running, the tail of the Kafka topic is read
+    once for all relays instead.
+    """
+    relays = list(relays)
+    if not (relay_ids := {relay.relay_id for relay in relays}):
+        return []
+
+    if (states := get_relay_states(relay_ids)) is None:
+        states = {}
+        try:
+            relays_data = KafkaService.get_relays_data(relay_ids)
+        except KafkaReadError:
+            logger.error(f"Failed to get states from Kafka for {len(relay_ids)} relays")
+            return []
+
+        for relay_id in relay_ids:
+            if data := relays_data.get(relay_id):
+                states[relay_id] = data.get("state")
+            else:
+                logger.error(f"There are no messages for relay {relay_id}")
+
+    return save_relay_states(relays, states)
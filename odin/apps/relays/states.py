@@ -0,0 +1,53 @@
+"""Relay states mirrored in a Redis hash keyed by relay_id.
+
+The `consume_relays` command writes every state update it consumes along
+with a heartbeat key. Readers only trust the mirror while the heartbeat is
+alive, and fall back to reading the Kafka topic otherwise.
+"""
+
+import logging
+from collections.abc import Iterable
+from datetime import timedelta
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+
+logger = logging.getLogger(__name__)
+
+RELAY_STATES_KEY = "odin:relays:states"
+RELAY_CONSUMER_HEARTBEAT_KEY = "odin:relays:consumer_heartbeat"
+
+# The consumer polls every second, so a missed heartbeat means it is not running
+RELAY_CONSUMER_HEARTBEAT_TIMEOUT = timedelta(seconds=30)
+
+
+def set_relay_states(states: dict[str, str]) -> None:
+    """Store relay states and renew the consumer heartbeat."""
+    try:
+        pipeline = get_redis_connection("default").pipeline()
+        if states:
+            pipeline.hset(RELAY_STATES_KEY, mapping=states)
+        pipeline.set(RELAY_CONSUMER_HEARTBEAT_KEY, 1, ex=RELAY_CONSUMER_HEARTBEAT_TIMEOUT)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Cannot update relay states: {e}")
+
+
+def get_relay_states(relay_ids: Iterable[str]) -> dict[str, str] | None:
+    """Return the mirrored states of the relays that have one, None while the consumer is not running."""
+    if not (relay_ids := list(relay_ids)):
+        return {}
+
+    try:
+        pipeline = get_redis_connection("default").pipeline()
+        pipeline.exists(RELAY_CONSUMER_HEARTBEAT_KEY)
+        pipeline.hmget(RELAY_STATES_KEY, relay_ids)
+        is_alive, states = pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Cannot read relay states: {e}")
+        return None
+
+    if not is_alive:
+        return None
+    return {relay_id: state.decode() for relay_id, state in zip(relay_ids, states, strict=True) if state is not None}
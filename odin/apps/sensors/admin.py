@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Sensor, SensorLog
+from .models import Sensor, SensorLog, SensorLogRollup
 
 
 @admin.register(Sensor)
@@ -19,9 +19,19 @@ class SensorAdmin(admin.ModelAdmin):
     )
     list_filter = ("type",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_latest_logs()
+
 
 @admin.register(SensorLog)
 class SensorLogAdmin(admin.ModelAdmin):
     list_display = ("sensor_id", "temp", "humidity", "synced_at", "created_at")
     search_fields = ("sensor_id",)
     list_filter = ("sensor_id", "synced_at")
+
+
+@admin.register(SensorLogRollup)
+class SensorLogRollupAdmin(admin.ModelAdmin):
+    list_display = ("sensor_id", "resolution", "bucket", "count", "temp_min", "temp_max", "temp_avg")
+    search_fields = ("sensor_id",)
+    list_filter = ("resolution", "sensor_id")
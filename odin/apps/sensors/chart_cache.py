@@ -0,0 +1,124 @@
+"""Complete chart buckets kept in Redis, so live charts only query the newest readings.
+
+A cached chart holds the rows of every bucket that ended before the late
+readings grace period, and each request only fetches the readings after it,
+along with the partial first bucket of the window. Readings older than the
+grace period, imports and compaction bump the cache generation instead,
+which drops every cached chart at once.
+"""
+
+import json
+import logging
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from odin.apps.sensors.charts import (
+    BUCKET_SIZES,
+    ChartAggregate,
+    ChartMetric,
+    ChartResolution,
+    get_chart_rows,
+    get_chart_rows_batch,
+    get_chart_sql,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CHART_CACHE_KEY = "odin:sensors:chart_cache:{}"
+CHART_CACHE_GENERATION_KEY = "odin:sensors:chart_cache_generation"
+CHART_CACHE_TIMEOUT = timedelta(days=1)
+
+# Readings may arrive late, so buckets are cached only once they ended this long ago
+LATE_READINGS_GRACE = timedelta(minutes=10)
+
+# Longer buckets follow the local time zone, these are aligned to the epoch
+CACHED_RESOLUTIONS = (ChartResolution.FIVE_MINUTES, ChartResolution.FIFTEEN_MINUTES)
+
+
+def get_cache_key(
+    sensors: list[tuple[str, str, Decimal]], resolution: ChartResolution, aggregate: ChartAggregate, metric: ChartMetric
+) -> str:
+    # Offsets are applied in the query, so changing one has to miss the cache
+    offsets = ",".join(f"{sensor_id}={offset}" for sensor_id, _, offset in sensors)
+    return CHART_CACHE_KEY.format(f"{resolution}:{aggregate}:{metric}:{offsets}")
+
+
+def get_cached_chart_rows(
+    sensors: list[tuple[str, str, Decimal]],
+    start: datetime,
+    end: datetime,
+    resolution: ChartResolution = ChartResolution.FIVE_MINUTES,
+    aggregate: ChartAggregate = ChartAggregate.LAST,
+    metric: ChartMetric = ChartMetric.TEMP,
+) -> list[tuple]:
+    """Return the rows of `get_chart_rows` for a window ending now, reusing cached complete buckets."""
+    size = int(BUCKET_SIZES[resolution].total_seconds())
+    first_bucket = math.ceil(start.timestamp() / size) * size
+    complete_until = int((end - LATE_READINGS_GRACE).timestamp()) // size * size
+    if resolution not in CACHED_RESOLUTIONS or complete_until <= first_bucket:
+        return get_chart_rows(sensors, start, end, resolution=resolution, aggregate=aggregate, metric=metric)
+
+    key = get_cache_key(sensors, resolution, aggregate, metric)
+    generation, cached = read_chart_cache(key)
+    rows, fetch_from = [], first_bucket
+    # Wider windows than the cached one are fetched again, as older buckets were never cached
+    if cached and cached["generation"] == generation and cached["start"] <= first_bucket <= cached["complete_until"]:
+        rows = [tuple(row) for row in cached["rows"] if row[1] >= first_bucket]
+        fetch_from = cached["complete_until"]
+
+    # The partial first bucket only aggregates readings within the window
+    queries = [
+        get_chart_sql(sensors, datetime.fromtimestamp(fetch_from, start.tzinfo), end, resolution, aggregate, metric)
+    ]
+    if start.timestamp() < first_bucket:
+        first_bucket_end = datetime.fromtimestamp(first_bucket, start.tzinfo) - timedelta(microseconds=1)
+        queries.append(get_chart_sql(sensors, start, first_bucket_end, resolution, aggregate, metric))
+    new_rows, *first_rows = get_chart_rows_batch(queries)
+
+    rows.extend(row for row in new_rows if row[1] < complete_until)
+    if complete_until > fetch_from:
+        write_chart_cache(
+            key, {"generation": generation, "start": first_bucket, "complete_until": complete_until, "rows": rows}
+        )
+    return [*(first_rows[0] if first_rows else ()), *rows, *(row for row in new_rows if row[1] >= complete_until)]
+
+
+def read_chart_cache(key: str) -> tuple[int, dict | None]:
+    try:
+        generation, value = get_redis_connection("default").mget([CHART_CACHE_GENERATION_KEY, key])
+    except RedisError as e:
+        logger.warning(f"Cannot read chart cache: {e}")
+        return 0, None
+    return int(generation or 0), json.loads(value) if value else None
+
+
+def write_chart_cache(key: str, value: dict) -> None:
+    try:
+        get_redis_connection("default").set(key, json.dumps(value), ex=CHART_CACHE_TIMEOUT)
+    except RedisError as e:
+        logger.warning(f"Cannot update chart cache: {e}")
+
+
+def get_chart_cache_generation() -> int:
+    """Return the generation expiring cached charts, it also versions readings behind the newest ones."""
+    try:
+        return int(get_redis_connection("default").get(CHART_CACHE_GENERATION_KEY) or 0)
+    except RedisError as e:
+        logger.warning(f"Cannot read chart cache generation: {e}")
+        return 0
+
+
+def expire_chart_cache(oldest: datetime | None = None) -> None:
+    """Drop every cached chart, or only when a reading created at `oldest` may fall into a cached bucket."""
+    if oldest is not None and oldest >= datetime.now(oldest.tzinfo) - LATE_READINGS_GRACE:
+        return
+
+    try:
+        get_redis_connection("default").incr(CHART_CACHE_GENERATION_KEY)
+    except RedisError as e:
+        logger.warning(f"Cannot expire chart cache: {e}")
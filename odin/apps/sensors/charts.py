@@ -0,0 +1,285 @@
+"""Chart series built from readings bucketed in the database.
+
+Postgres aggregates readings of every sensor per bucket and applies the
+sensor offset, so only one (sensor_id, epoch, value hundredths) row per
+sensor and bucket is transferred. The rows are then laid out into
+series with NumPy arrays instead of per row Python objects, and
+optionally downsampled with Largest-Triangle-Three-Buckets to keep the
+short spikes that averaging buckets flattens. Series are sent either as
+JSON or as a compact columnar binary layout.
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from django.conf import settings
+from django.db import connection, models
+
+from odin.apps.sensors.models import RollupResolution, SensorLog
+from odin.apps.sensors.rollups import BUCKETS as ROLLUP_BUCKETS
+
+
+class ChartResolution(models.TextChoices):
+    AUTO = "auto", "auto"
+    FIVE_MINUTES = "5m", "5 minutes"
+    FIFTEEN_MINUTES = "15m", "15 minutes"
+    HOUR = "1h", "1 hour"
+    SIX_HOURS = "6h", "6 hours"
+    DAY = "1d", "1 day"
+
+
+class ChartMetric(models.TextChoices):
+    TEMP = "temp", "temp"
+    HUMIDITY = "humidity", "humidity"
+
+
+class ChartAggregate(models.TextChoices):
+    LAST = "last", "last"
+    AVG = "avg", "avg"
+    MIN = "min", "min"
+    MAX = "max", "max"
+
+
+BUCKET_SIZES = {
+    ChartResolution.FIVE_MINUTES: timedelta(minutes=5),
+    ChartResolution.FIFTEEN_MINUTES: timedelta(minutes=15),
+    ChartResolution.HOUR: timedelta(hours=1),
+    ChartResolution.SIX_HOURS: timedelta(hours=6),
+    ChartResolution.DAY: timedelta(days=1),
+}
+
+# Sub-hour buckets are aligned to UTC, longer ones to the local time zone like the rollups
+BUCKETS = {
+    ChartResolution.FIVE_MINUTES: ROLLUP_BUCKETS[RollupResolution.FIVE_MINUTES],
+    ChartResolution.FIFTEEN_MINUTES: "date_bin('15 minutes', created_at, TIMESTAMPTZ '2000-01-01 00:00:00+00')",
+    ChartResolution.HOUR: ROLLUP_BUCKETS[RollupResolution.HOUR],
+    ChartResolution.SIX_HOURS: "date_bin('6 hours', created_at, TIMESTAMP '2000-01-01 00:00:00' AT TIME ZONE %s)",
+    ChartResolution.DAY: ROLLUP_BUCKETS[RollupResolution.DAY],
+}
+
+# Arrays compare element-wise, so the max of [created_at epoch, value] is the last reading of a bucket
+AGGREGATES = {
+    ChartAggregate.LAST: "(MAX(ARRAY[EXTRACT(EPOCH FROM created_at), {column}]))[2]",
+    ChartAggregate.AVG: "AVG({column})",
+    ChartAggregate.MIN: "MIN({column})",
+    ChartAggregate.MAX: "MAX({column})",
+}
+
+# Source buckets fetched per downsampled point when the resolution is picked automatically
+LTTB_SOURCE_POINTS = 20
+
+
+@dataclass
+class ChartSeries:
+    """Series of every sensor aligned to shared buckets, NaN where a sensor has no reading."""
+
+    sensors: list[tuple[str, str]]
+    buckets: np.ndarray
+    grid: np.ndarray
+
+    def as_dict(self) -> dict:
+        """Return `{"timestamps", "sensors"}` with ISO timestamps and None for missing readings."""
+        data = self.grid.astype(object)
+        data[np.isnan(self.grid)] = None
+        rows = data.tolist()
+        return {
+            "timestamps": [datetime.fromtimestamp(bucket, UTC).isoformat() for bucket in self.buckets.tolist()],
+            "sensors": [
+                {"sensor_id": sensor_id, "name": name, "data": rows[position]}
+                for position, (sensor_id, name) in enumerate(self.sensors)
+            ],
+        }
+
+    def pack(self) -> bytes:
+        """Return the columnar binary layout decoded by `static/js/chart.js`.
+
+        All numbers are little-endian and every section starts at a 4 byte offset:
+
+        - uint32 length of the JSON header, then the header `{"start", "count", "sensors"}`
+          padded with spaces
+        - uint32[count] seconds since the previous bucket, the first one is 0
+        - per sensor a bitmap of present readings, least significant bit first, padded
+          with zeros, then float32[count] temps with NaN for missing readings
+        """
+        count = len(self.buckets)
+        header = json.dumps(
+            {
+                "start": int(self.buckets[0]) if count else None,
+                "count": count,
+                "sensors": [{"sensor_id": sensor_id, "name": name} for sensor_id, name in self.sensors],
+            },
+            ensure_ascii=False,
+        ).encode()
+        header += b" " * (-len(header) % 4)
+
+        deltas = np.diff(self.buckets, prepend=self.buckets[:1]).astype("<u4")
+        bitmaps = np.packbits(~np.isnan(self.grid), axis=1, bitorder="little")
+        bitmaps = np.pad(bitmaps, ((0, 0), (0, -bitmaps.shape[1] % 4)))
+        values = self.grid.astype("<f4")
+        return b"".join(
+            [
+                struct.pack("<I", len(header)),
+                header,
+                deltas.tobytes(),
+                *(bitmap.tobytes() + series.tobytes() for bitmap, series in zip(bitmaps, values, strict=True)),
+            ]
+        )
+
+
+def get_resolution(start: datetime, end: datetime, max_points: int | None = None) -> ChartResolution:
+    """Pick the finest resolution that keeps a series of the range within `max_points`."""
+    max_points = max_points or settings.SENSORS_CHART_MAX_POINTS
+    for resolution, size in BUCKET_SIZES.items():
+        if (end - start) / size <= max_points:
+            return resolution
+    return ChartResolution.DAY
+
+
+def get_chart_sql(
+    sensors: list[tuple[str, str, Decimal]],
+    start: datetime,
+    end: datetime,
+    resolution: ChartResolution = ChartResolution.FIVE_MINUTES,
+    aggregate: ChartAggregate = ChartAggregate.LAST,
+    metric: ChartMetric = ChartMetric.TEMP,
+) -> tuple[str, list]:
+    """Return the query of an offset metric per sensor and bucket as (sensor_id, epoch, value hundredths).
+
+    `sensors` holds (sensor_id, name, offset of the metric).
+    """
+    offsets = {sensor_id: offset for sensor_id, _, offset in sensors}
+    table = connection.ops.quote_name(SensorLog._meta.db_table)  # ty: ignore[unresolved-attribute]
+    bucket = BUCKETS[resolution]
+    column = connection.ops.quote_name(metric)
+    value = AGGREGATES[aggregate].format(column=column)
+    sql = (
+        "SELECT sensor_id, bucket, ROUND((value + offsets.value_offset) * 100)::bigint FROM ("  # noqa: S608 # nosec B608
+        f"SELECT sensor_id, EXTRACT(EPOCH FROM {bucket})::bigint AS bucket, {value} AS value "
+        f"FROM {table} WHERE sensor_id = ANY(%s::varchar[]) AND created_at BETWEEN %s AND %s "
+        f"AND {column} IS NOT NULL GROUP BY sensor_id, bucket"
+        ") AS buckets JOIN unnest(%s::varchar[], %s::numeric[]) AS offsets (sensor_id, value_offset) USING (sensor_id)"
+    )
+    params = [settings.TIME_ZONE] if "%s" in bucket else []
+    return sql, [*params, list(offsets), start, end, list(offsets), list(offsets.values())]
+
+
+def get_chart_rows(
+    sensors: list[tuple[str, str, Decimal]],
+    start: datetime,
+    end: datetime,
+    resolution: ChartResolution = ChartResolution.FIVE_MINUTES,
+    aggregate: ChartAggregate = ChartAggregate.LAST,
+    metric: ChartMetric = ChartMetric.TEMP,
+) -> list[tuple]:
+    """Return an offset metric per sensor and bucket as (sensor_id, epoch, value hundredths)."""
+    sql, params = get_chart_sql(sensors, start, end, resolution=resolution, aggregate=aggregate, metric=metric)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def get_chart_rows_batch(queries: list[tuple[str, list]]) -> list[list[tuple]]:
+    """Run the queries of `get_chart_sql` as one UNION ALL statement and return the rows of each."""
+    results = [[] for _ in queries]
+    if not queries:
+        return results
+
+    sql = " UNION ALL ".join(
+        f"SELECT {index} AS series, * FROM ({query}) AS series_{index}"  # noqa: S608 # nosec B608
+        for index, (query, _) in enumerate(queries)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [param for _, params in queries for param in params])
+        for series, *row in cursor.fetchall():
+            results[series].append(tuple(row))
+    return results
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Return indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept, the rest are split into `max_points - 2`
+    buckets and each keeps the point forming the largest triangle with the point kept
+    before it and the average of the next bucket. Bucket bounds and averages are computed
+    for all buckets at once, only the selection walks the buckets.
+    """
+    size = len(x)
+    if size <= max_points or max_points < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=np.float64) - x[0]
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.minimum(np.arange(max_points) * (size - 2) // (max_points - 2) + 1, size)
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    next_starts, next_ends = edges[1:-1], edges[2:]
+    next_x = ((x_sums[next_ends] - x_sums[next_starts]) / (next_ends - next_starts)).tolist()
+    next_y = ((y_sums[next_ends] - y_sums[next_starts]) / (next_ends - next_starts)).tolist()
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    edges = edges.tolist()
+    previous = 0
+    for index in range(max_points - 2):
+        start, stop = edges[index], edges[index + 1]
+        previous_x, previous_y = x[previous], y[previous]
+        areas = np.abs(
+            (previous_x - next_x[index]) * (y[start:stop] - previous_y)
+            - (previous_x - x[start:stop]) * (next_y[index] - previous_y)
+        )
+        previous = start + int(areas.argmax())
+        selected[index + 1] = previous
+    return selected
+
+
+def downsample(buckets: np.ndarray, grid: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Keep at most `max_points` buckets, shared by all series so they stay aligned.
+
+    The budget is split between series with readings, each running LTTB over its own
+    readings and skipping gaps, so the union of their picks fits into `max_points`.
+    When the split leaves a series too few points, LTTB runs once over the mean of all
+    series instead. Series keep their actual values at buckets selected for other series,
+    so no gaps are introduced.
+    """
+    if len(buckets) <= max_points:
+        return buckets, grid
+
+    series = [row for row in grid if not np.isnan(row).all()]
+    keep = np.zeros(len(buckets), dtype=bool)
+    if (budget := max_points // len(series)) >= 3:
+        for row in series:
+            present = np.flatnonzero(~np.isnan(row))
+            keep[present[lttb(buckets[present], row[present], budget)]] = True
+    else:
+        # Every bucket has a reading of at least one series, as buckets come from readings
+        keep[lttb(buckets, np.nanmean(grid, axis=0), max_points)] = True
+    return buckets[keep], grid[:, keep]
+
+
+def build_chart_series(
+    sensors: list[tuple[str, str, Decimal]], rows: list[tuple[str, int, int]], max_points: int | None = None
+) -> ChartSeries:
+    """Lay out one (sensor_id, epoch, value hundredths) row per sensor and bucket into series.
+
+    `sensors` holds (sensor_id, name, offset) in output order. With `max_points`
+    the series are downsampled to at most that many shared timestamps.
+    """
+    chart_sensors = [(sensor_id, name) for sensor_id, name, _ in sensors]
+    if not rows:
+        return ChartSeries(chart_sensors, np.empty(0, dtype=np.int64), np.empty((len(sensors), 0)))
+
+    row_sensor_ids, epochs, temps = zip(*rows, strict=True)
+    positions = {sensor_id: position for position, (sensor_id, _, _) in enumerate(sensors)}
+    sensor_index = np.fromiter(map(positions.__getitem__, row_sensor_ids), dtype=np.int64, count=len(rows))
+
+    buckets, bucket_index = np.unique(np.array(epochs, dtype=np.int64), return_inverse=True)
+    grid = np.full((len(sensors), len(buckets)), np.nan)
+    grid[sensor_index, bucket_index] = np.array(temps, dtype=np.int64) / 100
+    if max_points:
+        buckets, grid = downsample(buckets, grid, max_points)
+    return ChartSeries(chart_sensors, buckets, grid)
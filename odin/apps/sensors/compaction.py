@@ -0,0 +1,118 @@
+"""Downsampling of old raw sensor logs into 5 minute averages.
+
+Compacted readings are stored in the SensorLog table itself at the start of
+their bucket, so charts keep working for old ranges, while rollups keep the
+statistics computed from the raw readings. Deleted rows only free disk space
+once their monthly partition is rewritten, see `rewrite_partition`.
+"""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from odin.apps.sensors.chart_cache import expire_chart_cache
+from odin.apps.sensors.models import RollupResolution, SensorLog
+from odin.apps.sensors.partitions import Partition, get_partitions
+from odin.apps.sensors.rollups import BUCKETS
+
+
+logger = logging.getLogger(__name__)
+
+COMPACTED_UNTIL_CACHE_KEY = "sensors:compacted_until"
+
+BUCKET = BUCKETS[RollupResolution.FIVE_MINUTES]
+BUCKET_SIZE = timedelta(minutes=5)
+
+
+@dataclass
+class CompactionStats:
+    windows: int = 0
+    deleted: int = 0
+    created: int = 0
+    partitions: list[Partition] = field(default_factory=list)
+
+    @property
+    def removed(self) -> int:
+        return self.deleted - self.created
+
+
+def floor_to_bucket(value: datetime) -> datetime:
+    return value - timedelta(seconds=value.timestamp() % BUCKET_SIZE.total_seconds())
+
+
+def compact_window(start: datetime, end: datetime) -> CompactionStats:
+    """Replace raw readings of `[start, end)` with their 5 minute averages.
+
+    Only buckets holding a reading off the bucket start are touched, as
+    already compacted buckets contain a single aligned reading.
+    """
+    table = connection.ops.quote_name(SensorLog._meta.db_table)  # ty: ignore[unresolved-attribute]
+    stats = CompactionStats(windows=1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH deleted AS (DELETE FROM {table} "  # noqa: S608 # nosec B608
+            "WHERE created_at >= %s AND created_at < %s "
+            f"AND (sensor_id, {BUCKET}) IN ("
+            f"SELECT sensor_id, {BUCKET} FROM {table} "
+            f"WHERE created_at >= %s AND created_at < %s AND created_at <> {BUCKET}"
+            ") RETURNING sensor_id, temp, humidity, created_at) "
+            f"SELECT sensor_id, {BUCKET} AS bucket, ROUND(AVG(temp), 2), ROUND(AVG(humidity), 2), COUNT(*) "
+            "FROM deleted GROUP BY sensor_id, bucket",
+            [start, end, start, end],
+        )
+        buckets = cursor.fetchall()
+
+        SensorLog.objects.bulk_create(
+            SensorLog(sensor_id=sensor_id, temp=temp, humidity=humidity, created_at=bucket)
+            for sensor_id, bucket, temp, humidity, *_ in buckets
+        )
+
+    for *_, count in buckets:
+        stats.deleted += count
+        stats.created += 1
+    return stats
+
+
+def compact_sensor_logs(
+    before: datetime,
+    since: datetime | None = None,
+    window: timedelta = timedelta(hours=1),
+    callback: Callable[[CompactionStats], None] | None = None,
+) -> CompactionStats:
+    """Compact raw readings older than `before` one window per transaction.
+
+    `window` has to be a multiple of 5 minutes, keeping every transaction and
+    its locks short. Compaction resumes from where the previous run stopped,
+    `since` forces it to start from an earlier point, otherwise it starts
+    from the oldest reading. Monthly partitions ending within the compacted
+    range are returned in `partitions`, ready to be rewritten.
+    """
+    stats = CompactionStats()
+    start = since or cache.get(COMPACTED_UNTIL_CACHE_KEY)
+    if start is None:
+        first_log = SensorLog.objects.filter(created_at__lt=before).order_by("created_at").first()
+        if first_log is None:
+            return stats
+        start = first_log.created_at
+
+    # Windows must not split a bucket, or it would be compacted into two readings
+    start, before = floor_to_bucket(start), floor_to_bucket(before)
+    stats.partitions = [partition for partition in get_partitions() if start < partition.ends_at <= before]
+    while start < before:
+        end = min(start + window, before)
+        window_stats = compact_window(start, end)
+        stats.windows += window_stats.windows
+        stats.deleted += window_stats.deleted
+        stats.created += window_stats.created
+        if callback:
+            callback(stats)
+        start = end
+
+    cache.set(COMPACTED_UNTIL_CACHE_KEY, before, timeout=None)
+    if stats.deleted:
+        expire_chart_cache()
+    return stats
@@ -0,0 +1,119 @@
+"""Latest reading of every sensor kept in a Redis hash keyed by sensor_id.
+
+Ingest paths write to it after each commit, readers fall back to the
+database on a miss, so the store can be flushed at any time.
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from datetime import datetime
+from decimal import Decimal
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from odin.apps.sensors.models import Sensor, SensorLog
+
+
+logger = logging.getLogger(__name__)
+
+LATEST_READINGS_KEY = "odin:sensors:latest_readings"
+
+# Writes each sensor_id, payload, timestamp triple from ARGV unless the stored
+# reading is newer, so concurrent writers can not move a sensor back in time.
+# Returns the number of readings older than the stored ones
+SET_IF_NEWER_SCRIPT = """
+local older = 0
+for i = 1, #ARGV, 3 do
+    local current = redis.call("HGET", KEYS[1], ARGV[i])
+    local timestamp = current and cjson.decode(current)["timestamp"]
+    if not current or timestamp < tonumber(ARGV[i + 2]) then
+        redis.call("HSET", KEYS[1], ARGV[i], ARGV[i + 1])
+    elseif timestamp > tonumber(ARGV[i + 2]) then
+        older = older + 1
+    end
+end
+return older
+"""
+
+
+def serialize_reading(sensor_log: SensorLog) -> str:
+    return json.dumps(
+        {
+            "id": sensor_log.pk,
+            "temp": str(sensor_log.temp),
+            "humidity": str(sensor_log.humidity) if sensor_log.humidity is not None else None,
+            "synced_at": sensor_log.synced_at.isoformat() if sensor_log.synced_at else None,  # ty: ignore[unresolved-attribute]
+            "created_at": sensor_log.created_at.isoformat(),  # ty: ignore[unresolved-attribute]
+            "timestamp": sensor_log.created_at.timestamp(),  # ty: ignore[unresolved-attribute]
+        }
+    )
+
+
+def deserialize_reading(sensor_id: str, value: bytes) -> SensorLog:
+    data = json.loads(value)
+    return SensorLog(
+        id=data["id"],
+        sensor_id=sensor_id,
+        temp=Decimal(data["temp"]),
+        humidity=Decimal(data["humidity"]) if data["humidity"] is not None else None,
+        synced_at=datetime.fromisoformat(data["synced_at"]) if data["synced_at"] else None,
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+
+
+def set_latest_readings(sensor_logs: Iterable[SensorLog]) -> int:
+    """Store the newest of the given readings per sensor with a single script call.
+
+    Returns the number of sensors whose stored reading is newer than the given ones.
+    """
+    latest: dict[str, SensorLog] = {}
+    for sensor_log in sensor_logs:
+        sensor_id: str = sensor_log.sensor_id  # ty: ignore[invalid-assignment]
+        if sensor_id not in latest or latest[sensor_id].created_at < sensor_log.created_at:
+            latest[sensor_id] = sensor_log
+    if not latest:
+        return 0
+
+    args = []
+    for sensor_id, sensor_log in latest.items():
+        args.extend((sensor_id, serialize_reading(sensor_log), sensor_log.created_at.timestamp()))  # ty: ignore[unresolved-attribute]
+    try:
+        redis = get_redis_connection("default")
+        return redis.register_script(SET_IF_NEWER_SCRIPT)(keys=[LATEST_READINGS_KEY], args=args)
+    except RedisError as e:
+        logger.warning(f"Cannot update latest sensor readings: {e}")
+    return 0
+
+
+def get_latest_readings(sensor_ids: list[str]) -> dict[str, SensorLog]:
+    """Return stored readings for the given sensors with a single HMGET, missing sensors are left out."""
+    if not sensor_ids:
+        return {}
+
+    try:
+        values = get_redis_connection("default").hmget(LATEST_READINGS_KEY, sensor_ids)
+    except RedisError as e:
+        logger.warning(f"Cannot read latest sensor readings: {e}")
+        return {}
+    return {
+        sensor_id: deserialize_reading(sensor_id, value)
+        for sensor_id, value in zip(sensor_ids, values, strict=True)
+        if value is not None
+    }
+
+
+def prefetch_latest_logs(sensors: list[Sensor]) -> None:
+    """Fill `Sensor.latest_log` of all sensors from the store, with one query for the missing ones."""
+    sensor_ids: list[str] = list(dict.fromkeys(sensor.sensor_id for sensor in sensors))  # ty: ignore[invalid-assignment]
+    readings = get_latest_readings(sensor_ids)
+    if missing := [sensor_id for sensor_id in sensor_ids if sensor_id not in readings]:
+        sensor_logs = list(
+            SensorLog.objects.filter(sensor_id__in=missing).order_by("sensor_id", "-created_at").distinct("sensor_id")
+        )
+        set_latest_readings(sensor_logs)
+        readings.update((sensor_log.sensor_id, sensor_log) for sensor_log in sensor_logs)
+
+    for sensor in sensors:
+        sensor.__dict__["latest_log"] = readings.get(sensor.sensor_id)  # ty: ignore[invalid-argument-type]
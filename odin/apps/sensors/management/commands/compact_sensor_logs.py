@@ -0,0 +1,78 @@
+import logging
+from datetime import timedelta
+
+from command_log.management.commands import LoggedCommand
+from django.conf import settings
+from django.core.management import CommandError
+from django.db import connection
+from django.utils import timezone
+
+from odin.apps.sensors.compaction import CompactionStats, compact_sensor_logs
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.partitions import rewrite_partition
+from odin.apps.sensors.rollups import get_day_start
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(LoggedCommand):
+    help = description = (
+        "Compact raw sensor logs older than the retention period into 5 minute averages "
+        "and rewrite monthly partitions compacted to the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.SENSORS_LOGS_RAW_RETENTION_DAYS,
+            help="Age in days after which raw sensor logs are compacted",
+        )
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=60,
+            help="Minutes of readings compacted per transaction, must be a multiple of 5",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Check the whole history instead of resuming from the previous run",
+        )
+        parser.add_argument("--vacuum", action="store_true", help="Vacuum the table afterwards")
+
+    def log_progress(self, stats: CompactionStats) -> None:
+        if stats.windows % 24 == 0:
+            logger.info(f"Compacted {stats.windows} windows, removed {stats.removed} sensor logs so far")
+
+    def handle(self, *args, **options):
+        if options["window"] <= 0 or options["window"] % 5:
+            raise CommandError("--window must be a positive multiple of 5")
+
+        before = get_day_start(timezone.now() - timedelta(days=options["older_than"]))
+        first_log = SensorLog.objects.order_by("created_at").first() if options["full"] else None
+        stats = compact_sensor_logs(
+            before=before,
+            since=first_log.created_at if first_log else None,
+            window=timedelta(minutes=options["window"]),
+            callback=self.log_progress,
+        )
+
+        reclaimed = 0
+        for partition in stats.partitions:
+            size, rewritten_size = rewrite_partition(partition)
+            logger.info(f"Rewrote partition {partition.name} from {size} to {rewritten_size} bytes")
+            reclaimed += size - rewritten_size
+
+        if options["vacuum"]:
+            with connection.cursor() as cursor:
+                cursor.execute(f"VACUUM (ANALYZE) {connection.ops.quote_name(SensorLog._meta.db_table)}")  # ty: ignore[unresolved-attribute]
+
+        message = (
+            f"Compacted sensor logs before {before.isoformat()}: removed {stats.removed} rows "
+            f"({stats.deleted} raw into {stats.created} averaged), "
+            f"reclaimed {reclaimed} bytes from {len(stats.partitions)} partitions"
+        )
+        logger.info(message)
+        self.stdout.write(message)
@@ -1,48 +1,179 @@
 import logging
+import multiprocessing
+import queue
 import signal
 import sys
+import time
 from datetime import datetime
 
-from kafka import KafkaConsumer
+from kafka import ConsumerRebalanceListener, KafkaConsumer
 from kafka.errors import KafkaError
 
 from command_log.management.commands import LoggedCommand
 from django.conf import settings
+from django.db import connections
 from django.utils import timezone
 
 from odin.apps.core.kafka import KafkaService, MessageType
-from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.services import copy_sensor_logs, create_sensor_logs
 
 
 logger = logging.getLogger(__name__)
 
 
+class FlushOnRevokeListener(ConsumerRebalanceListener):
+    """Persist the pending batch and commit its offsets before partitions
+    move to another worker, so the new owner does not replay them."""
+
+    def __init__(self, command: "Command"):
+        self.command = command
+
+    def on_partitions_revoked(self, revoked):
+        if revoked:
+            logger.info(f"[{self.command.worker_name}] Partitions revoked: {sorted(tp.partition for tp in revoked)}")
+            self.command.flush()
+
+    def on_partitions_assigned(self, assigned):
+        logger.info(f"[{self.command.worker_name}] Partitions assigned: {sorted(tp.partition for tp in assigned)}")
+
+
 class Command(LoggedCommand):
     help = "Runs a Kafka consumer to listen for sensor data updates."
 
+    poll_timeout_ms = 1000
+    stats_interval = 60
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.running = True
         self.consumer: KafkaConsumer | None = None
+        self.worker_name = "main"
+        self.stats_queue: multiprocessing.Queue | None = None
+
+        self.batch: list[dict] = []
+        self.batch_size = settings.SENSORS_CONSUMER_BATCH_SIZE
+        self.flush_interval = settings.SENSORS_CONSUMER_FLUSH_INTERVAL
+        self.flushed_at = time.monotonic()
+        self.uncommitted = 0
+        self.use_copy = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SENSORS_CONSUMER_BATCH_SIZE,
+            help="Max number of readings written with a single insert",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            type=float,
+            default=settings.SENSORS_CONSUMER_FLUSH_INTERVAL,
+            help="Max number of seconds a reading waits in the batch before it is written",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Write batches with COPY instead of INSERT, useful for replaying large backlogs",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of consumer processes to fork, partitions are shared between them by the consumer group",
+        )
 
     def handle(self, *args, **options):
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
 
-        logger.info("Starting Kafka sensor consumer...")
-        self.consumer = KafkaService.get_consumer()
-        self.consumer.subscribe([settings.KAFKA_ODIN_TOPIC])
-        logger.info(f"Subscribed to topic: {settings.KAFKA_ODIN_TOPIC}")
+        self.batch_size = options.get("batch_size") or settings.SENSORS_CONSUMER_BATCH_SIZE
+        self.flush_interval = options.get("flush_interval") or settings.SENSORS_CONSUMER_FLUSH_INTERVAL
+        self.use_copy = options.get("copy", False)
+
+        if (workers := options.get("workers") or 1) > 1:
+            self.run_workers(workers=workers)
+        else:
+            self.consume()
+
+    def run_workers(self, workers: int) -> None:
+        logger.info(f"Starting {workers} Kafka sensor consumer workers...")
+
+        # Forked workers must not share the parent database connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        self.stats_queue = context.Queue()
+        processes = [
+            context.Process(target=self.run_worker, args=(f"worker-{index}",), name=f"consume_sensors-{index}")
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        totals: dict[str, int] = {}
+        reported_at = time.monotonic()
+        while self.running and all(process.is_alive() for process in processes):
+            try:
+                worker_name, rows = self.stats_queue.get(timeout=1)
+                totals[worker_name] = totals.get(worker_name, 0) + rows
+            except queue.Empty:
+                pass
+
+            if time.monotonic() - reported_at >= self.stats_interval:
+                self.log_throughput(totals, period=time.monotonic() - reported_at)
+                totals, reported_at = {}, time.monotonic()
+
+        if self.running:
+            logger.error("A consumer worker exited unexpectedly, stopping the others...")
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        self.log_throughput(totals, period=time.monotonic() - reported_at)
+        logger.info("All consumer workers stopped.")
+
+        if self.running:
+            sys.exit(1)
+
+    def run_worker(self, worker_name: str) -> None:
+        self.worker_name = worker_name
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+        self.consume()
+
+    @staticmethod
+    def log_throughput(totals: dict[str, int], period: float) -> None:
+        if not totals or not period:
+            return
+
+        rows = sum(totals.values())
+        per_worker = ", ".join(f"{name}: {count / period:.1f} rows/s" for name, count in sorted(totals.items()))
+        logger.info(f"Consumed {rows} sensor logs, {rows / period:.1f} rows/s ({per_worker})")
+
+    def consume(self) -> None:
+        logger.info(f"[{self.worker_name}] Starting Kafka sensor consumer...")
+        self.consumer = KafkaService.get_consumer(group_id=settings.KAFKA_SENSORS_CONSUMER_GROUP)
+        self.consumer.subscribe([settings.KAFKA_ODIN_TOPIC], listener=FlushOnRevokeListener(self))
+        logger.info(f"[{self.worker_name}] Subscribed to topic: {settings.KAFKA_ODIN_TOPIC}")
 
         try:
+            self.flushed_at = time.monotonic()
             while self.running:
-                records = self.consumer.poll(timeout_ms=1000)
+                records = self.consumer.poll(
+                    timeout_ms=self.poll_timeout_ms, max_records=max(1, self.batch_size - len(self.batch))
+                )
                 for _, messages in records.items():
                     for message in messages:
-                        if not self.running:
-                            break
+                        self.uncommitted += 1
                         if message.value and message.value.get("type") == MessageType.SENSOR_DATA_UPDATE.value:
-                            self.process_message(message=message.value)
+                            if reading := self.parse_message(message=message.value):
+                                self.batch.append(reading)
+
+                if len(self.batch) >= self.batch_size or time.monotonic() - self.flushed_at >= self.flush_interval:
+                    self.flush()
+
+            self.flush()
 
         except KafkaError as e:
             self.stderr.write(f"Kafka error: {e}")
@@ -50,29 +181,50 @@ class Command(LoggedCommand):
         finally:
             self.cleanup()
 
-    def process_message(self, message: dict) -> None:
-        data = message.get("data", {})
+    def parse_message(self, message: dict) -> dict | None:
+        data = message.get("data") or {}
         sensor_id = data.get("sensor_id")
-        timestamp = message.get("timestamp")
-        if not any((sensor_id, data, timestamp)):
+        temp = data.get("temp")
+        if not sensor_id or temp is None:
             logger.warning("Received sensor update message without a valid payload")
-            return
+            return None
 
-        temp = data.get("temp")
-        humidity = data.get("humidity")
+        timestamp = message.get("timestamp")
         created_at = datetime.fromisoformat(timestamp) if timestamp else timezone.now()
-        SensorLog.objects.create(sensor_id=sensor_id, temp=temp, humidity=humidity, created_at=created_at)
-
-        logger.info(
-            f"Created SensorLog for sensor {sensor_id}: temp={temp}, humidity={humidity}, created_at={created_at}"
-        )
+        return {"sensor_id": sensor_id, "temp": temp, "humidity": data.get("humidity"), "created_at": created_at}
+
+    def flush(self) -> None:
+        """Write the batch and only then commit offsets, so a crash in between
+        replays the batch instead of losing it."""
+        started_at = time.monotonic()
+        rows = len(self.batch)
+        if self.batch:
+            if self.use_copy:
+                duplicates = copy_sensor_logs(self.batch, chunk_size=rows).duplicates
+            else:
+                duplicates = create_sensor_logs(self.batch).duplicates
+            logger.info(
+                f"[{self.worker_name}] Created {rows - duplicates} SensorLogs, skipped {duplicates} duplicates "
+                f"in {time.monotonic() - started_at:.3f}s"
+            )
+
+        if self.uncommitted and self.consumer:
+            self.consumer.commit()
+
+        if rows and self.stats_queue is not None:
+            self.stats_queue.put((self.worker_name, rows))
+
+        self.batch = []
+        self.uncommitted = 0
+        self.flushed_at = time.monotonic()
 
     def signal_handler(self, signum, frame):
-        logger.info("\nShutting down consumer...")
+        logger.info(f"\n[{self.worker_name}] Shutting down consumer...")
         self.running = False
 
     def cleanup(self):
         if self.consumer:
+            # Closing the consumer leaves the group and triggers a rebalance right away
             self.consumer.close()
             self.consumer = None
-        logger.info("Consumer closed.")
+        logger.info(f"[{self.worker_name}] Consumer closed.")
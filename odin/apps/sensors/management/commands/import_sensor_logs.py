@@ -0,0 +1,60 @@
+import csv
+import json
+import logging
+import sys
+from collections.abc import Iterator
+from typing import TextIO
+
+from command_log.management.commands import LoggedCommand
+
+from odin.apps.sensors.services import IngestStats, copy_sensor_logs
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(LoggedCommand):
+    help = description = "Import historical sensor logs from a CSV or NDJSON file using COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=str, help="Path to the file to import, use - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "ndjson"),
+            default="csv",
+            help="Input format, CSV files must have a sensor_id,temp,humidity,created_at header",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10_000, help="Number of rows sent per COPY")
+
+    @staticmethod
+    def read_csv(file: TextIO) -> Iterator[dict]:
+        for row in csv.DictReader(file):
+            yield {
+                "sensor_id": row["sensor_id"],
+                "temp": row["temp"],
+                "humidity": row.get("humidity") or None,
+                "created_at": row.get("created_at") or None,
+            }
+
+    @staticmethod
+    def read_ndjson(file: TextIO) -> Iterator[dict]:
+        for line in file:
+            if line := line.strip():
+                yield json.loads(line)
+
+    def log_progress(self, stats: IngestStats) -> None:
+        logger.info(f"Imported {stats.rows} sensor logs, {stats.rows_per_second:.0f} rows/s")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            reader = self.read_ndjson if options["format"] == "ndjson" else self.read_csv
+            stats = copy_sensor_logs(reader(file), chunk_size=options["chunk_size"], callback=self.log_progress)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        self.stdout.write(
+            f"Imported {stats.rows} sensor logs in {stats.elapsed:.2f}s ({stats.rows_per_second:.0f} rows/s)"
+        )
@@ -0,0 +1,38 @@
+import logging
+
+from command_log.management.commands import LoggedCommand
+from django.conf import settings
+
+from odin.apps.sensors.partitions import create_future_partitions, remove_expired_partitions
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(LoggedCommand):
+    help = description = "Create upcoming monthly SensorLog partitions and detach or drop expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.SENSORS_LOGS_PARTITIONS_AHEAD,
+            help="Number of months to create partitions for ahead of the current one",
+        )
+        parser.add_argument(
+            "--retention",
+            type=int,
+            default=settings.SENSORS_LOGS_RETENTION_MONTHS,
+            help="Number of full months to keep, older partitions are detached",
+        )
+        parser.add_argument("--drop", action="store_true", help="Drop expired partitions instead of detaching them")
+
+    def handle(self, *args, **options):
+        created = create_future_partitions(months=options["ahead"])
+        logger.info(f"Created {len(created)} sensor log partitions")
+
+        if options["retention"] is None:
+            return
+
+        removed = remove_expired_partitions(retention=options["retention"], drop=options["drop"])
+        logger.info(f"{'Dropped' if options['drop'] else 'Detached'} {len(removed)} expired sensor log partitions")
@@ -0,0 +1,45 @@
+import logging
+from datetime import datetime
+
+from command_log.management.commands import LoggedCommand
+from django.core.management import CommandError
+from django.utils import timezone
+
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.rollups import rebuild_rollups
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_datetime(value: str) -> datetime:
+    result = datetime.fromisoformat(value)
+    return timezone.make_aware(result) if timezone.is_naive(result) else result
+
+
+class Command(LoggedCommand):
+    help = description = "Rebuild 5 minute, hourly and daily sensor log rollups from raw sensor logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=parse_datetime, help="Start of the range, defaults to the first sensor log")
+        parser.add_argument("--end", type=parse_datetime, help="End of the range, defaults to now")
+        parser.add_argument(
+            "--sensor-id",
+            action="append",
+            dest="sensor_ids",
+            help="Only rebuild rollups of this sensor, can be repeated",
+        )
+
+    def handle(self, *args, **options):
+        end = options["end"] or timezone.now()
+        start = options["start"]
+        if start is None:
+            first_log = SensorLog.objects.order_by("created_at").first()
+            start = first_log.created_at if first_log else end
+
+        if start > end:
+            raise CommandError("--start must be before --end")
+
+        rows = rebuild_rollups(start=start, end=end, sensor_ids=options["sensor_ids"])
+        logger.info(f"Rebuilt {rows} sensor log rollups from {start.isoformat()} to {end.isoformat()}")
+        self.stdout.write(f"Rebuilt {rows} sensor log rollups")
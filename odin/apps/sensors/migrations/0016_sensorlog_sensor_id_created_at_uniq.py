@@ -0,0 +1,32 @@
+# Generated by Django 6.0.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sensors", "0015_sensor_order"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM sensors_sensorlog
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, row_number() OVER (PARTITION BY sensor_id, created_at ORDER BY id) AS row_number
+                        FROM sensors_sensorlog
+                        WHERE created_at IS NOT NULL
+                    ) AS duplicates
+                    WHERE row_number > 1
+                );
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="sensorlog",
+            constraint=models.UniqueConstraint(
+                fields=("sensor_id", "created_at"), name="sensorlog_sensor_id_created_at_uniq"
+            ),
+        ),
+    ]
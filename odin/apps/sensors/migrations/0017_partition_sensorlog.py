@@ -0,0 +1,129 @@
+# Generated by Django 6.0.4 on 2026-10-18 12:00
+
+from datetime import UTC, datetime
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+COPY_ROWS = (
+    "INSERT INTO sensors_sensorlog (id, sensor_id, temp, humidity, synced_at, created_at) "
+    "SELECT id, sensor_id, temp, humidity, synced_at, created_at FROM sensors_sensorlog_old"
+)
+RESET_SEQUENCE = (
+    "SELECT setval(pg_get_serial_sequence('sensors_sensorlog', 'id'), COALESCE(MAX(id), 0) + 1, false) "
+    "FROM sensors_sensorlog"
+)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_sensor_logs(apps, schema_editor):
+    """Rebuild sensors_sensorlog as a table partitioned by month on created_at.
+
+    Partitions are created for every month that has data plus the next two,
+    the manage_sensor_partitions command keeps creating them from there on.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = 'sensors_sensorlog'::regclass AND contype = 'p'"
+        )
+        (primary_key,) = cursor.fetchone()
+        cursor.execute("SELECT MIN(created_at) FROM sensors_sensorlog")
+        (first_created_at,) = cursor.fetchone()
+
+    schema_editor.execute("ALTER TABLE sensors_sensorlog RENAME TO sensors_sensorlog_old")
+    schema_editor.execute(f'ALTER TABLE sensors_sensorlog_old DROP CONSTRAINT "{primary_key}"')
+    schema_editor.execute("ALTER TABLE sensors_sensorlog_old DROP CONSTRAINT sensorlog_sensor_id_created_at_uniq")
+    schema_editor.execute(
+        """
+        CREATE TABLE sensors_sensorlog (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            sensor_id varchar(32) NOT NULL,
+            temp numeric(7, 2) NOT NULL,
+            humidity numeric(7, 2) NULL,
+            synced_at timestamp with time zone NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            CONSTRAINT sensors_sensorlog_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT sensorlog_sensor_id_created_at_uniq UNIQUE (sensor_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    schema_editor.execute("CREATE TABLE sensors_sensorlog_default PARTITION OF sensors_sensorlog DEFAULT")
+
+    now = datetime.now(tz=UTC)
+    month = (first_created_at or now).astimezone(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month = add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), 2)
+    while month <= last_month:
+        schema_editor.execute(
+            f"CREATE TABLE sensors_sensorlog_p{month:%Y_%m} PARTITION OF sensors_sensorlog "
+            "FOR VALUES FROM (%s) TO (%s)",
+            [month, add_months(month, 1)],
+        )
+        month = add_months(month, 1)
+
+    schema_editor.execute(COPY_ROWS)
+    schema_editor.execute(RESET_SEQUENCE)
+    schema_editor.execute("DROP TABLE sensors_sensorlog_old")
+
+
+def unpartition_sensor_logs(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("ALTER TABLE sensors_sensorlog RENAME TO sensors_sensorlog_old")
+    schema_editor.execute("ALTER TABLE sensors_sensorlog_old DROP CONSTRAINT sensors_sensorlog_pkey")
+    schema_editor.execute("ALTER TABLE sensors_sensorlog_old DROP CONSTRAINT sensorlog_sensor_id_created_at_uniq")
+    schema_editor.execute(
+        """
+        CREATE TABLE sensors_sensorlog (
+            id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            sensor_id varchar(32) NOT NULL,
+            temp numeric(7, 2) NOT NULL,
+            humidity numeric(7, 2) NULL,
+            synced_at timestamp with time zone NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            CONSTRAINT sensorlog_sensor_id_created_at_uniq UNIQUE (sensor_id, created_at)
+        )
+        """
+    )
+    schema_editor.execute(COPY_ROWS)
+    schema_editor.execute(RESET_SEQUENCE)
+    schema_editor.execute("DROP TABLE sensors_sensorlog_old")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sensors", "0016_sensorlog_sensor_id_created_at_uniq"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM sensors_sensorlog
+                WHERE created_at IS NULL AND id NOT IN (
+                    SELECT MIN(id) FROM sensors_sensorlog WHERE created_at IS NULL GROUP BY sensor_id, synced_at
+                );
+                UPDATE sensors_sensorlog SET created_at = synced_at
+                WHERE created_at IS NULL AND NOT EXISTS (
+                    SELECT 1 FROM sensors_sensorlog AS existing
+                    WHERE existing.sensor_id = sensors_sensorlog.sensor_id
+                    AND existing.created_at = sensors_sensorlog.synced_at
+                );
+                DELETE FROM sensors_sensorlog WHERE created_at IS NULL;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="sensorlog",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(partition_sensor_logs, reverse_code=unpartition_sensor_logs),
+    ]
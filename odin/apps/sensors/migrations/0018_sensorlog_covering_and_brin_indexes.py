@@ -0,0 +1,31 @@
+# Generated by Django 6.0.4 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sensors", "0017_partition_sensorlog"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="sensorlog",
+            name="sensorlog_sensor_id_created_at_uniq",
+        ),
+        migrations.AddIndex(
+            model_name="sensorlog",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                autosummarize=True, fields=["created_at"], name="sensorlog_created_at_brin"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sensorlog",
+            constraint=models.UniqueConstraint(
+                fields=("sensor_id", "created_at"),
+                include=("temp", "humidity"),
+                name="sensorlog_sensor_id_created_at_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sensors", "0018_sensorlog_covering_and_brin_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SensorLogRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("sensor_id", models.CharField(max_length=32)),
+                (
+                    "resolution",
+                    models.CharField(choices=[("5m", "5 minutes"), ("1h", "1 hour"), ("1d", "1 day")], max_length=2),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("count", models.IntegerField(default=0)),
+                ("temp_min", models.DecimalField(decimal_places=2, max_digits=7)),
+                ("temp_max", models.DecimalField(decimal_places=2, max_digits=7)),
+                ("temp_sum", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("humidity_count", models.IntegerField(default=0)),
+                ("humidity_min", models.DecimalField(decimal_places=2, max_digits=7, null=True)),
+                ("humidity_max", models.DecimalField(decimal_places=2, max_digits=7, null=True)),
+                ("humidity_sum", models.DecimalField(decimal_places=2, max_digits=14, null=True)),
+            ],
+            options={
+                "verbose_name": "sensor log rollup",
+                "verbose_name_plural": "sensor log rollups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sensor_id", "resolution", "bucket"),
+                        name="sensorlogrollup_sensor_resolution_bucket_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -6,8 +6,10 @@ from typing import TYPE_CHECKING
 
 from django.conf import settings
 from django.contrib import admin
-from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import connection, models
 from django.db.models import query
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
@@ -22,6 +24,49 @@ class SensorType(models.TextChoices):
     ESP8266 = "ESP8266", "ESP8266"
 
 
+class LatestLogIterable(query.ModelIterable):
+    """Attach the latest reading to every fetched sensor with a single store lookup."""
+
+    def __iter__(self):
+        from odin.apps.sensors.latest_readings import prefetch_latest_logs
+
+        sensors = list(super().__iter__())
+        prefetch_latest_logs(sensors)
+        yield from sensors
+
+
+class LatestStateIterable(query.ModelIterable):
+    """Attach the latest reading, the relay and the linked sensor to every fetched sensor.
+
+    Relays and linked sensors take one query each, whatever the number of
+    sensors, and latest readings of both come from a single store lookup.
+    """
+
+    def __iter__(self):
+        from odin.apps.relays.models import Relay
+        from odin.apps.sensors.latest_readings import prefetch_latest_logs
+
+        sensors = list(super().__iter__())
+
+        # Ordered by creation, so the latest one wins as in `Sensor.linked_sensor` and `Sensor.relay`
+        linked_sensors, relays = {}, {}
+        if linked_sensor_ids := {sensor.linked_sensor_id for sensor in sensors if sensor.linked_sensor_id}:
+            linked_sensors = {
+                sensor.sensor_id: sensor
+                for sensor in Sensor.objects.filter(sensor_id__in=linked_sensor_ids).order_by("created_at")
+            }
+        if relay_ids := {sensor.relay_id for sensor in sensors if sensor.relay_id}:
+            relays = {
+                relay.relay_id: relay for relay in Relay.objects.filter(relay_id__in=relay_ids).order_by("created_at")
+            }
+
+        prefetch_latest_logs(sensors + list(linked_sensors.values()))
+        for sensor in sensors:
+            sensor.__dict__["linked_sensor"] = linked_sensors.get(sensor.linked_sensor_id)
+            sensor.__dict__["relay"] = relays.get(sensor.relay_id)
+        yield from sensors
+
+
 class SensorQuerySet(query.QuerySet):
     def active(self) -> query.QuerySet:
         return self.filter(is_active=True)
@@ -35,6 +80,16 @@ class SensorQuerySet(query.QuerySet):
     def esp8266(self) -> query.QuerySet:
         return self.filter(type=SensorType.ESP8266)
 
+    def with_latest_logs(self) -> query.QuerySet:
+        clone = self._chain()
+        clone._iterable_class = LatestLogIterable
+        return clone
+
+    def with_latest_state(self) -> query.QuerySet:
+        clone = self._chain()
+        clone._iterable_class = LatestStateIterable
+        return clone
+
 
 class SensorManager(models.Manager):
     def get_queryset(self) -> SensorQuerySet:
@@ -46,6 +101,12 @@ class SensorManager(models.Manager):
     def visible(self) -> query.QuerySet:
         return self.get_queryset().visible()
 
+    def with_latest_logs(self) -> query.QuerySet:
+        return self.get_queryset().with_latest_logs()
+
+    def with_latest_state(self) -> query.QuerySet:
+        return self.get_queryset().with_latest_state()
+
 
 class Sensor(models.Model):
     sensor_id = models.CharField(max_length=32, db_index=True, verbose_name=_("Sensor ID"))
@@ -81,8 +142,16 @@ class Sensor(models.Model):
         return f"Sensor {self.sensor_id}"
 
     @cached_property
-    def latest_log(self) -> SensorLog:
-        return SensorLog.objects.filter(sensor_id=self.sensor_id).order_by("created_at").last()
+    def latest_log(self) -> SensorLog | None:
+        from odin.apps.sensors.latest_readings import get_latest_readings, set_latest_readings
+
+        if sensor_log := get_latest_readings([self.sensor_id]).get(self.sensor_id):  # ty: ignore[invalid-argument-type]
+            return sensor_log
+
+        sensor_log = SensorLog.objects.filter(sensor_id=self.sensor_id).order_by("created_at").last()
+        if sensor_log:
+            set_latest_readings([sensor_log])
+        return sensor_log
 
     @property
     @admin.display(
@@ -138,13 +207,21 @@ class Sensor(models.Model):
 
 class SensorLogManager(models.Manager):
     def current(self) -> query.QuerySet:
-        sensor_ids = Sensor.objects.active().values_list("sensor_id", flat=True)
-        return (
-            self.get_queryset()
-            .filter(sensor_id__in=sensor_ids)
-            .order_by("sensor_id", "-created_at")
-            .distinct("sensor_id")
+        # One backward index lookup per active sensor instead of sorting the whole history
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sensors_table = connection.ops.quote_name(Sensor._meta.db_table)  # ty: ignore[unresolved-attribute]
+        latest = RawSQL(  # noqa: S611 # nosec B611
+            f"""({table}."sensor_id", {table}."created_at") IN (
+                SELECT s.sensor_id, l.created_at FROM {sensors_table} s
+                CROSS JOIN LATERAL (
+                    SELECT created_at FROM {table} WHERE sensor_id = s.sensor_id ORDER BY created_at DESC LIMIT 1
+                ) l
+                WHERE s.is_active
+            )""",  # noqa: S608 # nosec B608
+            (),
+            output_field=models.BooleanField(),
         )
+        return self.get_queryset().filter(latest).order_by("sensor_id")
 
 
 class SensorLog(models.Model):
@@ -153,13 +230,71 @@ class SensorLog(models.Model):
     humidity = models.DecimalField(max_digits=7, decimal_places=2, null=True)
 
     synced_at = models.DateTimeField(auto_now_add=True)
-    created_at = models.DateTimeField(null=True, default=None)
+    created_at = models.DateTimeField(default=timezone.now)
 
     objects = SensorLogManager()
 
     class Meta:
         verbose_name = _("sensor log")
         verbose_name_plural = _("sensor logs")
+        constraints = [
+            # Covers chart and latest reading lookups, so they are served by index only scans
+            models.UniqueConstraint(
+                fields=["sensor_id", "created_at"],
+                include=["temp", "humidity"],
+                name="sensorlog_sensor_id_created_at_uniq",
+            ),
+        ]
+        indexes = [
+            BrinIndex(fields=["created_at"], autosummarize=True, name="sensorlog_created_at_brin"),
+        ]
 
     def __str__(self):
         return f"Sensor {self.sensor_id} data at {self.synced_at}"
+
+
+class RollupResolution(models.TextChoices):
+    FIVE_MINUTES = "5m", _("5 minutes")
+    HOUR = "1h", _("1 hour")
+    DAY = "1d", _("1 day")
+
+
+class SensorLogRollup(models.Model):
+    sensor_id = models.CharField(max_length=32)
+    resolution = models.CharField(max_length=2, choices=RollupResolution.choices)
+    bucket = models.DateTimeField()
+
+    count = models.IntegerField(default=0)
+    temp_min = models.DecimalField(max_digits=7, decimal_places=2)
+    temp_max = models.DecimalField(max_digits=7, decimal_places=2)
+    temp_sum = models.DecimalField(max_digits=14, decimal_places=2)
+    humidity_count = models.IntegerField(default=0)
+    humidity_min = models.DecimalField(max_digits=7, decimal_places=2, null=True)
+    humidity_max = models.DecimalField(max_digits=7, decimal_places=2, null=True)
+    humidity_sum = models.DecimalField(max_digits=14, decimal_places=2, null=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        verbose_name = _("sensor log rollup")
+        verbose_name_plural = _("sensor log rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sensor_id", "resolution", "bucket"], name="sensorlogrollup_sensor_resolution_bucket_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Sensor {self.sensor_id} {self.resolution} rollup at {self.bucket}"
+
+    @property
+    def temp_avg(self) -> Decimal | None:
+        if not self.count:
+            return None
+        return self.temp_sum / self.count  # ty: ignore[unsupported-operator]
+
+    @property
+    def humidity_avg(self) -> Decimal | None:
+        if not self.humidity_count:
+            return None
+        return self.humidity_sum / self.humidity_count  # ty: ignore[unsupported-operator]
@@ -0,0 +1,148 @@
+"""Monthly range partitions of the SensorLog table.
+
+Partitions are named `sensors_sensorlog_pYYYY_MM` and cover one calendar
+month in UTC. Rows outside of any monthly partition land in the
+`sensors_sensorlog_default` partition, which is expected to stay empty.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from odin.apps.sensors.models import SensorLog
+
+
+logger = logging.getLogger(__name__)
+
+TABLE = SensorLog._meta.db_table  # ty: ignore[unresolved-attribute]
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{TABLE}_p(?P<year>\d{{4}})_(?P<month>\d{{2}})$")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    starts_at: datetime
+    ends_at: datetime
+
+
+def month_start(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def get_partition(month: datetime) -> Partition:
+    starts_at = month_start(month)
+    return Partition(name=f"{TABLE}_p{starts_at:%Y_%m}", starts_at=starts_at, ends_at=add_months(starts_at, 1))
+
+
+def get_partitions() -> list[Partition]:
+    """Return monthly partitions currently attached to the SensorLog table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        if match := PARTITION_NAME_RE.match(name):
+            partitions.append(get_partition(datetime(int(match["year"]), int(match["month"]), 1, tzinfo=UTC)))
+    return sorted(partitions, key=lambda partition: partition.starts_at)
+
+
+def get_partition_size(partition: Partition) -> int:
+    """Return the size of a partition on disk, including its indexes."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_total_relation_size(%s::regclass)", [partition.name])
+        return cursor.fetchone()[0]
+
+
+def rewrite_partition(partition: Partition) -> tuple[int, int]:
+    """Rewrite a partition with VACUUM FULL, returning its size before and after.
+
+    Plain vacuum only lets later inserts reuse the space of deleted rows, which
+    never happens in partitions of past months. VACUUM FULL holds an exclusive
+    lock on the partition while it runs and cannot run inside a transaction.
+    """
+    size = get_partition_size(partition)
+    with connection.cursor() as cursor:
+        cursor.execute(f"VACUUM (FULL, ANALYZE) {connection.ops.quote_name(partition.name)}")
+    return size, get_partition_size(partition)
+
+
+def create_partition(partition: Partition) -> None:
+    """Attach a monthly partition, moving matching rows out of the default
+    partition first, as Postgres refuses to create a partition that would
+    leave them in the wrong place."""
+    table, name, default = (connection.ops.quote_name(value) for value in (TABLE, partition.name, DEFAULT_PARTITION))
+    bounds = [partition.starts_at, partition.ends_at]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= %s AND created_at < %s)",  # noqa: S608 # nosec B608
+            bounds,
+        )
+        (has_rows,) = cursor.fetchone()
+        if has_rows:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {default} WHERE created_at >= %s AND created_at < %s RETURNING *) "  # noqa: S608 # nosec B608
+                f"INSERT INTO {name} SELECT * FROM moved",
+                bounds,
+            )
+            cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", bounds)
+            cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+        else:
+            cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)", bounds)
+
+
+def create_future_partitions(months: int, now: datetime | None = None) -> list[Partition]:
+    """Make sure partitions exist from the current month up to `months` ahead."""
+    current = month_start(now or timezone.now())
+    existing = {partition.name for partition in get_partitions()}
+
+    created = []
+    for offset in range(months + 1):
+        partition = get_partition(add_months(current, offset))
+        if partition.name not in existing:
+            create_partition(partition)
+            logger.info(f"Created partition {partition.name}")
+            created.append(partition)
+    return created
+
+
+def remove_expired_partitions(retention: int, drop: bool = False, now: datetime | None = None) -> list[Partition]:
+    """Detach partitions that ended more than `retention` months ago.
+
+    Detached partitions stay in the database as standalone tables until
+    they are archived or dropped, with `drop` they are dropped right away.
+    """
+    threshold = add_months(month_start(now or timezone.now()), -retention)
+    table = connection.ops.quote_name(TABLE)
+
+    removed = []
+    for partition in get_partitions():
+        if partition.ends_at > threshold:
+            continue
+
+        name = connection.ops.quote_name(partition.name)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+        logger.info(f"{'Dropped' if drop else 'Detached'} partition {partition.name}")
+        removed.append(partition)
+    return removed
@@ -0,0 +1,79 @@
+"""Pre-aggregated 5 minute, hourly and daily sensor log rollups.
+
+Rollups store min, max, sum and count per sensor and bucket, so they can be
+merged incrementally when new readings arrive and averaged on read.
+"""
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from odin.apps.sensors.models import RollupResolution, SensorLog, SensorLogRollup
+
+
+# Buckets are aligned to UTC for 5 minutes and to the local time zone for hours and days
+BUCKETS = {
+    RollupResolution.FIVE_MINUTES: "date_bin('5 minutes', created_at, TIMESTAMPTZ '2000-01-01 00:00:00+00')",
+    RollupResolution.HOUR: "date_trunc('hour', created_at, %s)",
+    RollupResolution.DAY: "date_trunc('day', created_at, %s)",
+}
+
+
+def get_rollup_sql(source: str) -> tuple[str, list]:
+    """Build an upsert merging readings selected from `source` into the rollups.
+
+    `source` is a table, a CTE or an aliased subquery with sensor_id, temp,
+    humidity and created_at columns, its own parameters go before the
+    returned ones.
+    """
+    table = connection.ops.quote_name(SensorLogRollup._meta.db_table)  # ty: ignore[unresolved-attribute]
+    buckets = ", ".join(f"('{resolution}', {bucket})" for resolution, bucket in BUCKETS.items())
+    params = [settings.TIME_ZONE for bucket in BUCKETS.values() if "%s" in bucket]
+    sql = (
+        f"INSERT INTO {table} AS rollup (sensor_id, resolution, bucket, count, temp_min, temp_max, temp_sum, "  # noqa: S608 # nosec B608
+        "humidity_count, humidity_min, humidity_max, humidity_sum) "
+        "SELECT sensor_id, buckets.resolution, buckets.bucket, COUNT(*), MIN(temp), MAX(temp), SUM(temp), "
+        "COUNT(humidity), MIN(humidity), MAX(humidity), SUM(humidity) "
+        f"FROM {source} CROSS JOIN LATERAL (VALUES {buckets}) AS buckets (resolution, bucket) "
+        "GROUP BY sensor_id, buckets.resolution, buckets.bucket "
+        "ON CONFLICT (sensor_id, resolution, bucket) DO UPDATE SET "
+        "count = rollup.count + EXCLUDED.count, "
+        "temp_min = LEAST(rollup.temp_min, EXCLUDED.temp_min), "
+        "temp_max = GREATEST(rollup.temp_max, EXCLUDED.temp_max), "
+        "temp_sum = rollup.temp_sum + EXCLUDED.temp_sum, "
+        "humidity_count = rollup.humidity_count + EXCLUDED.humidity_count, "
+        "humidity_min = LEAST(rollup.humidity_min, EXCLUDED.humidity_min), "
+        "humidity_max = GREATEST(rollup.humidity_max, EXCLUDED.humidity_max), "
+        "humidity_sum = COALESCE(rollup.humidity_sum + EXCLUDED.humidity_sum, rollup.humidity_sum, EXCLUDED.humidity_sum)"
+    )
+    return sql, params
+
+
+def get_day_start(value: datetime) -> datetime:
+    return timezone.localtime(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rebuild_rollups(start: datetime, end: datetime, sensor_ids: list[str] | None = None) -> int:
+    """Regenerate rollups from raw sensor logs, returns the number of rollups written.
+
+    The range is widened to whole local days, so every bucket touching it
+    is rebuilt from all of its readings.
+    """
+    start = get_day_start(start)
+    end = get_day_start(end) + timedelta(days=1)
+
+    rollups = SensorLogRollup.objects.filter(bucket__gte=start, bucket__lt=end)
+    sensor_logs = SensorLog.objects.filter(created_at__gte=start, created_at__lt=end)
+    if sensor_ids is not None:
+        rollups = rollups.filter(sensor_id__in=sensor_ids)
+        sensor_logs = sensor_logs.filter(sensor_id__in=sensor_ids)
+
+    source, source_params = sensor_logs.values("sensor_id", "temp", "humidity", "created_at").query.sql_with_params()
+    sql, params = get_rollup_sql(f"({source}) AS sensor_logs")
+    with transaction.atomic():
+        rollups.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*source_params, *params])
+            return cursor.rowcount
@@ -1,10 +1,43 @@
-from collections import defaultdict
+import csv
+import io
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from enum import StrEnum
+from functools import partial
+from itertools import batched
 
-from django.db.models import QuerySet
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 
-from odin.apps.sensors.models import SensorLog
+from odin.apps.core.events import EventType, publish_event
+from odin.apps.sensors.chart_cache import expire_chart_cache, get_cached_chart_rows, get_chart_cache_generation
+from odin.apps.sensors.charts import (
+    LTTB_SOURCE_POINTS,
+    ChartAggregate,
+    ChartMetric,
+    ChartResolution,
+    ChartSeries,
+    build_chart_series,
+    get_chart_rows,
+    get_chart_rows_batch,
+    get_chart_sql,
+    get_resolution,
+)
+from odin.apps.sensors.latest_readings import prefetch_latest_logs, set_latest_readings
+from odin.apps.sensors.models import Sensor, SensorLog, SensorType
+from odin.apps.sensors.rollups import get_rollup_sql
+
+
+logger = logging.getLogger(__name__)
+
+# Sensors without a reading this recent are shown as dead
+LIVE_READINGS_MAX_AGE = timedelta(minutes=10)
 
 
 def round_to_5_minutes(dt: datetime) -> datetime:
@@ -13,52 +46,412 @@ def round_to_5_minutes(dt: datetime) -> datetime:
     return dt.replace(minute=rounded_minutes, second=0, microsecond=0)
 
 
-def parse_timestamp_data(sensors: QuerySet, sensor_logs: QuerySet) -> dict[str, dict]:
-    timestamp_data = defaultdict(dict)
-    sensor_offset_map = {s.sensor_id: s.temp_offset for s in sensors}
+def get_chart_resolution(
+    start: datetime, end: datetime, resolution: ChartResolution, max_points: int | None = None
+) -> ChartResolution:
+    if resolution != ChartResolution.AUTO:
+        return resolution
+
+    # Downsampling needs finer buckets than it returns to pick the spikes from
+    source_points = max_points * LTTB_SOURCE_POINTS if max_points else None
+    return get_resolution(start, end, max_points=source_points)
+
+
+def get_chart_data(
+    sensors: QuerySet,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    resolution: ChartResolution = ChartResolution.AUTO,
+    aggregate: ChartAggregate = ChartAggregate.LAST,
+    max_points: int | None = None,
+    metric: ChartMetric = ChartMetric.TEMP,
+) -> ChartSeries:
+    end_dt = end or timezone.now()
+    start_dt = start or (end_dt - timedelta(hours=48))
+    resolution = get_chart_resolution(start_dt, end_dt, resolution, max_points=max_points)
+
+    chart_sensors = list(sensors.order_by("sensor_id").values_list("sensor_id", "name", f"{metric}_offset"))
+    if not chart_sensors:
+        return build_chart_series([], [])
+
+    # Only windows ending now keep growing by the same buckets
+    get_rows = get_chart_rows if end else get_cached_chart_rows
+    rows = get_rows(chart_sensors, start_dt, end_dt, resolution=resolution, aggregate=aggregate, metric=metric)
+    return build_chart_series(chart_sensors, rows, max_points=max_points)
+
+
+def get_chart_options(sensor_type: str, metric: ChartMetric = ChartMetric.TEMP) -> dict:
+    options = settings.CHART_OPTIONS.get(sensor_type, settings.CHART_OPTIONS["DS18B20"])
+    if metric == ChartMetric.HUMIDITY:
+        return {**options, **settings.CHART_HUMIDITY_OPTIONS}
+    return options
+
+
+def get_chart_batch(specs: list[dict]) -> list[tuple[ChartSeries, dict]]:
+    """Return the series and chart options of each spec with one sensor and one sensor log query.
+
+    A spec selects active sensors of a `type` or explicit `sensor_ids`, and takes the
+    `metric`, `start`, `end`, `resolution`, `aggregate` and `max_points` of `get_chart_data`.
+    """
+    now = timezone.now()
+    types = {spec["type"] for spec in specs if spec.get("type")}
+    sensor_ids = {sensor_id for spec in specs for sensor_id in spec.get("sensor_ids") or ()}
+    sensors = list(
+        Sensor.objects.filter(Q(is_active=True, type__in=types) | Q(sensor_id__in=sensor_ids))
+        .order_by("sensor_id")
+        .values_list("sensor_id", "name", "type", "is_active", "temp_offset", "humidity_offset", named=True)
+    )
+
+    charts, queries = [], []
+    for spec in specs:
+        metric = spec.get("metric", ChartMetric.TEMP)
+        max_points = spec.get("max_points")
+        end = spec.get("end") or now
+        start = spec.get("start") or (end - timedelta(hours=48))
+        resolution = get_chart_resolution(start, end, spec.get("resolution", ChartResolution.AUTO), max_points)
+
+        if spec.get("sensor_ids"):
+            selected = [sensor for sensor in sensors if sensor.sensor_id in spec["sensor_ids"]]
+        else:
+            selected = [sensor for sensor in sensors if sensor.is_active and sensor.type == spec["type"]]
+        chart_sensors = [(sensor.sensor_id, sensor.name, getattr(sensor, f"{metric}_offset")) for sensor in selected]
+        sensor_types = {sensor.type for sensor in selected}
+        sensor_type = spec.get("type") or (sensor_types.pop() if len(sensor_types) == 1 else SensorType.DS18B20)
+
+        aggregate = spec.get("aggregate", ChartAggregate.LAST)
+        queries.append(get_chart_sql(chart_sensors, start, end, resolution, aggregate, metric))
+        charts.append((chart_sensors, max_points, get_chart_options(sensor_type, metric)))
+
+    return [
+        (build_chart_series(chart_sensors, rows, max_points=max_points), options)
+        for (chart_sensors, max_points, options), rows in zip(charts, get_chart_rows_batch(queries), strict=True)
+    ]
+
+
+@dataclass
+class SensorsVersion:
+    key: str
+    last_modified: datetime | None
+
+
+def get_sensors_version(sensors: QuerySet) -> SensorsVersion:
+    """Return a version of the sensors and their readings that changes with either.
+
+    Readings come from the latest readings store, so no sensor log is queried while it is warm.
+    Readings inserted or rewritten behind the newest ones move the chart cache generation on.
+    """
+    sensor_list: list[Sensor] = list(sensors.only("sensor_id", "updated_at").order_by("sensor_id"))
+    prefetch_latest_logs(sensor_list)
+
+    parts, last_modified = [f"generation:{get_chart_cache_generation()}"], None
+    for sensor in sensor_list:
+        updated_at: datetime = sensor.updated_at  # ty: ignore[invalid-assignment]
+        modified = updated_at
+        if latest_log := sensor.latest_log:
+            modified = max(modified, latest_log.created_at)
+        parts.append(f"{sensor.sensor_id}:{updated_at.timestamp()}:{latest_log.pk if latest_log else ''}")
+        last_modified = max(last_modified, modified) if last_modified else modified
+    return SensorsVersion(key=",".join(parts), last_modified=last_modified)
+
+
+def store_sensor_logs(sensor_logs: list[SensorLog], oldest: datetime) -> None:
+    """Store the newest readings and expire cached charts and versions the inserted readings fall into.
+
+    Readings behind the newest stored one do not change the latest readings,
+    so they always move the generation on, however recent they are.
+    """
+    if set_latest_readings(sensor_logs):
+        expire_chart_cache()
+    else:
+        expire_chart_cache(oldest)
+
 
+class IngestStatus(StrEnum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+
+
+@dataclass
+class IngestResult:
+    sensor_logs: list[SensorLog] = field(default_factory=list)
+    statuses: list[IngestStatus] = field(default_factory=list)
+
+    @property
+    def created(self) -> int:
+        return len(self.sensor_logs)
+
+    @property
+    def duplicates(self) -> int:
+        return len(self.statuses) - len(self.sensor_logs)
+
+
+def normalize_created_at(value: datetime | str | None, default: datetime) -> datetime:
+    if not value:
+        return default
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def publish_sensor_logs(sensor_logs: list[SensorLog]) -> None:
+    """Push the newest reading of each sensor to live dashboards, with the sensor offsets applied.
+
+    Imported history is skipped, as dashboards only show current readings.
+    """
+    latest = {}
+    threshold = timezone.now() - LIVE_READINGS_MAX_AGE
     for sensor_log in sensor_logs:
-        log_time = sensor_log.created_at if sensor_log.created_at else sensor_log.synced_at
-        rounded_minutes = (log_time.minute // 5) * 5
-        timestamp_key = log_time.replace(minute=rounded_minutes, second=0, microsecond=0).isoformat()
+        if sensor_log.created_at < threshold:
+            continue
+        if sensor_log.sensor_id not in latest or sensor_log.created_at > latest[sensor_log.sensor_id].created_at:
+            latest[sensor_log.sensor_id] = sensor_log
 
-        if (
-            sensor_log.sensor_id not in timestamp_data[timestamp_key]
-            or log_time > timestamp_data[timestamp_key][sensor_log.sensor_id][0]
-        ):
-            temp_offset = sensor_offset_map.get(sensor_log.sensor_id, 0)
-            timestamp_data[timestamp_key][sensor_log.sensor_id] = (log_time, float(sensor_log.temp + temp_offset))
+    offsets = {
+        sensor_id: (temp_offset, humidity_offset)
+        for sensor_id, temp_offset, humidity_offset in Sensor.objects.filter(sensor_id__in=latest).values_list(
+            "sensor_id", "temp_offset", "humidity_offset"
+        )
+    }
+    readings = [
+        {
+            "sensor_id": sensor_id,
+            "temp": float(sensor_log.temp + offsets[sensor_id][0]),
+            "humidity": None if sensor_log.humidity is None else float(sensor_log.humidity + offsets[sensor_id][1]),
+            "created_at": sensor_log.created_at.isoformat(),
+        }
+        for sensor_id, sensor_log in latest.items()
+        if sensor_id in offsets
+    ]
+    if readings:
+        publish_event(EventType.SENSOR_LOGS, readings)
 
-    return timestamp_data
 
+def create_sensor_logs(readings: list[dict]) -> IngestResult:
+    """Persist a batch of readings with a single INSERT statement.
+
+    Readings already stored for the same sensor and time are skipped by the
+    `(sensor_id, created_at)` unique constraint and reported as duplicates,
+    the created ones are merged into the rollups by the same statement.
+    """
+    result = IngestResult()
+    if not readings:
+        return result
+
+    now = timezone.now()
+    rows = [
+        (
+            reading["sensor_id"],
+            reading["temp"],
+            reading.get("humidity"),
+            now,
+            normalize_created_at(reading.get("created_at"), default=now),
+        )
+        for reading in readings
+    ]
+
+    table = connection.ops.quote_name(SensorLog._meta.db_table)  # ty: ignore[unresolved-attribute]
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    rollup_sql, rollup_params = get_rollup_sql("inserted")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH inserted AS (INSERT INTO {table} (sensor_id, temp, humidity, synced_at, created_at) "  # noqa: S608 # nosec B608
+            f"VALUES {placeholders} ON CONFLICT (sensor_id, created_at) DO NOTHING "
+            "RETURNING id, sensor_id, temp, humidity, synced_at, created_at), "
+            f"rollups AS ({rollup_sql}) "
+            "SELECT id, sensor_id, temp, humidity, synced_at, created_at FROM inserted",
+            [*(value for row in rows for value in row), *rollup_params],
+        )
+        inserted = cursor.fetchall()
+
+    created = {(row[1], row[5]): row for row in inserted}
+    for sensor_id, _, _, _, created_at in rows:
+        if row := created.pop((sensor_id, created_at), None):
+            pk, sensor_id, temp, humidity, synced_at, created_at = row
+            result.sensor_logs.append(
+                SensorLog(
+                    id=pk, sensor_id=sensor_id, temp=temp, humidity=humidity, synced_at=synced_at, created_at=created_at
+                )
+            )
+            result.statuses.append(IngestStatus.CREATED)
+        else:
+            result.statuses.append(IngestStatus.DUPLICATE)
+
+    if result.sensor_logs:
+        transaction.on_commit(
+            partial(
+                store_sensor_logs, result.sensor_logs, min(sensor_log.created_at for sensor_log in result.sensor_logs)
+            )
+        )
+        transaction.on_commit(partial(publish_sensor_logs, result.sensor_logs))
+    if result.duplicates:
+        logger.warning(f"Skipped {result.duplicates} duplicate sensor logs out of {len(rows)}")
+    return result
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    duplicates: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def copy_sensor_logs(
+    readings: Iterable[dict],
+    chunk_size: int = 10_000,
+    callback: Callable[[IngestStats], None] | None = None,
+) -> IngestStats:
+    """Stream readings into the SensorLog table with `COPY FROM STDIN`.
+
+    Readings are consumed lazily and sent in chunks, so memory use depends on
+    `chunk_size` only. Each chunk is copied into a temporary staging table and
+    moved into SensorLog with `ON CONFLICT DO NOTHING` in its own transaction,
+    together with its rollups. `callback` is called after each one with the
+    running totals.
+    """
+    table = connection.ops.quote_name(SensorLog._meta.db_table)  # ty: ignore[unresolved-attribute]
+    columns = "sensor_id, temp, humidity, synced_at, created_at"
+    rollup_sql, rollup_params = get_rollup_sql("inserted")
+
+    stats = IngestStats()
+    started_at = time.monotonic()
+    with connection.cursor() as cursor:
+        for chunk in batched(readings, chunk_size, strict=False):
+            synced_at = timezone.now()
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for reading in chunk:
+                writer.writerow(
+                    (
+                        reading["sensor_id"],
+                        reading["temp"],
+                        reading.get("humidity"),
+                        synced_at.isoformat(),
+                        normalize_created_at(reading.get("created_at"), default=synced_at).isoformat(),
+                    )
+                )
+            buffer.seek(0)
+
+            with transaction.atomic():
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE IF NOT EXISTS sensorlog_staging ("
+                    "sensor_id varchar(32), temp numeric(7, 2), humidity numeric(7, 2), "
+                    "synced_at timestamptz, created_at timestamptz"
+                    ") ON COMMIT DELETE ROWS"
+                )
+                cursor.copy_expert(f"COPY sensorlog_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                # Returns the newest inserted reading per sensor along with the number of inserted rows
+                # and the oldest inserted reading time
+                cursor.execute(
+                    f"WITH inserted AS (INSERT INTO {table} ({columns}) SELECT {columns} FROM sensorlog_staging "  # noqa: S608 # nosec B608
+                    f"ON CONFLICT (sensor_id, created_at) DO NOTHING RETURNING id, {columns}), "
+                    f"rollups AS ({rollup_sql}) "
+                    f"SELECT DISTINCT ON (sensor_id) id, {columns}, COUNT(*) OVER (), MIN(created_at) OVER () "
+                    "FROM inserted "
+                    "ORDER BY sensor_id, created_at DESC",
+                    rollup_params,
+                )
+                latest = cursor.fetchall()
+                inserted, oldest = latest[0][-2:] if latest else (0, None)
+                sensor_logs = [
+                    SensorLog(
+                        id=pk,
+                        sensor_id=sensor_id,
+                        temp=temp,
+                        humidity=humidity,
+                        synced_at=synced_at,
+                        created_at=created_at,
+                    )
+                    for pk, sensor_id, temp, humidity, synced_at, created_at, *_ in latest
+                ]
+                if sensor_logs:
+                    transaction.on_commit(partial(store_sensor_logs, sensor_logs, oldest))
+                    transaction.on_commit(partial(publish_sensor_logs, sensor_logs))
+
+            stats.rows += inserted
+            stats.duplicates += len(chunk) - inserted
+            stats.elapsed = time.monotonic() - started_at
+            if callback:
+                callback(stats)
+
+    stats.elapsed = time.monotonic() - started_at
+    if stats.duplicates:
+        logger.warning(f"Skipped {stats.duplicates} duplicate sensor logs out of {stats.rows + stats.duplicates}")
+    return stats
+
+
+EXPORT_COLUMNS = ("sensor_id", "temp", "humidity", "created_at")
 
-def get_chart_data(sensors: QuerySet, start: datetime | None = None, end: datetime | None = None) -> dict:
-    end_dt = end or timezone.now()
-    start_dt = start or (end_dt - timedelta(hours=48))
 
-    sensor_ids = sensors.order_by("sensor_id").values_list("sensor_id", flat=True)
-    if not sensor_ids:
-        return {"timestamps": [], "sensors": []}
+@dataclass
+class ExportStats:
+    rows: int = 0
+    elapsed: float = 0.0
 
-    sensor_logs = SensorLog.objects.filter(
-        sensor_id__in=sensor_ids,
-        created_at__range=(start_dt, end_dt),
-    ).order_by("created_at")
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
 
-    timestamp_data = parse_timestamp_data(sensors=sensors, sensor_logs=sensor_logs)
-    sorted_timestamps = sorted(timestamp_data.keys())
 
-    sensor_data_list = []
-    sensor_map = {s.sensor_id: s.name for s in sensors}
-    for sensor_id in sensor_ids:
-        sensor_name = sensor_map.get(sensor_id, sensor_id)
+def export_sensor_logs(
+    sensor_ids: list[str] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    export_format: str = "csv",
+    chunk_size: int = 10_000,
+    callback: Callable[[ExportStats], None] | None = None,
+) -> Iterator[str]:
+    """Yield sensor logs as CSV or NDJSON text, one piece per chunk of rows.
 
-        data = []
-        for timestamp_key in sorted_timestamps:
-            sensor_entry = timestamp_data[timestamp_key].get(sensor_id)
-            temp_value = sensor_entry[1] if sensor_entry else None
-            data.append(temp_value)
+    Rows are read through a server-side cursor in `chunk_size` batches within a
+    transaction, so memory use does not depend on the exported range. They are ordered by sensor and time,
+    which the covering unique index returns without sorting. CSV output has the
+    header `import_sensor_logs` expects. `callback` is called after each chunk with
+    the running totals.
+    """
+    queryset = SensorLog.objects.order_by("sensor_id", "created_at").values_list(*EXPORT_COLUMNS)
+    if sensor_ids:
+        queryset = queryset.filter(sensor_id__in=sensor_ids)
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    if end:
+        queryset = queryset.filter(created_at__lte=end)
 
-        sensor_data_list.append({"sensor_id": sensor_id, "name": sensor_name, "data": data})
+    stats = ExportStats()
+    started_at = time.monotonic()
+    if export_format == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\r\n"
+    # Outside a transaction the cursor is declared WITH HOLD and materialized in full on commit
+    with transaction.atomic():
+        for chunk in batched(queryset.iterator(chunk_size=chunk_size), chunk_size, strict=False):
+            if export_format == "ndjson":
+                text = "".join(
+                    json.dumps(
+                        {
+                            "sensor_id": sensor_id,
+                            "temp": float(temp),
+                            "humidity": float(humidity) if humidity is not None else None,
+                            "created_at": created_at.isoformat(),
+                        }
+                    )
+                    + "\n"
+                    for sensor_id, temp, humidity, created_at in chunk
+                )
+            else:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(
+                    (sensor_id, temp, humidity, created_at.isoformat())
+                    for sensor_id, temp, humidity, created_at in chunk
+                )
+                text = buffer.getvalue()
 
-    return {"timestamps": sorted_timestamps, "sensors": sensor_data_list}
+            stats.rows += len(chunk)
+            stats.elapsed = time.monotonic() - started_at
+            if callback:
+                callback(stats)
+            yield text
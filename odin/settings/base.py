@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 import secrets
+from datetime import timedelta
 from decimal import Decimal
 from pathlib import Path
 
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "command_log",
     "django_rq",
@@ -237,6 +239,12 @@ MUSIC_PATH = os.getenv("MUSIC_PATH", "/mnt/data/Music/Library")
 
 DEFAULT_TEMP_HYSTERESIS = Decimal(0.5)
 
+SENSORS_LOGS_MAX_BATCH_SIZE = 1000
+
+# Charts in auto resolution use the finest bucket that keeps a series within this many points
+
+SENSORS_CHART_MAX_POINTS = int(os.getenv("SENSORS_CHART_MAX_POINTS", 600))
+
 CHART_OPTIONS = {
     "DS18B20": {
         "y_min": 20,
@@ -256,11 +264,43 @@ CHART_OPTIONS = {
     },
 }
 
+# Applied over the options of the sensor type in humidity charts
+
+CHART_HUMIDITY_OPTIONS = {
+    "y_min": 0,
+    "y_max": 100,
+    "y_title": f"{_('Humidity')} %",
+}
+
 # Kafka settings
 
 KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "192.168.1.100:9092").split(",")
 KAFKA_CORUSCANT_TOPIC = os.getenv("KAFKA_CORUSCANT_TOPIC", "coruscant")
 KAFKA_ODIN_TOPIC = os.getenv("KAFKA_ODIN_TOPIC", "odin")
+KAFKA_SENSORS_CONSUMER_GROUP = os.getenv("KAFKA_SENSORS_CONSUMER_GROUP", "odin-sensors")
+KAFKA_RELAYS_CONSUMER_GROUP = os.getenv("KAFKA_RELAYS_CONSUMER_GROUP", "odin-relays")
+
+# Kafka circuit breaker: request paths fail fast for the reset timeout after this many
+# consecutive failures, then a single probe is let through to check the broker is back
+
+KAFKA_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("KAFKA_CIRCUIT_FAILURE_THRESHOLD", 3))
+KAFKA_CIRCUIT_RESET_TIMEOUT = timedelta(seconds=int(os.getenv("KAFKA_CIRCUIT_RESET_TIMEOUT", 30)))
+KAFKA_CIRCUIT_PROBE_TIMEOUT = timedelta(seconds=int(os.getenv("KAFKA_CIRCUIT_PROBE_TIMEOUT", 15)))
+
+# Sensor consumer batching: flush on whichever limit is reached first
+
+SENSORS_CONSUMER_BATCH_SIZE = int(os.getenv("SENSORS_CONSUMER_BATCH_SIZE", 500))
+SENSORS_CONSUMER_FLUSH_INTERVAL = float(os.getenv("SENSORS_CONSUMER_FLUSH_INTERVAL", 5))
+
+# Sensor logs are partitioned by month: partitions are created ahead of time and
+# detached once they are older than the retention period, None keeps them forever
+
+SENSORS_LOGS_PARTITIONS_AHEAD = int(os.getenv("SENSORS_LOGS_PARTITIONS_AHEAD", 3))
+SENSORS_LOGS_RETENTION_MONTHS = int(os.getenv("SENSORS_LOGS_RETENTION_MONTHS", 0)) or None
+
+# Raw sensor logs older than this are compacted into 5 minute averages
+
+SENSORS_LOGS_RAW_RETENTION_DAYS = int(os.getenv("SENSORS_LOGS_RAW_RETENTION_DAYS", 30))
 
 # Web Push settings
 
@@ -1,5 +1,50 @@
 let temperatureChartInstance = null;
 
+const CHART_MEDIA_TYPE = 'application/vnd.odin.chart';
+
+// Decodes the columnar layout of ChartSeries.pack, timestamps are returned in milliseconds
+function decodeChartPayload(buffer) {
+    const view = new DataView(buffer);
+    const headerSize = view.getUint32(0, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerSize)));
+    const count = header.count;
+    let offset = 4 + headerSize;
+
+    const timestamps = new Array(count);
+    let epoch = header.start;
+    for (let index = 0; index < count; index++) {
+        epoch += view.getUint32(offset + index * 4, true);
+        timestamps[index] = epoch * 1000;
+    }
+    offset += count * 4;
+
+    const bitmapSize = Math.ceil(count / 32) * 4;
+    const sensors = header.sensors.map(sensor => {
+        const bitmap = new Uint8Array(buffer, offset, bitmapSize);
+        // Sections are 4 byte aligned, so values are read in place on little-endian hosts
+        const values = new Float32Array(buffer, offset + bitmapSize, count);
+        offset += bitmapSize + count * 4;
+
+        const data = new Array(count);
+        for (let index = 0; index < count; index++) {
+            data[index] = bitmap[index >> 3] & (1 << (index & 7)) ? Math.round(values[index] * 100) / 100 : null;
+        }
+        return { ...sensor, data };
+    });
+
+    return { timestamps, sensors };
+}
+
+function fetchChartData(url) {
+    return fetch(url, { headers: { Accept: CHART_MEDIA_TYPE } }).then(response => {
+        const contentType = response.headers.get('Content-Type') || '';
+        if (response.ok && contentType.startsWith(CHART_MEDIA_TYPE)) {
+            return response.arrayBuffer().then(decodeChartPayload);
+        }
+        return response.json();
+    });
+}
+
 function initTemperatureChart(chartData, options = null) {
     const canvas = document.getElementById('temperatureChart');
     if (!canvas) {
@@ -36,6 +81,7 @@ function initTemperatureChart(chartData, options = null) {
         const color = colors[index % colors.length];
 
         return {
+            sensorId: sensor.sensor_id,
             label: sensor.name || sensor.sensor_id,
             data: sensor.data,
             borderColor: color.border,
@@ -84,3 +130,34 @@ function initTemperatureChart(chartData, options = null) {
     });
 }
 
+// Applies pushed readings to a chart ending now: a reading within the last bucket replaces its
+// value, a later one starts a new bucket and the oldest one is dropped to keep the window size
+function patchTemperatureChart(readings) {
+    const chart = temperatureChartInstance;
+    if (!chart || chart.data.labels.length < 2) {
+        return;
+    }
+
+    const labels = chart.data.labels;
+    const datasets = chart.data.datasets;
+    const step = labels[labels.length - 1].getTime() - labels[labels.length - 2].getTime();
+    readings.forEach(reading => {
+        const dataset = datasets.find(item => item.sensorId === reading.sensor_id);
+        const time = new Date(reading.created_at).getTime();
+        const last = labels[labels.length - 1].getTime();
+        if (!dataset || time < last) {
+            return;
+        }
+
+        if (time >= last + step) {
+            labels.push(new Date(last + Math.floor((time - last) / step) * step));
+            labels.shift();
+            datasets.forEach(item => {
+                item.data.push(null);
+                item.data.shift();
+            });
+        }
+        dataset.data[dataset.data.length - 1] = reading.temp;
+    });
+    chart.update('none');
+}
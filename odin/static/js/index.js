@@ -1,3 +1,72 @@
+// Sensor readings and relay states are pushed by the server, other tiles are refreshed by a reload
+const EVENTS_URL = "/events/";
+const RELOAD_INTERVAL = 60 * 60 * 1000;
+const DISCONNECTED_RELOAD_INTERVAL = 5 * 60 * 1000;
+
+document.addEventListener("DOMContentLoaded", () => {
+  const formatDecimal = (value) => (value === null || value === undefined ? "" : value.toFixed(1));
+
+  const setLeadingText = (element, text) => {
+    if (element.firstChild?.nodeType === Node.TEXT_NODE) {
+      element.firstChild.nodeValue = text;
+    } else {
+      element.prepend(text);
+    }
+  };
+
+  const updateSensor = (reading) => {
+    document.querySelectorAll(`.sensor[data-sensor-id="${CSS.escape(reading.sensor_id)}"]`).forEach((sensorEl) => {
+      const tempEl = sensorEl.querySelector(".temp");
+      const humidityEl = sensorEl.querySelector(".humidity");
+      const chartEl = sensorEl.querySelector(".value img");
+      if (tempEl) {
+        setLeadingText(tempEl, formatDecimal(reading.temp));
+      }
+      if (humidityEl) {
+        setLeadingText(humidityEl, formatDecimal(reading.humidity));
+      }
+      if (chartEl) {
+        chartEl.src = `/api/v1/core/chart/?value=${reading.temp.toFixed(2)}&metric=temp`;
+      }
+    });
+    document.querySelectorAll(`.linked-sensor[data-sensor-id="${CSS.escape(reading.sensor_id)}"]`).forEach((linkedEl) => {
+      linkedEl.lastChild.nodeValue = ` ${formatDecimal(reading.temp)}°C`;
+    });
+  };
+
+  const updateRelay = (relay) => {
+    document.querySelectorAll(`[data-relay-id="${CSS.escape(relay.relay_id)}"]`).forEach((relayEl) => {
+      const indicatorEl = relayEl.querySelector(".alive-indicator");
+      const imageEl = relayEl.querySelector("img");
+      if (indicatorEl) {
+        indicatorEl.classList.toggle("heating", relay.state === "ON");
+        indicatorEl.classList.toggle("cooling", relay.state !== "ON");
+      }
+      if (imageEl) {
+        const image = relay.state === "OFF" ? "cooling" : "heating";
+        imageEl.src = `/static/img/${image}.svg`;
+        imageEl.alt = image;
+      }
+    });
+  };
+
+  setTimeout(() => window.location.reload(), RELOAD_INTERVAL);
+  if (!window.EventSource) {
+    setTimeout(() => window.location.reload(), DISCONNECTED_RELOAD_INTERVAL);
+    return;
+  }
+
+  const events = new EventSource(EVENTS_URL);
+  events.addEventListener("sensor_logs", (event) => JSON.parse(event.data).forEach(updateSensor));
+  events.addEventListener("relay_state", (event) => updateRelay(JSON.parse(event.data)));
+  // EventSource reconnects by itself, the page falls back to reloads while it cannot
+  setInterval(() => {
+    if (events.readyState !== EventSource.OPEN) {
+      window.location.reload();
+    }
+  }, DISCONNECTED_RELOAD_INTERVAL);
+});
+
 document.addEventListener("DOMContentLoaded", () => {
   const modal = document.getElementById("target-temp-modal");
   const form = document.getElementById("target-temp-form");
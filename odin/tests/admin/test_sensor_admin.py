@@ -4,7 +4,7 @@ from django.contrib.admin.templatetags.admin_urls import admin_urlname
 from django.urls import reverse
 from rest_framework import status
 
-from odin.apps.sensors.models import Sensor
+from odin.apps.sensors.models import Sensor, SensorLogRollup
 from odin.tests.factories import DjangoAdminUserFactory, SensorLogFactory
 
 
@@ -24,3 +24,8 @@ class TestSensorAdmin:
         client.force_login(self.user)
         response = client.get(reverse(admin_urlname(Sensor._meta, "change"), args=[self.sensor.id]), follow=True)
         assert response.status_code == status.HTTP_200_OK
+
+    def test_sensor_log_rollup_changelist(self, client):
+        client.force_login(self.user)
+        response = client.get(reverse(admin_urlname(SensorLogRollup._meta, "changelist")), follow=True)
+        assert response.status_code == status.HTTP_200_OK
@@ -1,9 +1,12 @@
+from unittest.mock import patch
+
 import pytest
 
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
+from odin.apps.core.events import EventType
 from odin.apps.relays.models import Relay, RelayType
 from odin.tests.factories import RelayFactory
 
@@ -128,6 +131,15 @@ class TestRelaysUpdateAPI:
         self.relay.refresh_from_db()
         assert self.relay.context["state"] == "ON"
 
+    @patch("odin.apps.relays.models.publish_event")
+    def test_relays__update_publishes_state(self, mock_publish, django_capture_on_commit_callbacks):
+        """Test that a state change is pushed to live dashboards, an unchanged one is not."""
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.patch(self.url, data={"context": {"state": "ON"}}, format="json")
+            self.client.patch(self.url, data={"context": {"state": "ON"}}, format="json")
+
+        mock_publish.assert_called_once_with(EventType.RELAY_STATE, {"relay_id": self.relay.relay_id, "state": "ON"})
+
     def test_relays__update_with_existing_context(self):
         """Test that update merges with existing context."""
         self.relay.context = {"existing_key": "existing_value", "state": "OFF"}
@@ -1,13 +1,17 @@
+import time
 from datetime import timedelta
+from unittest.mock import patch
 
 import pytest
 
 from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
 from odin.apps.sensors.models import SensorType
+from odin.tests.charts import unpack_chart_series
 from odin.tests.factories import SensorFactory, SensorLogFactory
 
 
@@ -116,6 +120,119 @@ class TestDS18B20DataAPI:
             # Timestamps and data should have the same length
             assert len(response.data["timestamps"]) == len(sensor_data["data"])
 
+    def test_ds18b20__resolution_and_aggregate(self):
+        """Test that readings are bucketed with the requested resolution and aggregate."""
+        sensor = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1")
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+        for minutes, temp in ((5, 21.0), (25, 23.0), (45, 22.0)):
+            SensorLogFactory(sensor_id=sensor.sensor_id, created_at=hour + timedelta(minutes=minutes), temp=temp)
+
+        response = self.client.get(self.url, {"resolution": "1h", "aggregate": "max"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["timestamps"] == [hour.isoformat()]
+        assert response.data["sensors"][0]["data"] == [23.0]
+
+    def test_ds18b20__max_points(self):
+        """Test that series are downsampled to max_points keeping the spike."""
+        sensor = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1", temp_offset=0)
+        start = timezone.now().replace(second=0, microsecond=0) - timedelta(hours=10)
+        for index in range(100):
+            temp = 95.0 if index == 42 else 60.0
+            SensorLogFactory(sensor_id=sensor.sensor_id, created_at=start + timedelta(minutes=index * 5), temp=temp)
+
+        response = self.client.get(self.url, {"resolution": "5m", "max_points": 10}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["timestamps"]) == len(response.data["sensors"][0]["data"]) == 10
+        assert max(response.data["sensors"][0]["data"]) == 95.0
+
+    def test_ds18b20__binary_payload(self):
+        """Test that the columnar binary payload is negotiated with the Accept header."""
+        sensor = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1", temp_offset=0)
+        SensorLogFactory(sensor_id=sensor.sensor_id, created_at=timezone.now() - timedelta(hours=1), temp=21.5)
+
+        response = self.client.get(self.url, HTTP_ACCEPT="application/vnd.odin.chart")
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/vnd.odin.chart"
+        assert unpack_chart_series(response.content) == self.client.get(self.url, format="json").data
+
+    def test_ds18b20__binary_payload_errors_as_json(self):
+        """Test that validation errors are sent as JSON when the binary payload is accepted."""
+        response = self.client.get(self.url, {"resolution": "2h"}, HTTP_ACCEPT="application/vnd.odin.chart")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response["Content-Type"] == "application/json"
+        assert "resolution" in response.json()
+
+    def test_ds18b20__not_modified(self):
+        """Test that polls without new readings get 304 without building the chart."""
+        sensor = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1")
+        SensorLogFactory(sensor_id=sensor.sensor_id, created_at=timezone.now() - timedelta(hours=1))
+        response = self.client.get(self.url, format="json")
+        assert response.status_code == status.HTTP_200_OK
+
+        with patch("odin.api.v1.sensors.views.get_chart_data") as get_chart_data:
+            not_modified = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=response["ETag"])
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        get_chart_data.assert_not_called()
+
+    def test_ds18b20__late_reading_changes_etag(self, django_capture_on_commit_callbacks):
+        """Test that a reading posted behind the newest one is not answered with 304."""
+        sensor = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1")
+        SensorLogFactory(sensor_id=sensor.sensor_id, created_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get(self.url, format="json")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            created = self.client.post(
+                reverse("api:v1:sensors:logs"),
+                data={"sensor_id": "sensor_1", "temp": 21.5, "created_at": timezone.now() - timedelta(minutes=2)},
+                format="json",
+            )
+        assert created.status_code == status.HTTP_201_CREATED
+
+        modified = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=response["ETag"])
+        assert modified.status_code == status.HTTP_200_OK
+        assert modified["ETag"] != response["ETag"]
+
+    def test_ds18b20__late_reading_ignores_if_modified_since(self, django_capture_on_commit_callbacks):
+        """Test that charts are validated by ETag alone, as late readings do not move the modification time."""
+        sensor = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1")
+        SensorLogFactory(sensor_id=sensor.sensor_id, created_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get(self.url, format="json")
+        assert "Last-Modified" not in response
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.post(
+                reverse("api:v1:sensors:logs"),
+                data={"sensor_id": "sensor_1", "temp": 21.5, "created_at": timezone.now() - timedelta(minutes=2)},
+                format="json",
+            )
+
+        modified = self.client.get(self.url, format="json", HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+        assert modified.status_code == status.HTTP_200_OK
+
+    def test_ds18b20__etag_depends_on_payload_format(self):
+        """Test that JSON and binary payloads have different ETags."""
+        SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1")
+
+        json_response = self.client.get(self.url, format="json")
+        binary_response = self.client.get(
+            self.url, HTTP_ACCEPT="application/vnd.odin.chart", HTTP_IF_NONE_MATCH=json_response["ETag"]
+        )
+        assert binary_response.status_code == status.HTTP_200_OK
+        assert binary_response["ETag"] != json_response["ETag"]
+        assert "Accept" in binary_response["Vary"]
+
+    @pytest.mark.parametrize("params", [{"resolution": "2h"}, {"aggregate": "median"}])
+    def test_ds18b20__invalid_resolution_or_aggregate(self, params):
+        """Test that unknown resolutions and aggregates are rejected."""
+        response = self.client.get(self.url, params, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("max_points", [2, 5001, "many"])
+    def test_ds18b20__invalid_max_points(self, max_points):
+        """Test that max_points out of range is rejected."""
+        response = self.client.get(self.url, {"max_points": max_points}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_ds18b20__multiple_sensors_and_logs(self):
         """Test with multiple sensors and multiple logs."""
         sensor1 = SensorFactory(type=SensorType.DS18B20, is_active=True, sensor_id="sensor_1", name="Sensor 1")
@@ -256,6 +373,62 @@ class TestESP8266DataAPI:
         assert "esp8266_2" in sensor_ids
 
 
+@pytest.mark.django_db
+class TestChartBatchAPI:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("api:v1:sensors:charts")
+
+    def test_charts__series_and_options(self, django_assert_num_queries):
+        """Test that all series and their options are returned with one sensor log query."""
+        SensorFactory(type=SensorType.DS18B20, sensor_id="sensor_1", temp_offset=0)
+        SensorFactory(type=SensorType.ESP8266, sensor_id="sensor_2", temp_offset=0, humidity_offset=0)
+        created_at = timezone.now() - timedelta(hours=1)
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at, temp=22.0)
+        SensorLogFactory(sensor_id="sensor_2", created_at=created_at, temp=23.0, humidity=40.0)
+        data = {
+            "series": [
+                {"type": SensorType.DS18B20},
+                {"type": SensorType.ESP8266},
+                {"sensor_ids": ["sensor_2"], "metric": "humidity", "resolution": "1h"},
+            ]
+        }
+
+        # Token, sensors and sensor logs lookups
+        with django_assert_num_queries(3):
+            response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        ds18b20, esp8266, humidity = response.data["series"]
+        assert ds18b20["sensors"][0]["data"] == [22.0]
+        assert ds18b20["options"]["y_max"] == 45
+        assert esp8266["sensors"][0]["data"] == [23.0]
+        assert esp8266["options"]["y_max"] == 32
+        assert humidity["sensors"][0]["data"] == [40.0]
+        assert humidity["options"]["y_max"] == 100
+        assert len(humidity["timestamps"]) == 1
+
+    @pytest.mark.parametrize(
+        "series",
+        [
+            [],
+            [{}],
+            [{"type": SensorType.DS18B20, "sensor_ids": ["sensor_1"]}],
+            [{"sensor_ids": []}],
+            [{"type": SensorType.DS18B20, "metric": "pressure"}],
+            [{"type": SensorType.DS18B20}] * 11,
+        ],
+    )
+    def test_charts__invalid_series(self, series):
+        """Test that specs without exactly one sensor selector or with unknown values are rejected."""
+        response = self.client.post(self.url, data={"series": series}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("method", ["get", "put", "patch", "delete"])
+    def test_charts__not_allowed_methods(self, method):
+        response = getattr(self.client, method)(self.url, format="json")
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
 @pytest.mark.django_db
 class TestChartOptionsAPI:
     def setup_method(self):
@@ -1,13 +1,15 @@
+import json
 from datetime import timedelta
 
 import pytest
 
+from django.test import override_settings
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from odin.apps.sensors.models import SensorType
+from odin.apps.sensors.models import SensorLog, SensorType
 from odin.tests.factories import SensorFactory, SensorLogDataFactory, SensorLogFactory
 
 
@@ -221,3 +223,119 @@ class TestSensorsLogsAPI:
         data = SensorLogDataFactory(sensor_id=sensor.sensor_id, temp=50.0)
         response = self.client.post(self.url, data=data, format="json")
         assert response.status_code == status.HTTP_201_CREATED
+
+    def test_sensors__create_batch(self):
+        """Test that an array of readings is stored with a per-item status list."""
+        sensor = SensorFactory()
+        data = [SensorLogDataFactory(sensor_id=sensor.sensor_id) for _ in range(3)]
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data == ["created", "created", "created"]
+        assert SensorLog.objects.filter(sensor_id=sensor.sensor_id).count() == 3
+
+    def test_sensors__create_batch_single_insert(self, django_assert_num_queries):
+        """Test that the whole array is written with a single statement."""
+        data = [SensorLogDataFactory() for _ in range(5)]
+
+        with django_assert_num_queries(1):
+            response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_sensors__create_batch_auto_assigns_created_at(self):
+        """Test that readings without created_at get the current time."""
+        data = [SensorLogDataFactory(sensor_id="sensor_1", created_at=None)]
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert SensorLog.objects.get(sensor_id="sensor_1").created_at is not None
+
+    def test_sensors__create_batch_invalid_item(self):
+        """Test that an invalid item rejects the whole array with per-item errors."""
+        data = [SensorLogDataFactory(), {"sensor_id": "sensor_1", "temp": "invalid"}]
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "temp" in response.data[1]
+        assert not SensorLog.objects.exists()
+
+    def test_sensors__create_batch_empty(self):
+        """Test that an empty array is rejected."""
+        response = self.client.post(self.url, data=[], format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @override_settings(SENSORS_LOGS_MAX_BATCH_SIZE=2)
+    def test_sensors__create_batch_too_large(self):
+        """Test that arrays above the batch limit are rejected."""
+        data = [SensorLogDataFactory() for _ in range(3)]
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not SensorLog.objects.exists()
+
+    def test_sensors__create_duplicate(self):
+        """Test that a retried reading is acknowledged without a new row."""
+        data = SensorLogDataFactory(created_at=timezone.now())
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert SensorLog.objects.count() == 1
+
+    def test_sensors__create_batch_with_duplicates(self):
+        """Test that duplicates in an array are skipped and reported per item."""
+        created_at = timezone.now()
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+        data = [
+            SensorLogDataFactory(sensor_id="sensor_1", created_at=created_at),
+            SensorLogDataFactory(sensor_id="sensor_2", created_at=created_at),
+            SensorLogDataFactory(sensor_id="sensor_2", created_at=created_at),
+        ]
+
+        response = self.client.post(self.url, data=data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data == ["duplicate", "created", "duplicate"]
+        assert SensorLog.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestSensorsLogsExportAPI:
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = reverse("api:v1:sensors:logs-export")
+        self.created_at = timezone.now().replace(microsecond=0) - timedelta(hours=1)
+        for sensor_id in ("sensor_1", "sensor_2", "sensor_3"):
+            SensorLogFactory(sensor_id=sensor_id, temp=21.5, humidity=40, created_at=self.created_at)
+
+    def test_sensors__export_csv(self):
+        """Test that logs of the requested sensors are streamed as CSV."""
+        response = self.client.get(self.url, {"sensor_id": ["sensor_1", "sensor_3"]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        assert 'filename="sensor_logs.csv"' in response["Content-Disposition"]
+        assert b"".join(response.streaming_content).decode().splitlines() == [
+            "sensor_id,temp,humidity,created_at",
+            f"sensor_1,21.50,40.00,{self.created_at.isoformat()}",
+            f"sensor_3,21.50,40.00,{self.created_at.isoformat()}",
+        ]
+
+    def test_sensors__export_ndjson_range(self):
+        """Test that logs outside of the range are left out of NDJSON exports."""
+        SensorLogFactory(sensor_id="sensor_1", created_at=self.created_at - timedelta(days=1))
+
+        response = self.client.get(
+            self.url, {"output": "ndjson", "start": (self.created_at - timedelta(minutes=1)).isoformat()}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)["sensor_id"] for line in lines] == ["sensor_1", "sensor_2", "sensor_3"]
+
+    def test_sensors__export_invalid_output(self):
+        """Test that unknown output formats are rejected."""
+        response = self.client.get(self.url, {"output": "xlsx"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -3,11 +3,13 @@ from decimal import Decimal
 
 import pytest
 
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
 from odin.apps.sensors.models import Sensor, SensorLog, SensorType
+from odin.apps.sensors.services import create_sensor_logs
 from odin.tests.factories import SensorFactory, SensorLogFactory
 
 
@@ -58,6 +60,65 @@ class TestSensorsAPI:
         assert response.data["count"] == 0
         assert response.data["results"] == []
 
+    def test_sensors__list_query_count_does_not_depend_on_sensors(self, django_assert_max_num_queries):
+        """Test that latest readings of all sensors are loaded with a constant number of queries."""
+        for _ in range(10):
+            sensor: Sensor = SensorFactory()  # noqa
+            SensorLogFactory(sensor_id=sensor.sensor_id)
+
+        with django_assert_max_num_queries(5):
+            response = self.client.get(self.url, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert all(result["temp"] is not None for result in response.data["results"])
+
+    def test_sensors__list_not_modified(self, django_assert_num_queries):
+        """Test that polls without changes get 304 without querying sensor logs."""
+        sensor = SensorFactory()
+        SensorLogFactory(sensor_id=sensor.sensor_id)
+        response = self.client.get(self.url, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Last-Modified"]
+
+        # Token and sensors lookups, the latest reading comes from the store
+        with django_assert_num_queries(2):
+            not_modified = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=response["ETag"])
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified["ETag"] == response["ETag"]
+
+    def test_sensors__list_modified_by_new_reading(self, django_capture_on_commit_callbacks):
+        """Test that a new reading changes the ETag."""
+        sensor = SensorFactory()
+        etag = self.client.get(self.url, format="json")["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_sensor_logs(
+                [
+                    {
+                        "sensor_id": sensor.sensor_id,
+                        "temp": Decimal("21.00"),
+                        "humidity": Decimal("40.00"),
+                        "created_at": timezone.now(),
+                    }
+                ]
+            )
+
+        response = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert response.data["results"][0]["temp"] == "21.00"
+
+    def test_sensors__list_modified_by_sensor_change(self):
+        """Test that changing a sensor changes the ETag."""
+        sensor = SensorFactory(name="Room")
+        etag = self.client.get(self.url, format="json")["ETag"]
+
+        sensor.name = "Hall"
+        sensor.save()
+
+        response = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["name"] == "Hall"
+
     def test_sensors__list_only_active(self):
         """Test that list returns only active sensors."""
         active_sensor = SensorFactory(is_active=True)
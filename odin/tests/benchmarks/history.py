@@ -0,0 +1,71 @@
+"""Bulk generated sensor log history shared by the benchmarks.
+
+Benchmarks are skipped unless BENCHMARK_SENSOR_LOGS is set to the total
+number of rows to generate, e.g. `BENCHMARK_SENSOR_LOGS=20000000 pytest odin/tests/benchmarks`.
+Results are recorded as test properties for `--junitxml` and logged, add
+`--log-cli-level=INFO` to see them in the terminal.
+"""
+
+import logging
+import os
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+import pytest
+
+from django.db import connection
+
+from odin.apps.sensors.partitions import add_months, create_partition, get_partition, get_partitions, month_start
+
+
+logger = logging.getLogger(__name__)
+
+TOTAL_ROWS = int(os.getenv("BENCHMARK_SENSOR_LOGS", "0"))
+READING_INTERVAL = timedelta(minutes=1)
+
+benchmark = pytest.mark.skipif(not TOTAL_ROWS, reason="BENCHMARK_SENSOR_LOGS is not set")
+
+INSERT_HISTORY = """
+    INSERT INTO sensors_sensorlog (sensor_id, temp, humidity, synced_at, created_at)
+    SELECT s.sensor_id, round((18 + random() * 8)::numeric, 2), round((40 + random() * 20)::numeric, 2), t, t
+    FROM sensors_sensor s
+    CROSS JOIN generate_series(%s::timestamptz, %s::timestamptz - %s::interval, %s::interval) t
+"""
+
+
+def create_partitions(start: datetime, end: datetime) -> None:
+    existing = set(get_partitions())
+    month = month_start(start)
+    while month < end:
+        if (partition := get_partition(month)) not in existing:
+            create_partition(partition)
+        month = add_months(month, 1)
+
+
+def insert_history(start: datetime, end: datetime) -> None:
+    """Insert a reading per minute for every sensor between start and end."""
+    create_partitions(start, end)
+    with connection.cursor() as cursor:
+        cursor.execute(INSERT_HISTORY, [start, end, READING_INTERVAL, READING_INTERVAL])
+        cursor.execute("ANALYZE sensors_sensorlog")
+
+
+def best_of(callback: Callable, runs: int = 5) -> float:
+    """Return the fastest of several runs in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        callback()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return min(timings)
+
+
+def report(record_property: Callable, label: str, **results: float) -> None:
+    """Record one row of results, timings in milliseconds, under `label`."""
+    for name, value in results.items():
+        record_property(f"{label} {name}", value)
+    values = (
+        f"{name} {value:.2f}" if isinstance(value, float) else f"{name} {value}" for name, value in results.items()
+    )
+    logger.info(f"{label}: {', '.join(values)}")
@@ -0,0 +1,43 @@
+"""Live chart data time with warm cached buckets against querying the whole window."""
+
+from datetime import timedelta
+
+import pytest
+
+from django.utils import timezone
+
+from odin.apps.sensors.charts import ChartResolution
+from odin.apps.sensors.models import Sensor
+from odin.apps.sensors.services import get_chart_data
+from odin.tests.benchmarks.history import READING_INTERVAL, TOTAL_ROWS, benchmark, best_of, insert_history, report
+from odin.tests.factories import SensorFactory
+
+
+SENSORS = 10
+RANGES = (timedelta(days=2), timedelta(days=7), timedelta(days=30))
+
+pytestmark = benchmark
+
+
+@pytest.mark.django_db
+class TestChartCacheBenchmark:
+    def setup_method(self):
+        for index in range(SENSORS):
+            SensorFactory(sensor_id=f"sensor_{index}", temp_offset=f"{index % 3 - 1}.25")
+
+    def test_get_chart_data__warm_cache_faster_than_window_query(self, record_property):
+        now = timezone.now()
+        history = min(READING_INTERVAL * (TOTAL_ROWS // SENSORS), max(RANGES))
+        insert_history(now - history, now)
+        sensors = Sensor.objects.all()
+
+        for chart_range in RANGES:
+            start = timezone.now() - chart_range
+            kwargs = {"start": start, "resolution": ChartResolution.FIFTEEN_MINUTES}
+            cached = get_chart_data(sensors, **kwargs)
+            assert cached.as_dict() == get_chart_data(sensors, end=timezone.now(), **kwargs).as_dict()
+
+            warm = best_of(lambda kwargs=kwargs: get_chart_data(sensors, **kwargs))
+            uncached = best_of(lambda kwargs=kwargs: get_chart_data(sensors, end=timezone.now(), **kwargs))
+            report(record_property, f"{chart_range.days}d", warm=warm, uncached=uncached)
+            assert warm < uncached
@@ -0,0 +1,84 @@
+"""Chart data build time against the previous per row builder."""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from odin.apps.sensors.charts import ChartResolution
+from odin.apps.sensors.models import Sensor, SensorLog
+from odin.apps.sensors.services import get_chart_data
+from odin.tests.benchmarks.history import READING_INTERVAL, TOTAL_ROWS, benchmark, best_of, insert_history, report
+from odin.tests.factories import SensorFactory
+
+
+SENSORS = 10
+RANGES = (timedelta(days=2), timedelta(days=7), timedelta(days=30))
+
+pytestmark = benchmark
+
+
+def per_row_chart_data(sensors: QuerySet, start: datetime, end: datetime) -> dict:
+    """Previous implementation, kept for comparison."""
+    sensor_ids = sensors.order_by("sensor_id").values_list("sensor_id", flat=True)
+    sensor_logs = (
+        SensorLog.objects.filter(sensor_id__in=sensor_ids, created_at__range=(start, end))
+        .order_by("created_at")
+        .values_list("sensor_id", "temp", "created_at", named=True)
+    )
+
+    timestamp_data = defaultdict(dict)
+    sensor_offset_map = {s.sensor_id: s.temp_offset for s in sensors}
+    for sensor_log in sensor_logs:
+        log_time = sensor_log.created_at
+        timestamp_key = log_time.replace(minute=(log_time.minute // 5) * 5, second=0, microsecond=0).isoformat()
+        if (
+            sensor_log.sensor_id not in timestamp_data[timestamp_key]
+            or log_time > timestamp_data[timestamp_key][sensor_log.sensor_id][0]
+        ):
+            temp_offset = sensor_offset_map.get(sensor_log.sensor_id, 0)
+            timestamp_data[timestamp_key][sensor_log.sensor_id] = (log_time, float(sensor_log.temp + temp_offset))
+
+    sorted_timestamps = sorted(timestamp_data.keys())
+    sensor_map = {s.sensor_id: s.name for s in sensors}
+    return {
+        "timestamps": sorted_timestamps,
+        "sensors": [
+            {
+                "sensor_id": sensor_id,
+                "name": sensor_map.get(sensor_id, sensor_id),
+                "data": [
+                    entry[1] if (entry := timestamp_data[key].get(sensor_id)) else None for key in sorted_timestamps
+                ],
+            }
+            for sensor_id in sensor_ids
+        ],
+    }
+
+
+@pytest.mark.django_db
+class TestChartDataBenchmark:
+    def setup_method(self):
+        for index in range(SENSORS):
+            SensorFactory(sensor_id=f"sensor_{index}", temp_offset=f"{index % 3 - 1}.25")
+
+    def test_get_chart_data__faster_than_per_row_builder(self, record_property):
+        end = timezone.now().replace(second=0, microsecond=0)
+        history = min(READING_INTERVAL * (TOTAL_ROWS // SENSORS), max(RANGES))
+        insert_history(end - history, end)
+        sensors = Sensor.objects.all()
+
+        for chart_range in RANGES:
+            start = end - chart_range
+            # The previous builder only had 5 minute buckets
+            kwargs = {"start": start, "end": end, "resolution": ChartResolution.FIVE_MINUTES}
+            assert get_chart_data(sensors, **kwargs).as_dict() == per_row_chart_data(sensors, start, end)
+
+            rows = SensorLog.objects.filter(created_at__range=(start, end)).count()
+            bucketed = best_of(lambda kwargs=kwargs: get_chart_data(sensors, **kwargs).as_dict(), runs=3)
+            per_row = best_of(lambda start=start: per_row_chart_data(sensors, start, end), runs=3)
+            report(record_property, f"{chart_range.days}d", rows=rows, bucketed=bucketed, per_row=per_row)
+            assert bucketed < per_row
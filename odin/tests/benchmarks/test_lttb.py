@@ -0,0 +1,51 @@
+"""LTTB downsampling time against a per point reference implementation."""
+
+import numpy as np
+
+from odin.apps.sensors.charts import lttb
+from odin.tests.benchmarks.history import READING_INTERVAL, TOTAL_ROWS, benchmark, best_of, report
+
+
+MAX_POINTS = 600
+
+pytestmark = benchmark
+
+
+def per_point_lttb(x: list[float], y: list[float], max_points: int) -> list[int]:
+    """Reference implementation walking every point in Python."""
+    size = len(x)
+    every = (size - 2) / (max_points - 2)
+    selected = [0]
+    previous = 0
+    for index in range(max_points - 2):
+        next_start = int(np.floor((index + 1) * every)) + 1
+        next_end = min(int(np.floor((index + 2) * every)) + 1, size)
+        next_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        next_y = sum(y[next_start:next_end]) / (next_end - next_start)
+
+        largest_area, largest = -1.0, 0
+        for point in range(int(np.floor(index * every)) + 1, next_start):
+            area = abs(
+                (x[previous] - next_x) * (y[point] - y[previous]) - (x[previous] - x[point]) * (next_y - y[previous])
+            )
+            if area > largest_area:
+                largest_area, largest = area, point
+        selected.append(largest)
+        previous = largest
+    selected.append(size - 1)
+    return selected
+
+
+class TestLTTBBenchmark:
+    def test_lttb__faster_than_per_point_reference(self, record_property):
+        rng = np.random.default_rng(0)
+        x = np.arange(TOTAL_ROWS, dtype=np.float64) * READING_INTERVAL.total_seconds()
+        y = 60 + np.cumsum(rng.normal(0, 0.05, TOTAL_ROWS))
+        x_list, y_list = (x - x[0]).tolist(), y.tolist()
+
+        assert lttb(x, y, MAX_POINTS).tolist() == per_point_lttb(x_list, y_list, MAX_POINTS)
+
+        vectorized = best_of(lambda: lttb(x, y, MAX_POINTS))
+        per_point = best_of(lambda: per_point_lttb(x_list, y_list, MAX_POINTS), runs=1)
+        report(record_property, f"{TOTAL_ROWS} points", vectorized=vectorized, per_point=per_point)
+        assert vectorized < per_point
@@ -0,0 +1,78 @@
+"""Latest reading lookup cost against a growing sensor log history.
+
+Partitions for the whole history are created upfront, the lookup still
+probes each of them once per sensor, which retention keeps bounded.
+"""
+
+import json
+
+import pytest
+
+from django.db.models import query
+from django.utils import timezone
+
+from odin.apps.sensors.models import Sensor, SensorLog
+from odin.tests.benchmarks.history import (
+    READING_INTERVAL,
+    TOTAL_ROWS,
+    benchmark,
+    best_of,
+    create_partitions,
+    insert_history,
+    report,
+)
+from odin.tests.factories import SensorFactory
+
+
+SENSORS = 20
+STAGES = 4
+
+pytestmark = benchmark
+
+
+def distinct_on_current() -> query.QuerySet:
+    """Previous implementation, kept for comparison."""
+    sensor_ids = Sensor.objects.active().values_list("sensor_id", flat=True)
+    return SensorLog.objects.filter(sensor_id__in=sensor_ids).order_by("sensor_id", "-created_at").distinct("sensor_id")
+
+
+def measure(queryset: query.QuerySet) -> tuple[float, int]:
+    """Return the best run in milliseconds and the buffers touched by the query."""
+    plan = json.loads(queryset.explain(format="json", analyze=True, buffers=True))[0]["Plan"]
+    return best_of(lambda: list(queryset.all())), plan["Shared Hit Blocks"] + plan["Shared Read Blocks"]
+
+
+@pytest.mark.django_db
+class TestSensorLogsCurrentBenchmark:
+    def setup_method(self):
+        for index in range(SENSORS):
+            SensorFactory(sensor_id=f"sensor_{index}")
+
+    def test_current__cost_does_not_grow_with_history(self, record_property):
+        stage = READING_INTERVAL * (TOTAL_ROWS // SENSORS // STAGES)
+        end = timezone.now().replace(second=0, microsecond=0)
+        create_partitions(end - stage * STAGES, end)
+
+        results = []
+        for number in range(1, STAGES + 1):
+            # History grows backwards, so the latest readings stay the same at every stage
+            insert_history(end - stage * number, end - stage * (number - 1))
+            rows = SensorLog.objects.count()
+            current, current_buffers = measure(SensorLog.objects.current())
+            previous, previous_buffers = measure(distinct_on_current())
+            results.append((rows, current, current_buffers, previous, previous_buffers))
+
+        for rows, current, current_buffers, previous, previous_buffers in results:
+            report(
+                record_property,
+                f"{rows} rows",
+                current=current,
+                current_buffers=current_buffers,
+                distinct_on=previous,
+                distinct_on_buffers=previous_buffers,
+            )
+
+        assert SensorLog.objects.current().count() == SENSORS
+        first, last = results[0], results[-1]
+        assert last[2] <= first[2] * 1.5
+        assert last[4] > first[4] * 1.5
@@ -0,0 +1,34 @@
+"""Chart payload decoding shared by the chart tests."""
+
+import json
+import struct
+from datetime import UTC, datetime
+
+import numpy as np
+
+
+def unpack_chart_series(payload: bytes) -> dict:
+    """Decode the binary layout the way `static/js/chart.js` does."""
+    (header_size,) = struct.unpack_from("<I", payload)
+    header = json.loads(payload[4 : 4 + header_size])
+    count, offset = header["count"], 4 + header_size
+    deltas = np.frombuffer(payload, dtype="<u4", count=count, offset=offset)
+    offset += count * 4
+    bitmap_size = (count + 31) // 32 * 4
+
+    sensors = []
+    for sensor in header["sensors"]:
+        present = np.unpackbits(
+            np.frombuffer(payload, dtype=np.uint8, count=bitmap_size, offset=offset), bitorder="little"
+        )
+        values = np.frombuffer(payload, dtype="<f4", count=count, offset=offset + bitmap_size)
+        offset += bitmap_size + count * 4
+        data = [round(float(value), 2) if present[index] else None for index, value in enumerate(values)]
+        sensors.append({**sensor, "data": data})
+    assert offset == len(payload)
+
+    epochs = (header["start"] or 0) + np.cumsum(deltas, dtype=np.int64)
+    return {
+        "timestamps": [datetime.fromtimestamp(epoch, UTC).isoformat() for epoch in epochs.tolist()],
+        "sensors": sensors,
+    }
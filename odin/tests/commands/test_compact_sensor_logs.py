@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+from odin.apps.sensors.compaction import COMPACTED_UNTIL_CACHE_KEY
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.partitions import add_months, create_partition, get_partition, get_partition_size
+from odin.tests.factories import SensorLogFactory
+
+
+@pytest.mark.django_db
+class TestCompactSensorLogsCommand:
+    def setup_method(self):
+        cache.delete(COMPACTED_UNTIL_CACHE_KEY)
+
+    def test_compact_sensor_logs(self, capsys):
+        created_at = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=40)
+        for minute in range(5):
+            SensorLogFactory(sensor_id="sensor_1", created_at=created_at + timedelta(minutes=minute, seconds=1))
+        SensorLogFactory(sensor_id="sensor_1", created_at=timezone.now())
+
+        call_command("compact_sensor_logs", older_than=30)
+
+        assert SensorLog.objects.count() == 2
+        assert "removed 4 rows (5 raw into 1 averaged)" in capsys.readouterr().out
+
+    def test_compact_sensor_logs__invalid_window(self):
+        with pytest.raises(CommandError):
+            call_command("compact_sensor_logs", window=7)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCompactSensorLogsRewrite:
+    def setup_method(self):
+        cache.delete(COMPACTED_UNTIL_CACHE_KEY)
+
+    @pytest.fixture
+    def partition(self, transactional_db):
+        partition = get_partition(add_months(timezone.now(), -3))
+        create_partition(partition)
+        yield partition
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {connection.ops.quote_name(partition.name)}")
+
+    def test_compact_sensor_logs__rewrites_compacted_partitions(self, partition, capsys):
+        SensorLog.objects.bulk_create(
+            SensorLog(sensor_id="sensor_1", temp=20, created_at=partition.starts_at + timedelta(seconds=second))
+            for second in range(1, 6000, 3)
+        )
+        size = get_partition_size(partition)
+
+        call_command("compact_sensor_logs", older_than=30)
+
+        assert SensorLog.objects.count() == 20
+        assert get_partition_size(partition) < size
+        assert "from 1 partitions" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kafka.structs import TopicPartition
+
+from odin.apps.core.kafka import MessageType
+from odin.apps.relays.management.commands.consume_relays import Command, SeekTailOnAssignListener
+from odin.apps.relays.models import Relay
+from odin.apps.relays.services import refresh_relay_states
+from odin.apps.relays.states import get_relay_states
+from odin.tests.factories import RelayFactory
+
+
+def make_message(
+    relay_id: str, state: str, timestamp: int = 0, message_type: MessageType = MessageType.RELAY_STATE_UPDATE
+):
+    message = MagicMock(timestamp=timestamp)
+    message.value = {"type": message_type.value, "data": {"relay_id": relay_id, "state": state}}
+    return message
+
+
+@pytest.mark.django_db
+class TestConsumeRelaysCommand:
+    def setup_method(self):
+        self.command = Command()
+        self.consumer = MagicMock()
+        self.relay: Relay = RelayFactory(relay_id="relay_1", context={"state": "OFF"})
+
+    def poll_once(self, *batches):
+        """Return each batch from consecutive polls and stop the command afterwards."""
+        responses = [{TopicPartition("odin", 0): batch} for batch in batches]
+
+        def poll(*args, **kwargs):
+            if responses:
+                return responses.pop(0)
+            self.command.running = False
+            return {}
+
+        self.consumer.poll.side_effect = poll
+
+    @patch("odin.apps.relays.management.commands.consume_relays.KafkaService.get_consumer")
+    def test_consume_relays__saves_and_mirrors_states(self, mock_get_consumer):
+        mock_get_consumer.return_value = self.consumer
+        self.poll_once(
+            [
+                make_message("relay_1", "ON", timestamp=1),
+                make_message("relay_2", "OFF", timestamp=1),
+                make_message("sensor_1", "ON", timestamp=2, message_type=MessageType.SENSOR_DATA_UPDATE),
+            ]
+        )
+
+        self.command.handle(tail_messages=100)
+
+        self.relay.refresh_from_db()
+        assert self.relay.state == "ON"
+        assert get_relay_states(["relay_1", "relay_2", "sensor_1"]) == {"relay_1": "ON", "relay_2": "OFF"}
+        self.consumer.commit.assert_called_once()
+        self.consumer.close.assert_called_once()
+
+    def test_consume_relays__parse_states_keeps_newest(self):
+        records = {
+            TopicPartition("odin", 0): [make_message("relay_1", "ON", timestamp=1), make_message("relay_1", "OFF", 3)],
+            TopicPartition("odin", 1): [make_message("relay_1", "ON", timestamp=2), make_message("relay_2", "", 2)],
+        }
+
+        assert self.command.parse_states(records) == {"relay_1": "OFF"}
+
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    def test_consume_relays__index_refresh_skips_kafka(self, mock_get_relays_data):
+        self.command.save({"relay_1": "ON"})
+
+        refresh_relay_states([self.relay])
+
+        mock_get_relays_data.assert_not_called()
+        assert self.relay.state == "ON"
+
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    def test_consume_relays__index_refresh_falls_back_to_kafka(self, mock_get_relays_data):
+        mock_get_relays_data.return_value = {"relay_1": {"relay_id": "relay_1", "state": "ON"}}
+
+        refresh_relay_states([self.relay])
+
+        mock_get_relays_data.assert_called_once()
+        assert self.relay.state == "ON"
+
+    def test_consume_relays__seeks_tail_of_new_partitions(self):
+        tp0, tp1 = TopicPartition("odin", 0), TopicPartition("odin", 1)
+        self.consumer.committed.side_effect = lambda tp: None if tp == tp0 else 10
+        self.consumer.end_offsets.return_value = {tp0: 500}
+
+        SeekTailOnAssignListener(self.consumer, tail_messages=100).on_partitions_assigned([tp0, tp1])
+
+        self.consumer.end_offsets.assert_called_once_with([tp0])
+        self.consumer.seek.assert_called_once_with(tp0, 400)
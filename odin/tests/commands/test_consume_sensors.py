@@ -0,0 +1,149 @@
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kafka.structs import TopicPartition
+
+from django.db import DatabaseError
+
+from odin.apps.core.kafka import MessageType
+from odin.apps.sensors.management.commands.consume_sensors import Command, FlushOnRevokeListener
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.services import create_sensor_logs
+
+
+def make_message(sensor_id: str, temp: float = 22.5, timestamp: str | None = "2025-01-06T10:30:00+00:00"):
+    message = MagicMock()
+    message.value = {
+        "type": MessageType.SENSOR_DATA_UPDATE.value,
+        "timestamp": timestamp,
+        "data": {"sensor_id": sensor_id, "temp": temp, "humidity": 45.0},
+    }
+    return message
+
+
+@pytest.mark.django_db
+class TestConsumeSensorsCommand:
+    def setup_method(self):
+        self.command = Command()
+        self.consumer = MagicMock()
+        self.command.consumer = self.consumer
+
+    def poll_once(self, *batches):
+        """Return each batch from consecutive polls and stop the command afterwards."""
+        responses = [{TopicPartition("odin", 0): batch} for batch in batches]
+
+        def poll(*args, **kwargs):
+            if responses:
+                return responses.pop(0)
+            self.command.running = False
+            return {}
+
+        self.consumer.poll.side_effect = poll
+
+    @patch("odin.apps.sensors.management.commands.consume_sensors.KafkaService.get_consumer")
+    def test_consume_sensors__writes_batch_with_single_insert(self, mock_get_consumer):
+        mock_get_consumer.return_value = self.consumer
+        self.poll_once([make_message("sensor_1"), make_message("sensor_2")], [make_message("sensor_3")])
+
+        with patch(
+            "odin.apps.sensors.management.commands.consume_sensors.create_sensor_logs",
+            wraps=create_sensor_logs,
+        ) as mock_create:
+            self.command.handle(batch_size=10, flush_interval=60)
+
+        assert mock_create.call_count == 1
+        assert len(mock_create.call_args.args[0]) == 3
+        assert SensorLog.objects.count() == 3
+        self.consumer.commit.assert_called_once()
+
+    @patch("odin.apps.sensors.management.commands.consume_sensors.KafkaService.get_consumer")
+    def test_consume_sensors__flushes_when_batch_is_full(self, mock_get_consumer):
+        mock_get_consumer.return_value = self.consumer
+        self.poll_once([make_message("sensor_1"), make_message("sensor_2")], [make_message("sensor_3")])
+
+        self.command.handle(batch_size=2, flush_interval=60)
+
+        assert SensorLog.objects.count() == 3
+        assert self.consumer.commit.call_count == 2
+
+    def test_consume_sensors__does_not_commit_when_insert_fails(self):
+        self.command.batch = [{"sensor_id": "sensor_1", "temp": 22.5, "humidity": None, "created_at": None}]
+        self.command.uncommitted = 1
+
+        with patch(
+            "odin.apps.sensors.management.commands.consume_sensors.create_sensor_logs",
+            side_effect=DatabaseError("Connection lost"),
+        ):
+            with pytest.raises(DatabaseError):
+                self.command.flush()
+
+        self.consumer.commit.assert_not_called()
+
+    def test_consume_sensors__commits_offsets_of_skipped_messages(self):
+        self.command.uncommitted = 5
+        self.command.flush()
+        self.consumer.commit.assert_called_once()
+
+    def test_consume_sensors__parse_message(self):
+        reading = self.command.parse_message(make_message("sensor_1", temp=21.0).value)
+        assert reading["sensor_id"] == "sensor_1"
+        assert reading["temp"] == 21.0
+        assert reading["created_at"].isoformat() == "2025-01-06T10:30:00+00:00"
+
+        reading = self.command.parse_message(make_message("sensor_1", timestamp=None).value)
+        assert reading["created_at"] is not None
+
+    def test_consume_sensors__parse_message_skips_invalid_payload(self):
+        assert self.command.parse_message({"type": MessageType.SENSOR_DATA_UPDATE.value, "data": {}}) is None
+        assert self.command.parse_message({"data": {"sensor_id": "sensor_1"}}) is None
+
+    def test_consume_sensors__flushes_on_partitions_revoked(self):
+        self.command.batch = [{"sensor_id": "sensor_1", "temp": 22.5, "humidity": None, "created_at": None}]
+        self.command.uncommitted = 1
+
+        FlushOnRevokeListener(self.command).on_partitions_revoked({TopicPartition("odin", 0)})
+
+        assert SensorLog.objects.count() == 1
+        assert self.command.batch == []
+        self.consumer.commit.assert_called_once()
+
+    def test_consume_sensors__reports_stats_to_parent(self):
+        self.command.stats_queue = MagicMock()
+        self.command.worker_name = "worker-1"
+        self.command.batch = [{"sensor_id": "sensor_1", "temp": 22.5, "humidity": None, "created_at": None}]
+
+        self.command.flush()
+
+        self.command.stats_queue.put.assert_called_once_with(("worker-1", 1))
+
+    def test_consume_sensors__log_throughput(self, caplog):
+        with caplog.at_level(logging.INFO):
+            Command.log_throughput({"worker-0": 60, "worker-1": 120}, period=60)
+        assert "Consumed 180 sensor logs, 3.0 rows/s (worker-0: 1.0 rows/s, worker-1: 2.0 rows/s)" in caplog.text
+
+    @patch("odin.apps.sensors.management.commands.consume_sensors.multiprocessing.get_context")
+    def test_consume_sensors__forks_workers(self, mock_get_context):
+        processes = [MagicMock(), MagicMock()]
+        mock_get_context.return_value.Process.side_effect = processes
+        for process in processes:
+            process.is_alive.return_value = False
+
+        with pytest.raises(SystemExit):
+            self.command.handle(workers=2)
+
+        assert mock_get_context.return_value.Process.call_count == 2
+        for process in processes:
+            process.start.assert_called_once()
+            process.join.assert_called_once()
+
+    @patch("odin.apps.sensors.management.commands.consume_sensors.multiprocessing.get_context")
+    def test_consume_sensors__stops_workers_on_shutdown(self, mock_get_context):
+        processes = [MagicMock(), MagicMock()]
+        mock_get_context.return_value.Process.side_effect = processes
+        self.command.running = False
+        self.command.run_workers(workers=2)
+
+        for process in processes:
+            process.terminate.assert_called_once()
+            process.join.assert_called_once()
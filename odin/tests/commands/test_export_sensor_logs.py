@@ -0,0 +1,84 @@
+import json
+import warnings
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from odin.apps.sensors.models import SensorLog
+from odin.tests.factories import SensorLogFactory
+
+
+START = datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExportSensorLogsCommand:
+    def setup_method(self):
+        for i in range(3):
+            for sensor_id in ("sensor_1", "sensor_2"):
+                SensorLogFactory(
+                    sensor_id=sensor_id,
+                    temp=Decimal("21.50"),
+                    humidity=None,
+                    created_at=START + timedelta(minutes=i),
+                )
+
+    def test_export_sensor_logs__csv_round_trip(self, tmp_path, capsys):
+        path = tmp_path / "logs.csv"
+
+        call_command("export_sensor_logs", str(path))
+
+        assert "Exported 6 sensor logs" in capsys.readouterr().out
+        SensorLog.objects.all().delete()
+        call_command("import_sensor_logs", str(path))
+        assert sorted(SensorLog.objects.values_list("sensor_id", "temp", "humidity", "created_at")) == [
+            (sensor_id, Decimal("21.50"), None, START + timedelta(minutes=i))
+            for sensor_id in ("sensor_1", "sensor_2")
+            for i in range(3)
+        ]
+
+    def test_export_sensor_logs__ndjson_filters(self, tmp_path):
+        path = tmp_path / "logs.ndjson"
+
+        call_command(
+            "export_sensor_logs",
+            str(path),
+            format="ndjson",
+            sensor_ids=["sensor_2"],
+            start=START + timedelta(minutes=1),
+            chunk_size=1,
+        )
+
+        rows = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [(row["sensor_id"], row["created_at"]) for row in rows] == [
+            ("sensor_2", (START + timedelta(minutes=i)).isoformat()) for i in (1, 2)
+        ]
+
+    def test_export_sensor_logs__stdout(self, capsys):
+        call_command("export_sensor_logs", "-", "--sensor-id", "sensor_1", "--end", START.isoformat())
+
+        captured = capsys.readouterr()
+        assert captured.out.splitlines() == [
+            "sensor_id,temp,humidity,created_at",
+            f"sensor_1,21.50,,{START.isoformat()}",
+        ]
+        assert "Exported 1 sensor logs" in captured.err
+
+    def test_export_sensor_logs__naive_datetimes_in_current_time_zone(self, capsys):
+        start = timezone.localtime(START + timedelta(minutes=1)).replace(tzinfo=None)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            call_command("export_sensor_logs", "-", "--sensor-id", "sensor_1", "--start", start.isoformat())
+
+        assert capsys.readouterr().out.splitlines()[1:] == [
+            f"sensor_1,21.50,,{(START + timedelta(minutes=i)).isoformat()}" for i in (1, 2)
+        ]
+
+    def test_export_sensor_logs__invalid_datetime(self):
+        with pytest.raises(CommandError, match="Invalid ISO datetime"):
+            call_command("export_sensor_logs", "-", "--start", "yesterday")
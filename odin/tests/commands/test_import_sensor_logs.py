@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from django.core.management import call_command
+
+from odin.apps.sensors.models import SensorLog
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportSensorLogsCommand:
+    def test_import_sensor_logs__csv(self, tmp_path, capsys):
+        path = tmp_path / "logs.csv"
+        path.write_text(
+            "sensor_id,temp,humidity,created_at\n"
+            "sensor_1,21.50,45.00,2025-01-06T10:30:00+00:00\n"
+            "sensor_2,22.00,,2025-01-06T10:31:00+00:00\n"
+        )
+
+        call_command("import_sensor_logs", str(path))
+
+        assert SensorLog.objects.count() == 2
+        assert SensorLog.objects.get(sensor_id="sensor_2").humidity is None
+        assert "Imported 2 sensor logs" in capsys.readouterr().out
+
+    def test_import_sensor_logs__ndjson(self, tmp_path):
+        path = tmp_path / "logs.ndjson"
+        path.write_text(
+            "\n".join(
+                json.dumps({"sensor_id": "sensor_1", "temp": 20 + i, "created_at": f"2025-01-06T10:3{i}:00+00:00"})
+                for i in range(3)
+            )
+        )
+
+        call_command("import_sensor_logs", str(path), format="ndjson", chunk_size=2)
+
+        assert SensorLog.objects.filter(sensor_id="sensor_1").count() == 3
@@ -0,0 +1,86 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    create_future_partitions,
+    create_partition,
+    get_partition,
+    get_partitions,
+    month_start,
+)
+from odin.tests.factories import SensorLogFactory
+
+
+def table_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return cursor.fetchone()[0]
+
+
+class TestPartitionHelpers:
+    def test_partitions__month_start(self):
+        value = datetime(2026, 10, 18, 12, 30, tzinfo=UTC)
+        assert month_start(value) == datetime(2026, 10, 1, tzinfo=UTC)
+
+    def test_partitions__add_months(self):
+        value = datetime(2026, 11, 1, tzinfo=UTC)
+        assert add_months(value, 2) == datetime(2027, 1, 1, tzinfo=UTC)
+        assert add_months(value, -11) == datetime(2025, 12, 1, tzinfo=UTC)
+
+    def test_partitions__get_partition(self):
+        partition = get_partition(datetime(2026, 12, 15, tzinfo=UTC))
+        assert partition.name == "sensors_sensorlog_p2026_12"
+        assert partition.starts_at == datetime(2026, 12, 1, tzinfo=UTC)
+        assert partition.ends_at == datetime(2027, 1, 1, tzinfo=UTC)
+
+
+@pytest.mark.django_db
+class TestManageSensorPartitionsCommand:
+    def setup_method(self):
+        self.current = month_start(timezone.now())
+
+    def test_manage_sensor_partitions__creates_future_partitions(self):
+        call_command("manage_sensor_partitions", ahead=6)
+
+        names = {partition.name for partition in get_partitions()}
+        for offset in range(7):
+            assert get_partition(add_months(self.current, offset)).name in names
+
+    def test_manage_sensor_partitions__moves_rows_out_of_default_partition(self):
+        created_at = add_months(self.current, 24)
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+
+        create_future_partitions(months=24)
+
+        assert SensorLog.objects.filter(sensor_id="sensor_1", created_at=created_at).exists()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {DEFAULT_PARTITION}")  # noqa: S608 # nosec B608
+            assert cursor.fetchone()[0] == 0
+
+    def test_manage_sensor_partitions__detaches_expired_partitions(self):
+        expired = get_partition(add_months(self.current, -24))
+        create_partition(expired)
+        SensorLogFactory(sensor_id="sensor_1", created_at=expired.starts_at)
+
+        call_command("manage_sensor_partitions", ahead=1, retention=12)
+
+        assert expired.name not in {partition.name for partition in get_partitions()}
+        assert table_exists(expired.name)
+        assert not SensorLog.objects.filter(sensor_id="sensor_1").exists()
+
+    def test_manage_sensor_partitions__drops_expired_partitions(self):
+        expired = get_partition(add_months(self.current, -24))
+        create_partition(expired)
+
+        call_command("manage_sensor_partitions", ahead=1, retention=12, drop=True)
+
+        assert not table_exists(expired.name)
+        assert get_partition(self.current).name in {partition.name for partition in get_partitions()}
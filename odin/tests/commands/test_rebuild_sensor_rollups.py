@@ -0,0 +1,24 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from django.core.management import CommandError, call_command
+
+from odin.apps.sensors.models import RollupResolution, SensorLogRollup
+from odin.tests.factories import SensorLogFactory
+
+
+@pytest.mark.django_db
+class TestRebuildSensorRollupsCommand:
+    def test_rebuild_sensor_rollups(self, capsys):
+        SensorLogFactory(sensor_id="sensor_1", created_at=datetime(2025, 1, 6, 10, 0, tzinfo=UTC))
+        SensorLogFactory(sensor_id="sensor_1", created_at=datetime(2025, 1, 7, 10, 0, tzinfo=UTC))
+
+        call_command("rebuild_sensor_rollups", "--start", "2025-01-06T00:00:00+00:00", "--end", "2025-01-07T12:00")
+
+        assert SensorLogRollup.objects.filter(resolution=RollupResolution.DAY).count() == 2
+        assert "Rebuilt 6 sensor log rollups" in capsys.readouterr().out
+
+    def test_rebuild_sensor_rollups__invalid_range(self):
+        with pytest.raises(CommandError):
+            call_command("rebuild_sensor_rollups", "--start", "2025-01-07", "--end", "2025-01-06")
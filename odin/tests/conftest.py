@@ -1,4 +1,5 @@
 import pytest
+from django_redis import get_redis_connection
 
 from django.test.client import Client
 from rest_framework.test import APIClient
@@ -49,3 +50,17 @@ def setup_api_client(db, request):
         request.cls.setup_method = original_setup
     else:
         yield
+
+
+# Deletes every key matching ARGV[1] with a single round trip
+DELETE_KEYS_SCRIPT = """
+for _, key in ipairs(redis.call("KEYS", ARGV[1])) do
+    redis.call("DEL", key)
+end
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_redis():
+    """Drop state left in Redis by previous tests, the app keeps it all under the odin: prefix."""
+    get_redis_connection("default").eval(DELETE_KEYS_SCRIPT, 0, "odin:*")
@@ -284,36 +284,3 @@ class TestRelaysForceState:
         local_time = datetime(2025, 1, 6, 10, 30, 0, tzinfo=dt_timezone(UTC.utcoffset(datetime.now(UTC))))
         with patch("odin.apps.relays.services.timezone.localtime", return_value=local_time):
             assert self.relay.target_state == RelayState.ON
-
-
-@pytest.mark.django_db
-class TestRelaysRefreshStateFromKafka:
-    def setup_method(self):
-        self.relay: Relay = RelayFactory(type=RelayType.PUMP)
-
-    @patch("odin.apps.core.kafka.KafkaService.get_relay_data")
-    def test_relays__get_relay_data_updates_context(self, mock_get_state):
-        """Test that refresh_state_from_kafka updates context with state from Kafka."""
-        mock_get_state.return_value = {"state": "ON"}
-
-        state = self.relay.refresh_state_from_kafka()
-
-        assert state == "ON"
-        assert self.relay.context["state"] == "ON"
-        self.relay.refresh_from_db()
-        assert self.relay.context["state"] == "ON"
-        mock_get_state.assert_called_once_with(self.relay.relay_id)
-
-    @patch("odin.apps.core.kafka.KafkaService.get_relay_data")
-    def test_relays__get_relay_data_raises_error_when_not_found(self, mock_get_state):
-        """Test that refresh_state_from_kafka raises RelayStateError when state not found."""
-        mock_get_state.return_value = None
-        assert self.relay.refresh_state_from_kafka() is None
-
-    @patch("odin.apps.core.kafka.KafkaService.get_relay_data")
-    def test_relays__get_relay_data_returns_state_value(self, mock_get_state):
-        """Test that refresh_state_from_kafka returns the state value."""
-        mock_get_state.return_value = {"state": "OFF"}
-
-        state = self.relay.refresh_state_from_kafka()
-        assert state == "OFF"
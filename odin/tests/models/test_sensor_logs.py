@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+
+from django.db import connection
+from django.utils import timezone
+
+from odin.apps.sensors.models import Sensor, SensorLog
+from odin.tests.factories import SensorFactory, SensorLogFactory
+
+
+@pytest.mark.django_db
+class TestSensorLogIndexes:
+    def setup_method(self):
+        self.sensor: Sensor = SensorFactory(sensor_id="sensor_1")
+        now = timezone.now()
+        for minutes in range(0, 60, 5):
+            SensorLogFactory(sensor_id="sensor_1", created_at=now - timedelta(minutes=minutes))
+
+        # Tiny test tables are always cheaper to scan sequentially
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    def test_sensor_logs__chart_query_uses_covering_index(self):
+        """Test that chart queries are served by an index only scan."""
+        end = timezone.now()
+        queryset = (
+            SensorLog.objects.filter(sensor_id__in=["sensor_1"], created_at__range=(end - timedelta(hours=48), end))
+            .order_by("created_at")
+            .values_list("sensor_id", "temp", "created_at", named=True)
+        )
+
+        plan = queryset.explain()
+        assert "Index Only Scan" in plan
+
+    def test_sensor_logs__latest_log_query_uses_covering_index(self):
+        """Test that the latest reading of a sensor is read with a backward index scan."""
+        plan = SensorLog.objects.filter(sensor_id="sensor_1").order_by("-created_at")[:1].explain()
+        assert "Index Scan Backward" in plan
+
+    def test_sensor_logs__wide_range_query_uses_brin_index(self):
+        """Test that time range scans across all sensors use the BRIN index."""
+        end = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_bitmapscan = on")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            # Partitions carry their own copies of the index under generated names
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE tablename LIKE %s AND indexdef ILIKE %s",
+                [f"{SensorLog._meta.db_table}%", "%USING brin%"],
+            )
+            brin_indexes = [indexname for (indexname,) in cursor.fetchall()]
+
+        plan = SensorLog.objects.filter(created_at__range=(end - timedelta(days=30), end)).explain()
+        assert "Bitmap Index Scan" in plan
+        assert any(indexname in plan for indexname in brin_indexes)
+
+    def test_sensor_logs__current_query_uses_index_lookups(self):
+        """Test that current readings are looked up per sensor instead of sorting the history."""
+        plan = SensorLog.objects.current().explain()
+        assert "Index Only Scan Backward" in plan
+        assert "Unique" not in plan
+
+
+@pytest.mark.django_db
+class TestSensorLogCurrent:
+    def setup_method(self):
+        self.now = timezone.now()
+        SensorFactory(sensor_id="sensor_1")
+        SensorFactory(sensor_id="sensor_2")
+        SensorFactory(sensor_id="sensor_3")
+        SensorFactory(sensor_id="sensor_4", is_active=False)
+        for sensor_id in ("sensor_1", "sensor_2", "sensor_4"):
+            for minutes in range(3):
+                SensorLogFactory(sensor_id=sensor_id, created_at=self.now - timedelta(minutes=minutes))
+
+    def test_sensor_logs__current_returns_latest_log_per_active_sensor(self):
+        """Test that only the latest reading of active sensors with readings is returned."""
+        sensor_logs = list(SensorLog.objects.current())
+
+        assert [sensor_log.sensor_id for sensor_log in sensor_logs] == ["sensor_1", "sensor_2"]
+        assert all(sensor_log.created_at == self.now for sensor_log in sensor_logs)
+
+    def test_sensor_logs__current_ignores_same_time_readings_of_other_sensors(self):
+        """Test that a reading matching another sensor's latest time is not returned."""
+        SensorLogFactory(sensor_id="sensor_1", created_at=self.now + timedelta(minutes=1))
+
+        sensor_logs = list(SensorLog.objects.current())
+
+        assert [(log.sensor_id, log.created_at) for log in sensor_logs] == [
+            ("sensor_1", self.now + timedelta(minutes=1)),
+            ("sensor_2", self.now),
+        ]
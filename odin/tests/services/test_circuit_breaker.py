@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django_redis import get_redis_connection
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from odin.apps.core.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    def setup_method(self):
+        self.breaker = CircuitBreaker(
+            "test", failure_threshold=2, reset_timeout=timedelta(seconds=30), probe_timeout=timedelta(seconds=5)
+        )
+
+    def test_circuit_breaker__closed_below_threshold(self):
+        self.breaker.record_failure()
+
+        assert self.breaker.allow_request()
+
+    def test_circuit_breaker__opens_at_threshold(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        assert not self.breaker.allow_request()
+
+    def test_circuit_breaker__success_resets_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        assert self.breaker.allow_request()
+
+    def test_circuit_breaker__half_open_allows_single_probe(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        get_redis_connection("default").delete(self.breaker.open_key)
+
+        assert self.breaker.allow_request()
+        assert not self.breaker.allow_request()
+
+    def test_circuit_breaker__successful_probe_closes(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        get_redis_connection("default").delete(self.breaker.open_key)
+        self.breaker.allow_request()
+
+        self.breaker.record_success()
+
+        assert self.breaker.allow_request()
+        assert self.breaker.allow_request()
+
+    def test_circuit_breaker__failed_probe_opens_again(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        get_redis_connection("default").delete(self.breaker.open_key)
+        self.breaker.allow_request()
+
+        self.breaker.record_failure()
+
+        assert not self.breaker.allow_request()
+        assert get_redis_connection("default").ttl(self.breaker.open_key) > 0
+
+    def test_circuit_breaker__shared_between_instances(self):
+        other = CircuitBreaker(
+            "test", failure_threshold=2, reset_timeout=timedelta(seconds=30), probe_timeout=timedelta(seconds=5)
+        )
+        self.breaker.record_failure()
+        other.record_failure()
+
+        assert not self.breaker.allow_request()
+
+    def test_circuit_breaker__redis_unavailable(self):
+        with patch(
+            "odin.apps.core.circuit_breaker.get_redis_connection",
+            side_effect=RedisConnectionError("Connection refused"),
+        ):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+            assert self.breaker.allow_request()
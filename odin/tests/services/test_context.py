@@ -12,7 +12,8 @@ from odin.apps.core.services import (
     update_index_context_cache,
 )
 from odin.apps.provider.models import Traffic
-from odin.tests.factories import SensorFactory, VoltageLogFactory, WeatherFactory
+from odin.apps.sensors.models import SensorType
+from odin.tests.factories import RelayFactory, SensorFactory, VoltageLogFactory, WeatherFactory
 
 
 @pytest.mark.django_db
@@ -69,3 +70,22 @@ class TestIndexContextServices:
     def test_traffic_none_when_no_data(self):
         context = build_index_context()
         assert context["traffic"] is None
+
+    @pytest.mark.parametrize("sensors_count", [1, 10])
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    @patch("odin.apps.core.services.subprocess.run")
+    def test_build_index_context__query_count(
+        self, mock_subprocess, mock_get_relays_data, sensors_count, django_assert_num_queries
+    ):
+        mock_subprocess.return_value.stdout = b"active"
+        mock_get_relays_data.return_value = {}
+        SensorFactory(sensor_id="boiler", type=SensorType.DS18B20)
+        for index in range(sensors_count):
+            RelayFactory(relay_id=f"relay_{index}")
+            SensorFactory(sensor_id=f"sensor_{index}", linked_sensor_id="boiler", relay_id=f"relay_{index}")
+
+        with django_assert_num_queries(10):
+            context = build_index_context()
+
+        assert len(context["home_sensors"]) == sensors_count
+        assert [sensor.sensor_id for sensor in context["boiler_sensors"]] == ["boiler"]
@@ -0,0 +1,106 @@
+import asyncio
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django_redis import get_redis_connection
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from django.utils import timezone
+
+from odin.apps.core.events import EVENTS_CHANNEL, EventType, format_event, publish_event, stream_events
+from odin.apps.sensors.services import copy_sensor_logs, create_sensor_logs
+from odin.tests.factories import SensorFactory
+
+
+async def read_events(count: int, publish=None) -> list[str]:
+    stream = stream_events()
+    events = [await anext(stream)]
+    if publish:
+        publish()
+    while len(events) < count:
+        events.append(await anext(stream))
+    await stream.aclose()
+    return events
+
+
+def parse_event(message: str) -> tuple[str, dict | list]:
+    event_type, data = message.strip().split("\n")
+    return event_type.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+class TestEvents:
+    def test_format_event(self):
+        message = format_event(EventType.RELAY_STATE, {"relay_id": "relay_1", "state": "ON"})
+
+        assert message == 'event: relay_state\ndata: {"relay_id":"relay_1","state":"ON"}\n\n'
+
+    def test_publish_event(self):
+        pubsub = get_redis_connection("default").pubsub()
+        pubsub.subscribe(EVENTS_CHANNEL)
+        pubsub.get_message(timeout=1)
+
+        publish_event(EventType.RELAY_STATE, {"relay_id": "relay_1", "state": "ON"})
+
+        message = pubsub.get_message(timeout=1)
+        pubsub.close()
+        assert parse_event(message["data"].decode()) == ("relay_state", {"relay_id": "relay_1", "state": "ON"})
+
+    def test_publish_event__redis_unavailable(self):
+        with patch(
+            "odin.apps.core.events.get_redis_connection", side_effect=RedisConnectionError("Connection refused")
+        ):
+            publish_event(EventType.RELAY_STATE, {"relay_id": "relay_1", "state": "ON"})
+
+    def test_stream_events(self):
+        events = asyncio.run(
+            read_events(2, lambda: publish_event(EventType.RELAY_STATE, {"relay_id": "relay_1", "state": "OFF"}))
+        )
+
+        assert events[0] == "retry: 5000\n\n"
+        assert parse_event(events[1]) == ("relay_state", {"relay_id": "relay_1", "state": "OFF"})
+
+    @patch("odin.apps.core.events.EVENTS_KEEPALIVE_SECONDS", 0.01)
+    def test_stream_events__keepalive(self):
+        assert asyncio.run(read_events(2))[1] == ": keepalive\n\n"
+
+
+@pytest.mark.django_db
+class TestPublishSensorLogs:
+    def setup_method(self):
+        SensorFactory(sensor_id="sensor_1", temp_offset=Decimal("0.50"), humidity_offset=Decimal("-1.00"))
+
+    @patch("odin.apps.sensors.services.publish_event")
+    def test_create_sensor_logs__publishes_latest_readings(self, mock_publish, django_capture_on_commit_callbacks):
+        now = timezone.now()
+        with django_capture_on_commit_callbacks(execute=True):
+            create_sensor_logs(
+                [
+                    {"sensor_id": "sensor_1", "temp": "21.00", "humidity": "40.00", "created_at": now},
+                    {"sensor_id": "sensor_1", "temp": "20.00", "created_at": now - timedelta(minutes=1)},
+                    {"sensor_id": "unknown", "temp": "20.00", "created_at": now},
+                ]
+            )
+
+        mock_publish.assert_called_once_with(
+            EventType.SENSOR_LOGS,
+            [{"sensor_id": "sensor_1", "temp": 21.5, "humidity": 39.0, "created_at": now.isoformat()}],
+        )
+
+    @patch("odin.apps.sensors.services.publish_event")
+    def test_create_sensor_logs__not_published_before_commit(self, mock_publish, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            create_sensor_logs([{"sensor_id": "sensor_1", "temp": "21.00"}])
+
+        mock_publish.assert_not_called()
+
+    @patch("odin.apps.sensors.services.publish_event")
+    def test_copy_sensor_logs__skips_imported_history(self, mock_publish, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            copy_sensor_logs(
+                [{"sensor_id": "sensor_1", "temp": "21.00", "created_at": timezone.now() - timedelta(days=1)}]
+            )
+
+        mock_publish.assert_not_called()
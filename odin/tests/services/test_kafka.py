@@ -1,10 +1,12 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+from django_redis import get_redis_connection
+from kafka.errors import KafkaConnectionError, KafkaError
 from kafka.structs import TopicPartition
 
 from odin.apps.core.exceptions import KafkaReadError
-from odin.apps.core.kafka import KafkaService, MessageType
+from odin.apps.core.kafka import PENDING_RELAY_UPDATES_KEY, KafkaService, MessageType
 
 
 class TestKafkaService:
@@ -62,70 +64,172 @@ class TestKafkaService:
         KafkaService.send_relay_update(relay_id="relay_1", target_state="ON")
         assert mock_send_message.call_count == 1
 
-    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
-    def test_get_relay_data_returns_data(self, mock_get_consumer):
-        """Test that get_relay_data returns data when found."""
-        mock_consumer = MagicMock()
-        mock_get_consumer.return_value = mock_consumer
-        mock_consumer.partitions_for_topic.return_value = {0}
-        mock_consumer.end_offsets.return_value = {TopicPartition("odin", 0): 1}
 
-        mock_message = MagicMock()
-        mock_message.value = {
-            "type": MessageType.RELAY_STATE_UPDATE.value,
-            "data": {"relay_id": "relay_1", "state": "ON"},
-        }
-        mock_consumer.poll.return_value = {TopicPartition("odin", 0): [mock_message]}
+def make_message(offset: int, timestamp: int, relay_id: str, state: str, message_type: MessageType) -> MagicMock:
+    message = MagicMock(offset=offset, timestamp=timestamp)
+    message.value = {"type": message_type.value, "data": {"relay_id": relay_id, "state": state}}
+    return message
 
-        result = KafkaService.get_relay_data("relay_1")
-        assert result == {"relay_id": "relay_1", "state": "ON"}
-        mock_consumer.close.assert_called_once()
 
-    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
-    def test_get_relay_data_returns_none_when_not_found(self, mock_get_consumer):
-        """Test that get_relay_data returns None when relay not found."""
-        mock_consumer = MagicMock()
-        mock_get_consumer.return_value = mock_consumer
-        mock_consumer.partitions_for_topic.return_value = {0}
-        mock_consumer.end_offsets.return_value = {TopicPartition("odin", 0): 1}
+class TestKafkaServiceRelaysData:
+    def setup_method(self):
+        self.tp0, self.tp1 = TopicPartition("odin", 0), TopicPartition("odin", 1)
 
-        mock_message = MagicMock()
-        mock_message.value = {
-            "type": MessageType.RELAY_STATE_UPDATE.value,
-            "data": {"relay_id": "relay_other", "state": "OFF"},
+    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
+    def test_get_relays_data__latest_update_per_relay(self, mock_get_consumer):
+        """Test that the newest update of each relay is returned from a single consumer."""
+        mock_consumer = mock_get_consumer.return_value
+        mock_consumer.partitions_for_topic.return_value = {0, 1}
+        mock_consumer.end_offsets.return_value = {self.tp0: 3, self.tp1: 1}
+        mock_consumer.poll.return_value = {
+            self.tp0: [
+                make_message(0, 100, "relay_1", "ON", MessageType.RELAY_STATE_UPDATE),
+                make_message(1, 300, "relay_2", "OFF", MessageType.RELAY_STATE_UPDATE),
+                make_message(2, 400, "relay_1", "ON", MessageType.SENSOR_DATA_UPDATE),
+            ],
+            self.tp1: [make_message(0, 200, "relay_1", "OFF", MessageType.RELAY_STATE_UPDATE)],
         }
-        mock_consumer.poll.return_value = {TopicPartition("odin", 0): [mock_message]}
 
-        assert KafkaService.get_relay_data("relay_1") is None
+        result = KafkaService.get_relays_data(["relay_1", "relay_2", "relay_3"])
+
+        assert result == {
+            "relay_1": {"relay_id": "relay_1", "state": "OFF"},
+            "relay_2": {"relay_id": "relay_2", "state": "OFF"},
+        }
+        mock_get_consumer.assert_called_once()
+        mock_consumer.poll.assert_called_once()
         mock_consumer.close.assert_called_once()
 
     @patch("odin.apps.core.kafka.KafkaService.get_consumer")
-    def test_get_relay_data_ignores_wrong_message_type(self, mock_get_consumer):
-        """Test that get_relay_data ignores messages with wrong type."""
-        mock_consumer = MagicMock()
-        mock_get_consumer.return_value = mock_consumer
+    def test_get_relays_data__polls_until_end_offsets(self, mock_get_consumer):
+        """Test that the tail is polled until every partition reaches its end offset."""
+        mock_consumer = mock_get_consumer.return_value
+        mock_consumer.partitions_for_topic.return_value = {0, 1}
+        mock_consumer.end_offsets.return_value = {self.tp0: 250, self.tp1: 0}
+        mock_consumer.poll.side_effect = [
+            {self.tp0: [make_message(150, 100, "relay_1", "ON", MessageType.RELAY_STATE_UPDATE)]},
+            {self.tp0: [make_message(249, 200, "relay_1", "OFF", MessageType.RELAY_STATE_UPDATE)]},
+        ]
+
+        result = KafkaService.get_relays_data(["relay_1"])
+
+        assert result == {"relay_1": {"relay_id": "relay_1", "state": "OFF"}}
+        assert mock_consumer.poll.call_count == 2
+        mock_consumer.seek.assert_any_call(self.tp0, 150)
+        mock_consumer.seek.assert_any_call(self.tp1, 0)
+
+    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
+    def test_get_relays_data__empty_topic(self, mock_get_consumer):
+        """Test that an empty topic is not polled."""
+        mock_consumer = mock_get_consumer.return_value
         mock_consumer.partitions_for_topic.return_value = {0}
-        mock_consumer.end_offsets.return_value = {TopicPartition("odin", 0): 1}
+        mock_consumer.end_offsets.return_value = {self.tp0: 0}
 
-        mock_message = MagicMock()
-        mock_message.value = {
-            "type": MessageType.SENSOR_DATA_UPDATE.value,
-            "data": {"relay_id": "relay_1", "state": "ON"},
-        }
-        mock_consumer.poll.return_value = {TopicPartition("odin", 0): [mock_message]}
+        assert KafkaService.get_relays_data(["relay_1"]) == {}
+        mock_consumer.poll.assert_not_called()
 
-        assert KafkaService.get_relay_data("relay_1") is None
-        mock_consumer.close.assert_called_once()
+    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
+    def test_get_relays_data__no_relays(self, mock_get_consumer):
+        """Test that no consumer is created without relays."""
+        assert KafkaService.get_relays_data([]) == {}
+        mock_get_consumer.assert_not_called()
 
     @patch("odin.apps.core.kafka.KafkaService.get_consumer")
-    def test_get_relay_data_raises_kafka_error(self, mock_get_consumer):
-        """Test that get_relay_data raises KafkaReadError on failure and closes consumer."""
+    def test_get_relays_data__raises_kafka_error(self, mock_get_consumer):
+        """Test that get_relays_data raises KafkaReadError on failure and closes consumer."""
         from kafka.errors import KafkaError
 
-        mock_consumer = MagicMock()
-        mock_get_consumer.return_value = mock_consumer
+        mock_consumer = mock_get_consumer.return_value
         mock_consumer.partitions_for_topic.side_effect = KafkaError("Connection failed")
 
         with pytest.raises(KafkaReadError):
-            KafkaService.get_relay_data("relay_1")
+            KafkaService.get_relays_data(["relay_1"])
         mock_consumer.close.assert_called_once()
+
+
+class TestKafkaServiceCircuitBreaker:
+    def open_circuit(self):
+        for _ in range(KafkaService.circuit_breaker.failure_threshold):
+            KafkaService.circuit_breaker.record_failure()
+
+    def pending_updates(self) -> dict[str, str]:
+        pending = get_redis_connection("default").hgetall(PENDING_RELAY_UPDATES_KEY)
+        return {key.decode(): value.decode() for key, value in pending.items()}
+
+    @patch("odin.apps.core.kafka.KafkaService.get_producer")
+    def test_send_message__opens_circuit_after_failures(self, mock_get_producer):
+        """Test that consecutive failures open the circuit and later sends fail fast."""
+        mock_get_producer.return_value.send.side_effect = KafkaError("Connection failed")
+
+        for _ in range(KafkaService.circuit_breaker.failure_threshold + 2):
+            assert KafkaService.send_message("test-topic", {"key": "value"}) is False
+
+        assert mock_get_producer.call_count == KafkaService.circuit_breaker.failure_threshold
+
+    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
+    def test_get_relays_data__fails_fast_when_open(self, mock_get_consumer):
+        """Test that reads raise without connecting while the circuit is open."""
+        self.open_circuit()
+
+        with pytest.raises(KafkaReadError):
+            KafkaService.get_relays_data(["relay_1"])
+
+        mock_get_consumer.assert_not_called()
+
+    @patch("odin.apps.core.kafka.KafkaService.get_consumer")
+    def test_get_relays_data__connection_error(self, mock_get_consumer):
+        """Test that a broker connection failure is raised as a read error and counted."""
+        mock_get_consumer.side_effect = KafkaConnectionError("Connection refused")
+
+        for _ in range(KafkaService.circuit_breaker.failure_threshold):
+            with pytest.raises(KafkaReadError):
+                KafkaService.get_relays_data(["relay_1"])
+
+        assert not KafkaService.circuit_breaker.allow_request()
+
+    @patch("odin.apps.core.kafka.KafkaService.get_producer")
+    def test_send_relay_update__queued_when_open(self, mock_get_producer):
+        """Test that updates are queued while the circuit is open, keeping the latest one per relay."""
+        self.open_circuit()
+
+        assert KafkaService.send_relay_update("relay_1", "ON") is False
+        assert KafkaService.send_relay_update("relay_1", "OFF") is False
+        assert KafkaService.send_relay_update("relay_2", "ON") is False
+
+        mock_get_producer.assert_not_called()
+        assert self.pending_updates() == {"relay_1": "OFF", "relay_2": "ON"}
+
+    @patch("odin.apps.core.kafka.KafkaService.send_message")
+    def test_send_relay_update__sent_replaces_pending(self, mock_send_message):
+        """Test that a sent update drops the one queued before it."""
+        get_redis_connection("default").hset(PENDING_RELAY_UPDATES_KEY, "relay_1", "OFF")
+        mock_send_message.return_value = True
+
+        assert KafkaService.send_relay_update("relay_1", "ON") is True
+
+        assert self.pending_updates() == {}
+
+    @patch("odin.apps.core.kafka.KafkaService.send_message")
+    def test_send_pending_relay_updates(self, mock_send_message):
+        """Test that queued updates are sent and removed from the queue."""
+        get_redis_connection("default").hset(PENDING_RELAY_UPDATES_KEY, mapping={"relay_1": "ON", "relay_2": "OFF"})
+        mock_send_message.return_value = True
+
+        assert KafkaService.send_pending_relay_updates() == 2
+
+        assert mock_send_message.call_count == 2
+        mock_send_message.assert_any_call(
+            "coruscant", message={"relay_id": "relay_1", "target_state": "ON"}, key="relays"
+        )
+        assert self.pending_updates() == {}
+
+    @patch("odin.apps.core.kafka.KafkaService.send_message")
+    def test_send_pending_relay_updates__stops_on_failure(self, mock_send_message):
+        """Test that updates stay queued when sending fails."""
+        get_redis_connection("default").hset(PENDING_RELAY_UPDATES_KEY, mapping={"relay_1": "ON", "relay_2": "OFF"})
+        mock_send_message.return_value = False
+
+        assert KafkaService.send_pending_relay_updates() == 0
+
+        mock_send_message.assert_called_once()
+        assert self.pending_updates() == {"relay_1": "ON", "relay_2": "OFF"}
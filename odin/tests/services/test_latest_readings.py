@@ -0,0 +1,126 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from django.utils import timezone
+
+from odin.apps.sensors.latest_readings import get_latest_readings, set_latest_readings
+from odin.apps.sensors.models import Sensor, SensorLog
+from odin.apps.sensors.services import create_sensor_logs
+from odin.tests.factories import RelayFactory, SensorFactory, SensorLogFactory
+
+
+@pytest.mark.django_db
+class TestLatestReadingsStore:
+    def setup_method(self):
+        self.now = timezone.now()
+
+    def test_latest_readings__round_trip(self):
+        sensor_log = SensorLogFactory(sensor_id="sensor_1", humidity=None, created_at=self.now)
+
+        set_latest_readings([sensor_log])
+
+        stored = get_latest_readings(["sensor_1", "sensor_2"])
+        assert list(stored) == ["sensor_1"]
+        assert stored["sensor_1"].pk == sensor_log.pk
+        assert stored["sensor_1"].temp == sensor_log.temp
+        assert stored["sensor_1"].humidity is None
+        assert stored["sensor_1"].created_at == self.now
+
+    def test_latest_readings__keeps_newer_reading(self):
+        newer = SensorLog(id=2, sensor_id="sensor_1", temp=Decimal("23.00"), created_at=self.now)
+        older = SensorLog(id=1, sensor_id="sensor_1", temp=Decimal("21.00"), created_at=self.now - timedelta(minutes=1))
+
+        assert set_latest_readings([newer]) == 0
+        assert set_latest_readings([older]) == 1
+
+        assert get_latest_readings(["sensor_1"])["sensor_1"].temp == Decimal("23.00")
+
+    def test_latest_readings__updated_on_ingest(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            create_sensor_logs(
+                [
+                    {"sensor_id": "sensor_1", "temp": Decimal("21.00"), "created_at": self.now - timedelta(minutes=1)},
+                    {"sensor_id": "sensor_1", "temp": Decimal("22.00"), "created_at": self.now},
+                ]
+            )
+
+        assert get_latest_readings(["sensor_1"])["sensor_1"].temp == Decimal("22.00")
+
+    def test_latest_readings__not_updated_before_commit(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            create_sensor_logs([{"sensor_id": "sensor_1", "temp": Decimal("21.00"), "created_at": self.now}])
+
+        assert get_latest_readings(["sensor_1"]) == {}
+
+
+@pytest.mark.django_db
+class TestSensorLatestLog:
+    def setup_method(self):
+        self.sensor: Sensor = SensorFactory(sensor_id="sensor_1")
+        self.sensor_log = SensorLogFactory(sensor_id="sensor_1", created_at=timezone.now())
+
+    def test_latest_log__reads_store(self, django_assert_num_queries):
+        set_latest_readings([self.sensor_log])
+
+        with django_assert_num_queries(0):
+            assert self.sensor.latest_log.pk == self.sensor_log.pk
+
+    def test_latest_log__falls_back_to_database(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert self.sensor.latest_log.pk == self.sensor_log.pk
+        assert get_latest_readings(["sensor_1"])["sensor_1"].pk == self.sensor_log.pk
+
+    def test_latest_log__falls_back_to_database_when_redis_is_down(self):
+        with patch(
+            "odin.apps.sensors.latest_readings.get_redis_connection",
+            side_effect=RedisConnectionError("Connection refused"),
+        ):
+            assert self.sensor.latest_log.pk == self.sensor_log.pk
+
+    def test_with_latest_logs__single_lookup(self, django_assert_num_queries):
+        sensor_logs = [self.sensor_log]
+        for index in range(2, 6):
+            SensorFactory(sensor_id=f"sensor_{index}")
+            sensor_logs.append(SensorLogFactory(sensor_id=f"sensor_{index}", created_at=timezone.now()))
+        set_latest_readings(sensor_logs)
+
+        with django_assert_num_queries(1):
+            sensors = list(Sensor.objects.with_latest_logs())
+            assert all(sensor.is_alive for sensor in sensors)
+            assert [sensor.temp for sensor in sensors] == [sensor_log.temp for sensor_log in sensor_logs]
+
+    def test_with_latest_logs__fetches_misses_with_one_query(self, django_assert_num_queries):
+        SensorFactory(sensor_id="sensor_2")
+        SensorFactory(sensor_id="sensor_3")
+
+        with django_assert_num_queries(2):
+            sensors = list(Sensor.objects.order_by("sensor_id").with_latest_logs())
+        assert [sensor.latest_log for sensor in sensors][1:] == [None, None]
+        assert sensors[0].latest_log.pk == self.sensor_log.pk
+        assert get_latest_readings(["sensor_1"])["sensor_1"].pk == self.sensor_log.pk
+
+    def test_with_latest_state__attaches_relays_and_linked_sensors(self, django_assert_num_queries):
+        relay = RelayFactory(relay_id="relay_1")
+        SensorFactory(sensor_id="sensor_2", linked_sensor_id="sensor_1", relay_id="relay_1")
+        SensorFactory(sensor_id="sensor_3", linked_sensor_id="unknown", relay_id="unknown")
+        set_latest_readings([self.sensor_log])
+
+        with django_assert_num_queries(4):
+            sensors = list(Sensor.objects.order_by("sensor_id").with_latest_state())
+            assert [sensor.relay for sensor in sensors] == [None, relay, None]
+            assert [sensor.linked_sensor for sensor in sensors] == [None, self.sensor, None]
+            assert sensors[1].linked_sensor.temp == self.sensor_log.temp
+
+    def test_with_latest_state__query_count_does_not_depend_on_sensors(self, django_assert_num_queries):
+        for index in range(2, 12):
+            RelayFactory(relay_id=f"relay_{index}")
+            SensorFactory(sensor_id=f"sensor_{index}", linked_sensor_id="sensor_1", relay_id=f"relay_{index}")
+        set_latest_readings([self.sensor_log])
+
+        with django_assert_num_queries(4):
+            sensors = list(Sensor.objects.with_latest_state())
+            assert all(sensor.relay and sensor.linked_sensor.is_alive for sensor in sensors[1:])
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+from django_redis import get_redis_connection
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from odin.apps.core.events import EventType
+from odin.apps.core.exceptions import KafkaReadError
+from odin.apps.relays.models import Relay
+from odin.apps.relays.services import refresh_relay_states
+from odin.apps.relays.states import RELAY_CONSUMER_HEARTBEAT_KEY, get_relay_states, set_relay_states
+from odin.tests.factories import RelayFactory
+
+
+@pytest.mark.django_db
+class TestRefreshRelayStates:
+    def setup_method(self):
+        self.relay_on: Relay = RelayFactory(relay_id="relay_1", context={"state": "ON"})
+        self.relay_off: Relay = RelayFactory(relay_id="relay_2", context={"state": "OFF"})
+        self.relay_missing: Relay = RelayFactory(relay_id="relay_3", context={"state": "OFF"})
+        self.relays = [self.relay_on, self.relay_off, self.relay_missing]
+
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    def test_refresh_relay_states__saves_changed_relays(self, mock_get_relays_data, django_assert_num_queries):
+        mock_get_relays_data.return_value = {
+            "relay_1": {"relay_id": "relay_1", "state": "ON"},
+            "relay_2": {"relay_id": "relay_2", "state": "ON"},
+        }
+        updated_at = self.relay_on.updated_at
+
+        with django_assert_num_queries(3):
+            changed = refresh_relay_states(self.relays)
+
+        assert changed == [self.relay_off]
+        mock_get_relays_data.assert_called_once()
+        assert set(mock_get_relays_data.call_args.args[0]) == {"relay_1", "relay_2", "relay_3"}
+        self.relay_off.refresh_from_db()
+        assert self.relay_off.state == "ON"
+        self.relay_on.refresh_from_db()
+        assert self.relay_on.updated_at == updated_at
+
+    @patch("odin.apps.relays.models.publish_event")
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    def test_refresh_relay_states__publishes_changed_states(
+        self, mock_get_relays_data, mock_publish, django_capture_on_commit_callbacks
+    ):
+        mock_get_relays_data.return_value = {"relay_2": {"relay_id": "relay_2", "state": "ON"}}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            refresh_relay_states(self.relays)
+
+        mock_publish.assert_called_once_with(EventType.RELAY_STATE, {"relay_id": "relay_2", "state": "ON"})
+
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    def test_refresh_relay_states__kafka_error(self, mock_get_relays_data, django_assert_num_queries):
+        mock_get_relays_data.side_effect = KafkaReadError()
+
+        with django_assert_num_queries(0):
+            assert refresh_relay_states(self.relays) == []
+
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    def test_refresh_relay_states__no_relays(self, mock_get_relays_data):
+        assert refresh_relay_states([]) == []
+        mock_get_relays_data.assert_not_called()
+
+
+class TestRelayStatesMirror:
+    def test_relay_states__round_trip(self):
+        set_relay_states({"relay_1": "ON", "relay_2": "OFF"})
+
+        assert get_relay_states(["relay_1", "relay_3"]) == {"relay_1": "ON"}
+
+    def test_relay_states__not_trusted_without_consumer(self):
+        set_relay_states({"relay_1": "ON"})
+        get_redis_connection("default").delete(RELAY_CONSUMER_HEARTBEAT_KEY)
+
+        assert get_relay_states(["relay_1"]) is None
+
+    def test_relay_states__redis_unavailable(self):
+        with patch(
+            "odin.apps.relays.states.get_redis_connection", side_effect=RedisConnectionError("Connection refused")
+        ):
+            set_relay_states({"relay_1": "ON"})
+            assert get_relay_states(["relay_1"]) is None
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from odin.apps.sensors.chart_cache import expire_chart_cache, get_cached_chart_rows
+from odin.apps.sensors.charts import ChartAggregate, ChartResolution, get_chart_rows
+from odin.apps.sensors.compaction import compact_sensor_logs
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.services import copy_sensor_logs, create_sensor_logs
+from odin.tests.factories import SensorFactory
+
+
+SENSORS = [("sensor_1", "Boiler", Decimal("0.50")), ("sensor_2", "Room", Decimal("0.00"))]
+
+
+@pytest.mark.django_db
+class TestGetCachedChartRows:
+    def setup_method(self):
+        self.now = timezone.now()
+        # Unaligned to buckets, so the window starts with a partial bucket
+        self.start = self.now - timedelta(hours=6, seconds=70)
+        SensorFactory(sensor_id="sensor_1", name="Boiler", temp_offset=Decimal("0.50"))
+        SensorFactory(sensor_id="sensor_2", name="Room")
+        self.create_logs(self.start - timedelta(minutes=5), self.now)
+
+    def create_logs(self, start, end):
+        SensorLog.objects.bulk_create(
+            SensorLog(sensor_id=sensor_id, temp=Decimal(20 + index % 7), created_at=start + timedelta(minutes=index))
+            for sensor_id, _, _ in SENSORS
+            for index in range(int((end - start) / timedelta(minutes=1)))
+        )
+
+    def get_rows(self, start, end, **kwargs):
+        return sorted(get_cached_chart_rows(SENSORS, start, end, **kwargs))
+
+    def test_cached_chart_rows__match_uncached_rows(self):
+        for aggregate in ChartAggregate:
+            for resolution in (ChartResolution.FIVE_MINUTES, ChartResolution.FIFTEEN_MINUTES):
+                kwargs = {"resolution": resolution, "aggregate": aggregate}
+                expected = sorted(get_chart_rows(SENSORS, self.start, self.now, **kwargs))
+
+                assert self.get_rows(self.start, self.now, **kwargs) == expected
+                assert self.get_rows(self.start, self.now, **kwargs) == expected
+
+    def test_cached_chart_rows__append_new_buckets(self):
+        self.get_rows(self.start, self.now)
+        later = self.now + timedelta(minutes=20)
+        self.create_logs(self.now, later)
+
+        rows = self.get_rows(self.start + timedelta(minutes=20), later)
+
+        assert rows == sorted(get_chart_rows(SENSORS, self.start + timedelta(minutes=20), later))
+
+    def test_cached_chart_rows__wider_window(self):
+        self.get_rows(self.start + timedelta(hours=2), self.now)
+
+        rows = self.get_rows(self.start, self.now)
+
+        assert rows == sorted(get_chart_rows(SENSORS, self.start, self.now))
+
+    def test_cached_chart_rows__warm_request_fetches_recent_readings(self):
+        expected = self.get_rows(self.start, self.now)
+        # Dropped without expiring the cache, so only cached buckets can still return them
+        SensorLog.objects.filter(created_at__lt=self.now - timedelta(hours=1)).delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.get_rows(self.start, self.now)
+
+        assert len(queries) == 1
+        # Except the partial first bucket, which is queried every time
+        assert rows == [row for row in expected if row[1] >= self.start.timestamp()]
+
+    def test_cached_chart_rows__expire(self):
+        self.get_rows(self.start, self.now)
+        SensorLog.objects.filter(created_at__lt=self.now - timedelta(hours=1)).delete()
+
+        expire_chart_cache()
+
+        assert self.get_rows(self.start, self.now) == sorted(get_chart_rows(SENSORS, self.start, self.now))
+
+    def test_cached_chart_rows__expired_by_late_reading(self, django_capture_on_commit_callbacks):
+        self.get_rows(self.start, self.now, aggregate=ChartAggregate.MAX)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_sensor_logs(
+                [{"sensor_id": "sensor_1", "temp": "90.00", "created_at": self.now - timedelta(hours=2, seconds=1)}]
+            )
+
+        rows = self.get_rows(self.start, self.now, aggregate=ChartAggregate.MAX)
+        assert rows == sorted(get_chart_rows(SENSORS, self.start, self.now, aggregate=ChartAggregate.MAX))
+        assert max(value for _, _, value in rows) == 9050
+
+    def test_cached_chart_rows__expired_by_copied_late_reading(self, django_capture_on_commit_callbacks):
+        self.get_rows(self.start, self.now, aggregate=ChartAggregate.MIN)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            copy_sensor_logs(
+                [{"sensor_id": "sensor_2", "temp": "-5.00", "created_at": self.now - timedelta(hours=3, seconds=1)}]
+            )
+
+        rows = self.get_rows(self.start, self.now, aggregate=ChartAggregate.MIN)
+        assert min(value for _, _, value in rows) == -500
+
+    def test_cached_chart_rows__kept_on_recent_reading(self, django_capture_on_commit_callbacks):
+        self.get_rows(self.start, self.now)
+        SensorLog.objects.filter(created_at__lt=self.now - timedelta(hours=1)).delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_sensor_logs([{"sensor_id": "sensor_1", "temp": "90.00", "created_at": timezone.now()}])
+
+        assert self.get_rows(self.start, self.now)[0][1] < (self.now - timedelta(hours=1)).timestamp()
+
+    def test_cached_chart_rows__expired_by_compaction(self):
+        self.get_rows(self.start, self.now, aggregate=ChartAggregate.MAX)
+
+        compact_sensor_logs(before=self.now - timedelta(hours=1), since=self.start - timedelta(hours=1))
+
+        rows = self.get_rows(self.start, self.now, aggregate=ChartAggregate.MAX)
+        assert rows == sorted(get_chart_rows(SENSORS, self.start, self.now, aggregate=ChartAggregate.MAX))
+
+    def test_cached_chart_rows__hourly_resolution_not_cached(self):
+        self.get_rows(self.start, self.now, resolution=ChartResolution.HOUR)
+        SensorLog.objects.all().delete()
+
+        assert self.get_rows(self.start, self.now, resolution=ChartResolution.HOUR) == []
+
+    def test_cached_chart_rows__redis_unavailable(self):
+        with patch(
+            "odin.apps.sensors.chart_cache.get_redis_connection",
+            side_effect=RedisConnectionError("Connection refused"),
+        ):
+            rows = self.get_rows(self.start, self.now)
+
+        assert rows == sorted(get_chart_rows(SENSORS, self.start, self.now))
@@ -0,0 +1,299 @@
+import json
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from django.utils import timezone
+
+from odin.apps.sensors.charts import (
+    ChartAggregate,
+    ChartMetric,
+    ChartResolution,
+    build_chart_series,
+    get_chart_rows,
+    get_chart_rows_batch,
+    get_chart_sql,
+    get_resolution,
+    lttb,
+)
+from odin.apps.sensors.models import Sensor, SensorLog
+from odin.apps.sensors.services import get_chart_batch, get_chart_data
+from odin.tests.charts import unpack_chart_series
+from odin.tests.factories import SensorFactory, SensorLogFactory
+
+
+START = datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+EPOCH = int(START.timestamp())
+
+
+class TestBuildChartSeries:
+    def test_build_chart_series__fills_missing_buckets(self):
+        sensors = [("sensor_1", "Room", Decimal("0.00")), ("sensor_2", "Hall", Decimal("0.00"))]
+        rows = [("sensor_2", EPOCH, 1800), ("sensor_1", EPOCH + 300, 2050), ("sensor_1", EPOCH, 2030)]
+
+        assert build_chart_series(sensors, rows).as_dict() == {
+            "timestamps": [START.isoformat(), (START + timedelta(minutes=5)).isoformat()],
+            "sensors": [
+                {"sensor_id": "sensor_1", "name": "Room", "data": [20.3, 20.5]},
+                {"sensor_id": "sensor_2", "name": "Hall", "data": [18.0, None]},
+            ],
+        }
+
+    def test_build_chart_series__no_rows(self):
+        sensors = [("sensor_1", "Room", Decimal("0.00"))]
+
+        assert build_chart_series(sensors, []).as_dict() == {
+            "timestamps": [],
+            "sensors": [{"sensor_id": "sensor_1", "name": "Room", "data": []}],
+        }
+
+    def test_build_chart_series__downsampled_series_stay_aligned(self):
+        sensors = [("sensor_1", "Boiler", Decimal("0.00")), ("sensor_2", "Hall", Decimal("0.00"))]
+        rows = [("sensor_1", EPOCH + index * 300, 6000 + (3000 if index == 37 else 0)) for index in range(100)]
+        rows += [("sensor_2", EPOCH + index * 300, 2000 + index) for index in range(0, 100, 2)]
+
+        chart_data = build_chart_series(sensors, rows, max_points=10).as_dict()
+
+        timestamps = chart_data["timestamps"]
+        assert timestamps == sorted(timestamps)
+        assert (START + timedelta(minutes=37 * 5)).isoformat() in timestamps
+        boiler, hall = (series["data"] for series in chart_data["sensors"])
+        assert len(boiler) == len(hall) == len(timestamps) <= 10
+        assert max(boiler) == 90.0
+        assert None not in boiler
+
+    @pytest.mark.parametrize("max_points", [3, 4, 7, 50])
+    def test_build_chart_series__downsampled_within_max_points(self, max_points):
+        sensors = [(f"sensor_{index}", f"Sensor {index}", Decimal("0.00")) for index in range(5)]
+        rows = [
+            (sensor_id, EPOCH + bucket * 300, 2000 + (bucket * (index + 3)) % 97)
+            for index, (sensor_id, _, _) in enumerate(sensors)
+            for bucket in range(index, 300, index + 1)
+        ]
+
+        chart_data = build_chart_series(sensors, rows, max_points=max_points).as_dict()
+
+        assert len(chart_data["timestamps"]) <= max_points
+        assert all(len(series["data"]) == len(chart_data["timestamps"]) for series in chart_data["sensors"])
+
+    def test_build_chart_series__short_series_not_downsampled(self):
+        sensors = [("sensor_1", "Room", Decimal("0.00"))]
+        rows = [("sensor_1", EPOCH + index * 300, 2000 + index) for index in range(5)]
+
+        assert build_chart_series(sensors, rows, max_points=10).as_dict() == build_chart_series(sensors, rows).as_dict()
+
+
+class TestChartSeriesPack:
+    @pytest.mark.parametrize("buckets", [0, 1, 8, 13, 33])
+    def test_pack__round_trip(self, buckets):
+        sensors = [("sensor_1", "Котёл", Decimal("0.00")), ("sensor_2", "Hall", Decimal("0.00"))]
+        rows = [("sensor_1", EPOCH + index * 300, 2000 + index * 5) for index in range(buckets)]
+        rows += [("sensor_2", EPOCH + index * 900, -150 - index) for index in range(0, buckets, 3)]
+        chart = build_chart_series(sensors, rows)
+
+        payload = chart.pack()
+
+        assert len(payload) % 4 == 0
+        assert unpack_chart_series(payload) == chart.as_dict()
+
+    def test_pack__smaller_than_json(self):
+        sensors = [(f"sensor_{index}", f"Sensor {index}", Decimal("0.00")) for index in range(5)]
+        rows = [
+            (sensor_id, EPOCH + bucket * 300, 2000 + bucket % 700)
+            for sensor_id, _, _ in sensors
+            for bucket in range(2000)
+        ]
+        chart = build_chart_series(sensors, rows)
+
+        assert len(chart.pack()) * 2 < len(json.dumps(chart.as_dict()))
+
+
+class TestLTTB:
+    def test_lttb__keeps_endpoints_and_limit(self):
+        x = np.arange(1000)
+        y = np.sin(x / 50)
+
+        selected = lttb(x, y, 50)
+
+        assert len(selected) == 50
+        assert selected[0] == 0
+        assert selected[-1] == 999
+        assert np.all(np.diff(selected) > 0)
+
+    def test_lttb__keeps_spike(self):
+        y = np.full(10_000, 60.0)
+        y[4321] = 95.0
+
+        assert 4321 in lttb(np.arange(10_000), y, 20)
+
+    @pytest.mark.parametrize("max_points", [2, 5, 10])
+    def test_lttb__short_series_kept(self, max_points):
+        x = np.arange(2 if max_points == 2 else 5)
+
+        assert lttb(x, x * 1.0, max_points).tolist() == x.tolist()
+
+
+@pytest.mark.django_db
+class TestGetChartRows:
+    def setup_method(self):
+        self.sensors = [("sensor_1", "Room", Decimal("0.20")), ("sensor_2", "Hall", Decimal("-1.50"))]
+        for minutes, temp in ((0, "20.00"), (2, "20.10"), (6, "21.00")):
+            SensorLogFactory(sensor_id="sensor_1", temp=Decimal(temp), created_at=START + timedelta(minutes=minutes))
+        SensorLogFactory(sensor_id="sensor_2", temp=Decimal("20.00"), created_at=START + timedelta(minutes=1))
+        SensorLogFactory(sensor_id="sensor_3", temp=Decimal("30.00"), created_at=START)
+
+    def test_get_chart_rows__last_offset_reading_per_bucket(self):
+        rows = get_chart_rows(self.sensors, START, START + timedelta(hours=1))
+
+        assert sorted(rows) == [
+            ("sensor_1", EPOCH, 2030),
+            ("sensor_1", EPOCH + 300, 2120),
+            ("sensor_2", EPOCH, 1850),
+        ]
+
+    def test_get_chart_rows__respects_range(self):
+        rows = get_chart_rows(self.sensors, START + timedelta(minutes=5), START + timedelta(hours=1))
+
+        assert rows == [("sensor_1", EPOCH + 300, 2120)]
+
+    @pytest.mark.parametrize(
+        ("aggregate", "expected"),
+        [
+            (ChartAggregate.LAST, [2120]),
+            (ChartAggregate.AVG, [2057]),
+            (ChartAggregate.MIN, [2020]),
+            (ChartAggregate.MAX, [2120]),
+        ],
+    )
+    def test_get_chart_rows__aggregates(self, aggregate, expected):
+        rows = get_chart_rows(
+            self.sensors[:1], START, START + timedelta(hours=1), resolution=ChartResolution.HOUR, aggregate=aggregate
+        )
+
+        assert [temp for _, _, temp in rows] == expected
+
+    def test_get_chart_rows__humidity_skips_missing_readings(self):
+        SensorLogFactory(sensor_id="sensor_4", humidity=Decimal("41.00"), created_at=START)
+        SensorLogFactory(sensor_id="sensor_4", humidity=None, created_at=START + timedelta(minutes=1))
+        SensorLogFactory(sensor_id="sensor_4", humidity=None, created_at=START + timedelta(minutes=5))
+
+        rows = get_chart_rows(
+            [("sensor_4", "Bath", Decimal("-1.00"))], START, START + timedelta(hours=1), metric=ChartMetric.HUMIDITY
+        )
+
+        assert rows == [("sensor_4", EPOCH, 4000)]
+
+    def test_get_chart_rows_batch__single_query(self, django_assert_num_queries):
+        queries = [
+            get_chart_sql(self.sensors, START, START + timedelta(hours=1)),
+            get_chart_sql(self.sensors[:1], START, START + timedelta(hours=1), resolution=ChartResolution.SIX_HOURS),
+            get_chart_sql([], START, START + timedelta(hours=1)),
+        ]
+
+        with django_assert_num_queries(1):
+            results = get_chart_rows_batch(queries)
+
+        assert [sorted(rows) for rows in results] == [
+            sorted(get_chart_rows(self.sensors, START, START + timedelta(hours=1))),
+            get_chart_rows(self.sensors[:1], START, START + timedelta(hours=1), resolution=ChartResolution.SIX_HOURS),
+            [],
+        ]
+
+    def test_get_chart_rows__day_buckets_follow_local_time(self):
+        rows = get_chart_rows(self.sensors[:1], START, START + timedelta(hours=1), resolution=ChartResolution.DAY)
+
+        local_midnight = timezone.localtime(START).replace(hour=0, minute=0, second=0, microsecond=0)
+        assert rows == [("sensor_1", int(local_midnight.timestamp()), 2120)]
+
+
+class TestGetResolution:
+    @pytest.mark.parametrize(
+        ("chart_range", "expected"),
+        [
+            (timedelta(hours=48), ChartResolution.FIVE_MINUTES),
+            (timedelta(days=5), ChartResolution.FIFTEEN_MINUTES),
+            (timedelta(days=7), ChartResolution.HOUR),
+            (timedelta(days=30), ChartResolution.SIX_HOURS),
+            (timedelta(days=365), ChartResolution.DAY),
+            (timedelta(days=3650), ChartResolution.DAY),
+        ],
+    )
+    def test_get_resolution__keeps_points_under_limit(self, chart_range, expected):
+        assert get_resolution(START - chart_range, START, max_points=600) == expected
+
+
+@pytest.mark.django_db
+class TestGetChartData:
+    def test_get_chart_data__buckets_readings(self):
+        SensorFactory(sensor_id="sensor_1", name="Room", temp_offset=Decimal("0.50"))
+        SensorLogFactory(sensor_id="sensor_1", temp=Decimal("21.25"), created_at=START + timedelta(seconds=59))
+        SensorLogFactory(
+            sensor_id="sensor_1", temp=Decimal("21.75"), created_at=START + timedelta(minutes=4, seconds=59)
+        )
+        SensorLogFactory(sensor_id="sensor_1", temp=Decimal("22.00"), created_at=START + timedelta(minutes=5))
+
+        chart_data = get_chart_data(Sensor.objects.all(), start=START, end=START + timedelta(hours=1)).as_dict()
+
+        assert chart_data == {
+            "timestamps": [START.isoformat(), (START + timedelta(minutes=5)).isoformat()],
+            "sensors": [{"sensor_id": "sensor_1", "name": "Room", "data": [22.25, 22.5]}],
+        }
+
+    def test_get_chart_data__max_points_picks_finer_source_resolution(self):
+        SensorFactory(sensor_id="sensor_1", name="Boiler")
+        SensorLog.objects.bulk_create(
+            SensorLog(
+                sensor_id="sensor_1",
+                temp=Decimal("90.00") if minutes == 3000 else Decimal("60.00"),
+                created_at=START + timedelta(minutes=minutes),
+            )
+            for minutes in range(0, 6 * 24 * 60, 5)
+        )
+
+        # Six days are bucketed by 15 minutes without max_points, where the spike is not the last reading
+        chart = get_chart_data(Sensor.objects.all(), start=START, end=START + timedelta(days=6), max_points=100)
+        chart_data = chart.as_dict()
+
+        assert len(chart_data["timestamps"]) == 100
+        assert (START + timedelta(minutes=3000)).isoformat() in chart_data["timestamps"]
+        assert max(chart_data["sensors"][0]["data"]) == 90.0
+
+
+@pytest.mark.django_db
+class TestGetChartBatch:
+    def setup_method(self):
+        SensorFactory(sensor_id="sensor_1", name="Boiler", type="DS18B20", temp_offset=Decimal("0.50"))
+        SensorFactory(sensor_id="sensor_2", name="Room", type="ESP8266", humidity_offset=Decimal("-2.00"))
+        SensorFactory(sensor_id="sensor_3", name="Old", type="DS18B20", is_active=False)
+        for sensor_id in ("sensor_1", "sensor_2", "sensor_3"):
+            SensorLogFactory(sensor_id=sensor_id, temp=Decimal("21.00"), humidity=Decimal("45.00"), created_at=START)
+
+    def test_get_chart_batch__two_queries(self, django_assert_num_queries):
+        end = START + timedelta(hours=1)
+        specs = [
+            {"type": "DS18B20", "start": START, "end": end},
+            {"sensor_ids": ["sensor_2", "sensor_3"], "metric": ChartMetric.HUMIDITY, "start": START, "end": end},
+            {"type": "ESP8266", "start": START, "end": end, "resolution": ChartResolution.HOUR},
+        ]
+
+        with django_assert_num_queries(2):
+            charts = get_chart_batch(specs)
+
+        (boiler, boiler_options), (humidity, humidity_options), (room, room_options) = charts
+        assert boiler.as_dict() == get_chart_data(Sensor.objects.active().ds18b20(), start=START, end=end).as_dict()
+        assert boiler_options["y_max"] == 45
+        assert humidity.as_dict()["sensors"] == [
+            {"sensor_id": "sensor_2", "name": "Room", "data": [43.0]},
+            {"sensor_id": "sensor_3", "name": "Old", "data": [45.0]},
+        ]
+        assert humidity_options["y_max"] == 100
+        assert room.as_dict()["sensors"] == [{"sensor_id": "sensor_2", "name": "Room", "data": [21.0]}]
+        assert room_options["y_max"] == 32
+
+    def test_get_chart_batch__no_sensors(self):
+        [(chart, options)] = get_chart_batch([{"sensor_ids": ["unknown"], "start": START}])
+
+        assert chart.as_dict() == {"timestamps": [], "sensors": []}
+        assert options["y_max"] == 45
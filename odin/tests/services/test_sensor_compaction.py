@@ -0,0 +1,76 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from django.core.cache import cache
+
+from odin.apps.sensors.compaction import COMPACTED_UNTIL_CACHE_KEY, compact_sensor_logs
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.partitions import create_partition, get_partition
+from odin.tests.factories import SensorLogFactory
+
+
+START = datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+
+
+@pytest.mark.django_db
+class TestCompactSensorLogs:
+    def setup_method(self):
+        cache.delete(COMPACTED_UNTIL_CACHE_KEY)
+        for minute in range(10):
+            SensorLogFactory(
+                sensor_id="sensor_1",
+                temp=Decimal(20 + minute),
+                humidity=Decimal(40),
+                created_at=START + timedelta(minutes=minute, seconds=30),
+            )
+        SensorLogFactory(sensor_id="sensor_1", created_at=START + timedelta(days=1))
+
+    def test_compact_sensor_logs__averages_buckets(self):
+        stats = compact_sensor_logs(before=START + timedelta(hours=2))
+
+        assert stats.deleted == 10
+        assert stats.created == 2
+        assert stats.removed == 8
+
+        sensor_logs = list(SensorLog.objects.filter(created_at__lt=START + timedelta(days=1)).order_by("created_at"))
+        assert [sensor_log.created_at for sensor_log in sensor_logs] == [START, START + timedelta(minutes=5)]
+        assert [sensor_log.temp for sensor_log in sensor_logs] == [Decimal("22.00"), Decimal("27.00")]
+        assert sensor_logs[0].humidity == Decimal("40.00")
+
+    def test_compact_sensor_logs__keeps_recent_readings(self):
+        compact_sensor_logs(before=START + timedelta(hours=2))
+
+        assert SensorLog.objects.filter(created_at=START + timedelta(days=1)).exists()
+
+    def test_compact_sensor_logs__windows_do_not_split_buckets(self):
+        stats = compact_sensor_logs(before=START + timedelta(hours=2), window=timedelta(minutes=5))
+
+        assert stats.windows == 24
+        assert stats.created == 2
+
+    def test_compact_sensor_logs__resumes_from_previous_run(self):
+        compact_sensor_logs(before=START + timedelta(hours=2))
+        assert cache.get(COMPACTED_UNTIL_CACHE_KEY) == START + timedelta(hours=2)
+
+        stats = compact_sensor_logs(before=START + timedelta(hours=3))
+        assert stats.windows == 1
+        assert stats.deleted == 0
+
+    def test_compact_sensor_logs__skips_compacted_buckets(self):
+        compact_sensor_logs(before=START + timedelta(hours=2))
+
+        stats = compact_sensor_logs(before=START + timedelta(hours=2), since=START)
+        assert stats.deleted == 0
+        assert SensorLog.objects.count() == 3
+
+    def test_compact_sensor_logs__returns_partitions_compacted_to_the_end(self):
+        partition = get_partition(START)
+        create_partition(partition)
+
+        stats = compact_sensor_logs(before=partition.ends_at)
+        assert stats.partitions == [partition]
+
+        stats = compact_sensor_logs(before=partition.ends_at + timedelta(hours=1))
+        assert stats.partitions == []
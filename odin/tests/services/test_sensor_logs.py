@@ -0,0 +1,193 @@
+import json
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from django.db import IntegrityError, connection
+from django.utils import timezone
+
+from odin.apps.sensors.models import SensorLog
+from odin.apps.sensors.services import IngestStatus, copy_sensor_logs, create_sensor_logs, export_sensor_logs
+from odin.tests.factories import SensorLogFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCopySensorLogs:
+    def test_copy_sensor_logs__streams_readings(self):
+        created_at = timezone.now() - timedelta(hours=1)
+        readings = (
+            {
+                "sensor_id": f"sensor_{i % 3}",
+                "temp": Decimal("21.5"),
+                "humidity": None,
+                "created_at": created_at + timedelta(minutes=i),
+            }
+            for i in range(25)
+        )
+
+        stats = copy_sensor_logs(readings, chunk_size=10)
+
+        assert stats.rows == 25
+        assert stats.elapsed > 0
+        assert stats.rows_per_second > 0
+        assert SensorLog.objects.count() == 25
+        assert SensorLog.objects.filter(humidity__isnull=True).count() == 25
+
+    def test_copy_sensor_logs__defaults_created_at_to_now(self):
+        copy_sensor_logs([{"sensor_id": "sensor_1", "temp": "22.50"}])
+
+        sensor_log = SensorLog.objects.get(sensor_id="sensor_1")
+        assert sensor_log.created_at is not None
+        assert sensor_log.synced_at is not None
+        assert sensor_log.temp == Decimal("22.50")
+
+    def test_copy_sensor_logs__calls_callback_per_chunk(self):
+        calls = []
+        created_at = timezone.now()
+        readings = [
+            {"sensor_id": "sensor_1", "temp": 20 + i, "humidity": 40, "created_at": created_at - timedelta(minutes=i)}
+            for i in range(5)
+        ]
+
+        copy_sensor_logs(readings, chunk_size=2, callback=lambda stats: calls.append(stats.rows))
+
+        assert calls == [2, 4, 5]
+
+
+@pytest.mark.django_db
+class TestExportSensorLogs:
+    def setup_method(self):
+        self.start = datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+        for i in range(5):
+            for sensor_id in ("sensor_2", "sensor_1"):
+                SensorLogFactory(
+                    sensor_id=sensor_id,
+                    temp=Decimal("21.50") + i,
+                    humidity=Decimal("40.00") if i % 2 else None,
+                    created_at=self.start + timedelta(minutes=i),
+                )
+
+    def test_export_sensor_logs__csv(self):
+        rows = "".join(export_sensor_logs(sensor_ids=["sensor_1"], chunk_size=2)).splitlines()
+
+        assert rows == [
+            "sensor_id,temp,humidity,created_at",
+            *(
+                f"sensor_1,{21.5 + i:.2f},{'40.00' if i % 2 else ''},{(self.start + timedelta(minutes=i)).isoformat()}"
+                for i in range(5)
+            ),
+        ]
+
+    def test_export_sensor_logs__ndjson_in_range(self):
+        rows = export_sensor_logs(
+            start=self.start + timedelta(minutes=1), end=self.start + timedelta(minutes=2), export_format="ndjson"
+        )
+
+        assert [json.loads(line) for line in "".join(rows).splitlines()] == [
+            {
+                "sensor_id": sensor_id,
+                "temp": 21.5 + i,
+                "humidity": 40.0 if i % 2 else None,
+                "created_at": (self.start + timedelta(minutes=i)).isoformat(),
+            }
+            for sensor_id in ("sensor_1", "sensor_2")
+            for i in (1, 2)
+        ]
+
+    def test_export_sensor_logs__streams_from_server_side_cursor(self):
+        calls = []
+        rows = export_sensor_logs(chunk_size=3, callback=lambda stats: calls.append(stats.rows))
+
+        next(rows)
+        next(rows)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT is_holdable FROM pg_cursors WHERE name LIKE '_django_curs_%%'")
+            assert cursor.fetchall() == [(False,)]
+        list(rows)
+
+        assert calls == [3, 6, 9, 10]
+
+
+@pytest.mark.django_db
+class TestCreateSensorLogs:
+    def test_create_sensor_logs(self):
+        now = timezone.now()
+        readings = [
+            {"sensor_id": "sensor_1", "temp": Decimal("21.5"), "created_at": now - timedelta(minutes=i)}
+            for i in range(3)
+        ]
+
+        result = create_sensor_logs(readings)
+
+        assert result.created == 3
+        assert result.duplicates == 0
+        assert all(sensor_log.pk for sensor_log in result.sensor_logs)
+        assert SensorLog.objects.count() == 3
+
+    def test_create_sensor_logs__empty(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert create_sensor_logs([]).created == 0
+
+
+@pytest.mark.django_db
+class TestSensorLogsDeduplication:
+    def test_create_sensor_logs__skips_stored_duplicates(self):
+        created_at = timezone.now()
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+
+        result = create_sensor_logs(
+            [
+                {"sensor_id": "sensor_1", "temp": Decimal("21.5"), "created_at": created_at},
+                {"sensor_id": "sensor_2", "temp": Decimal("21.5"), "created_at": created_at},
+            ]
+        )
+
+        assert result.statuses == [IngestStatus.DUPLICATE, IngestStatus.CREATED]
+        assert result.created == 1
+        assert result.duplicates == 1
+        assert result.sensor_logs[0].sensor_id == "sensor_2"
+        assert SensorLog.objects.count() == 2
+
+    def test_create_sensor_logs__skips_duplicates_within_batch(self):
+        reading = {"sensor_id": "sensor_1", "temp": Decimal("21.5"), "created_at": timezone.now()}
+
+        result = create_sensor_logs([reading, dict(reading)])
+
+        assert result.statuses == [IngestStatus.CREATED, IngestStatus.DUPLICATE]
+        assert SensorLog.objects.count() == 1
+
+    def test_create_sensor_logs__matches_timestamps_in_other_timezones(self):
+        created_at = datetime(2025, 1, 6, 10, 30, tzinfo=UTC)
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+
+        result = create_sensor_logs(
+            [{"sensor_id": "sensor_1", "temp": Decimal("21.5"), "created_at": "2025-01-06T13:30:00+03:00"}]
+        )
+
+        assert result.statuses == [IngestStatus.DUPLICATE]
+
+    def test_sensor_log__unique_constraint(self):
+        created_at = timezone.now()
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+
+        with pytest.raises(IntegrityError):
+            SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCopySensorLogsDeduplication:
+    def test_copy_sensor_logs__skips_duplicates(self):
+        created_at = timezone.now()
+        SensorLogFactory(sensor_id="sensor_1", created_at=created_at)
+        readings = [
+            {"sensor_id": "sensor_1", "temp": Decimal("21.5"), "created_at": created_at},
+            {"sensor_id": "sensor_2", "temp": Decimal("21.5"), "created_at": created_at},
+            {"sensor_id": "sensor_2", "temp": Decimal("21.5"), "created_at": created_at},
+        ]
+
+        stats = copy_sensor_logs(readings)
+
+        assert stats.rows == 1
+        assert stats.duplicates == 2
+        assert SensorLog.objects.count() == 2
@@ -0,0 +1,107 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from odin.apps.sensors.models import RollupResolution, SensorLogRollup
+from odin.apps.sensors.rollups import rebuild_rollups
+from odin.apps.sensors.services import copy_sensor_logs, create_sensor_logs
+from odin.tests.factories import SensorLogFactory
+
+
+NOW = datetime(2025, 1, 6, 10, 0, tzinfo=UTC)
+
+
+def make_readings() -> list[dict]:
+    return [
+        {"sensor_id": "sensor_1", "temp": Decimal("20.00"), "humidity": Decimal("40.00"), "created_at": NOW},
+        {"sensor_id": "sensor_1", "temp": Decimal("22.00"), "humidity": None, "created_at": NOW + timedelta(minutes=1)},
+        {
+            "sensor_id": "sensor_1",
+            "temp": Decimal("24.00"),
+            "humidity": Decimal("50.00"),
+            "created_at": NOW + timedelta(minutes=6),
+        },
+    ]
+
+
+def get_rollup(resolution: RollupResolution, bucket: datetime) -> SensorLogRollup:
+    return SensorLogRollup.objects.get(sensor_id="sensor_1", resolution=resolution, bucket=bucket)
+
+
+@pytest.mark.django_db
+class TestSensorLogRollups:
+    def test_rollups__created_on_ingest(self):
+        create_sensor_logs(make_readings())
+
+        rollup = get_rollup(RollupResolution.FIVE_MINUTES, NOW)
+        assert rollup.count == 2
+        assert rollup.temp_min == Decimal("20.00")
+        assert rollup.temp_max == Decimal("22.00")
+        assert rollup.temp_avg == Decimal("21.00")
+        assert rollup.humidity_count == 1
+        assert rollup.humidity_avg == Decimal("40.00")
+        assert get_rollup(RollupResolution.FIVE_MINUTES, NOW + timedelta(minutes=5)).count == 1
+
+        rollup = get_rollup(RollupResolution.HOUR, NOW)
+        assert rollup.count == 3
+        assert rollup.temp_max == Decimal("24.00")
+        assert rollup.humidity_avg == Decimal("45.00")
+
+        assert SensorLogRollup.objects.filter(resolution=RollupResolution.DAY).get().count == 3
+
+    def test_rollups__merged_incrementally(self):
+        create_sensor_logs(make_readings())
+        create_sensor_logs(
+            [{"sensor_id": "sensor_1", "temp": Decimal("18.00"), "created_at": NOW + timedelta(minutes=2)}]
+        )
+
+        rollup = get_rollup(RollupResolution.FIVE_MINUTES, NOW)
+        assert rollup.count == 3
+        assert rollup.temp_min == Decimal("18.00")
+        assert rollup.humidity_count == 1
+        assert get_rollup(RollupResolution.HOUR, NOW).count == 4
+
+    def test_rollups__ignore_duplicates(self):
+        create_sensor_logs(make_readings())
+        create_sensor_logs(make_readings())
+
+        assert get_rollup(RollupResolution.HOUR, NOW).count == 3
+
+    def test_rollups__rebuild_from_sensor_logs(self):
+        for reading in make_readings():
+            SensorLogFactory(**reading)
+        SensorLogRollup.objects.create(
+            sensor_id="sensor_1",
+            resolution=RollupResolution.HOUR,
+            bucket=NOW,
+            count=100,
+            temp_min=0,
+            temp_max=0,
+            temp_sum=0,
+        )
+
+        rebuild_rollups(start=NOW, end=NOW)
+
+        rollup = get_rollup(RollupResolution.HOUR, NOW)
+        assert rollup.count == 3
+        assert rollup.temp_avg == Decimal("22.00")
+        assert get_rollup(RollupResolution.FIVE_MINUTES, NOW).count == 2
+
+    def test_rollups__rebuild_only_selected_sensors(self):
+        create_sensor_logs(make_readings())
+        create_sensor_logs([{"sensor_id": "sensor_2", "temp": Decimal("20.00"), "created_at": NOW}])
+        SensorLogRollup.objects.filter(sensor_id="sensor_2").update(count=100)
+
+        rebuild_rollups(start=NOW, end=NOW, sensor_ids=["sensor_1"])
+
+        assert SensorLogRollup.objects.filter(sensor_id="sensor_2", count=100).count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCopySensorLogRollups:
+    def test_rollups__created_on_copy(self):
+        copy_sensor_logs(make_readings(), chunk_size=2)
+
+        assert get_rollup(RollupResolution.FIVE_MINUTES, NOW).count == 2
+        assert get_rollup(RollupResolution.HOUR, NOW).count == 3
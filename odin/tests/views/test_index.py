@@ -9,7 +9,7 @@ from django.urls import reverse
 from rest_framework import status
 
 from odin.apps.currency.models import Currency
-from odin.tests.factories import ExchangeRateFactory, SensorFactory, VoltageLogFactory, WeatherFactory
+from odin.tests.factories import ExchangeRateFactory, RelayFactory, SensorFactory, VoltageLogFactory, WeatherFactory
 
 
 @pytest.mark.django_db
@@ -89,3 +89,23 @@ class TestIndexView:
 
         context = build_index_context()
         assert context["exchange_rates_trends"]["USD"] is None
+
+    @patch("odin.apps.relays.services.KafkaService.get_relays_data")
+    @patch("odin.apps.core.services.subprocess.run")
+    def test_index_refreshes_relay_states_at_once(self, mock_subprocess, mock_get_relays_data, client):
+        mock_subprocess.return_value.stdout = b"active"
+        mock_get_relays_data.return_value = {"relay_1": {"relay_id": "relay_1", "state": "ON"}}
+        RelayFactory(relay_id="relay_1", context={"state": "OFF"})
+        RelayFactory(relay_id="relay_2", context={"state": "OFF"})
+        SensorFactory(relay_id="relay_1")
+        SensorFactory(relay_id="relay_2")
+
+        from odin.apps.core.services import build_index_context
+
+        context = build_index_context()
+
+        mock_get_relays_data.assert_called_once()
+        assert {sensor.relay.relay_id: sensor.relay.state for sensor in context["sensors"]} == {
+            "relay_1": "ON",
+            "relay_2": "OFF",
+        }
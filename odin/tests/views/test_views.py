@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 
+from django.test import AsyncClient
 from django.urls import reverse
 from rest_framework import status
 
@@ -14,3 +17,19 @@ class TestViews:
     def test_boiler_chart(self, client):
         response = client.get(reverse("sensors_boiler"), follow=True)
         assert response.status_code == status.HTTP_200_OK
+
+    def test_events(self):
+        async def get_events():
+            response = await AsyncClient(HTTP_HOST="odin.local").get(reverse("events"))
+            stream = aiter(response.streaming_content)
+            return response, await anext(stream)
+
+        response, retry = asyncio.run(get_events())
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/event-stream"
+        assert response["Cache-Control"] == "no-cache"
+        assert retry == b"retry: 5000\n\n"
+
+    def test_events__only_get(self, client):
+        response = client.post(reverse("events"))
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED